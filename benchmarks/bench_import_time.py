@@ -0,0 +1,72 @@
+"""
+起動時のモジュール読み込み時間を `python -X importtime` で計測する。
+
+使い方 (リポジトリのルートで実行):
+    python benchmarks/bench_import_time.py [--runs 5] [--top 15] [--module nowb.window]
+
+nowb パッケージの各モジュールの累積読み込み時間と、時間のかかっているモジュールの上位を表示する。
+遊び機能 (nowb.features.*) が起動時に読み込まれていないことも確認する。
+"""
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# "import time:      self [us] |  cumulative | imported package" の形式の行
+IMPORTTIME_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+LAZY_PACKAGE = "nowb.features"
+
+
+def run_once(module):
+    """1回分の -X importtime の結果を {モジュール名: (self_us, cumulative_us)} で返す。"""
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                            cwd=REPO_ROOT, capture_output=True, text=True)
+    if result.returncode != 0:
+        sys.stderr.write(result.stderr)
+        raise SystemExit(f"'{module}' の読み込みに失敗しました (終了コード {result.returncode})")
+    timings = {}
+    for line in result.stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if match:
+            timings[match.group(4)] = (int(match.group(1)), int(match.group(2)))
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description="nowb パッケージの読み込み時間を計測する")
+    parser.add_argument("--module", default="nowb.window",
+                        help="読み込むモジュール (既定: nowb.window。nowb.appはこれを二重起動の確認後に読み込む)")
+    parser.add_argument("--runs", type=int, default=5, help="計測回数。中央値を表示する (既定: 5)")
+    parser.add_argument("--top", type=int, default=15, help="表示する上位モジュールの数 (既定: 15)")
+    args = parser.parse_args()
+
+    runs = [run_once(args.module) for _ in range(max(1, args.runs))]
+    names = set().union(*runs)
+
+    def median(name, column):
+        return statistics.median(run[name][column] for run in runs if name in run)
+
+    total_us = median(args.module, 1)
+    print(f"{args.module} の読み込み: {total_us / 1000:.1f} ms (中央値, {len(runs)} 回)")
+
+    print("\nnowb パッケージ (累積 / 自身):")
+    for name in sorted(n for n in names if n == "nowb" or n.startswith("nowb.")):
+        print(f"  {median(name, 1) / 1000:8.1f} ms {median(name, 0) / 1000:8.1f} ms  {name}")
+
+    print(f"\n自身の読み込み時間の上位 {args.top} モジュール:")
+    for name in sorted(names, key=lambda n: median(n, 0), reverse=True)[:args.top]:
+        print(f"  {median(name, 0) / 1000:8.1f} ms  {name}")
+
+    eager_features = sorted(n for n in names if n == LAZY_PACKAGE or n.startswith(LAZY_PACKAGE + "."))
+    if eager_features:
+        print(f"\n警告: 起動時に読み込まれるべきでないモジュールが読み込まれています: {', '.join(eager_features)}")
+        return 1
+    print(f"\n{LAZY_PACKAGE} は起動時に読み込まれていません。")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
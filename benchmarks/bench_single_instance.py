@@ -0,0 +1,106 @@
+"""
+URLを開くまでの時間を、新しく起動する場合 (コールド) と起動中のインスタンスに渡す場合 (ウォーム) で比較する。
+
+使い方 (リポジトリのルートで、ブラウザを起動していない状態で実行):
+    python benchmarks/bench_single_instance.py [--runs 10] [--url https://example.com/] [--stub-listener]
+
+コールド: 起動スクリプトを実行してから、起動レポート (startup_report.json) が書き出されるまでの時間。
+ウォーム: 2つ目の起動スクリプトがURLを渡して終了するまでの時間。
+計測が終わったら、コールドで起動したブラウザを終了する。
+--stub-listener を指定すると、ブラウザの代わりにURLを受け取るだけのサーバーを起動してウォームだけを計測する。
+QtWebEngineを読み込まずにURLを渡せているかの確認に使う。
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+LAUNCHER = os.path.join(REPO_ROOT, "project-nowb-win.py")
+STARTUP_REPORT_FILE = os.path.join(REPO_ROOT, "startup_report.json")
+COLD_START_TIMEOUT_S = 60
+STUB_READY = "ready"
+
+
+def serve_stub():
+    """ブラウザの代わりに二重起動の確認の待ち受けだけを行い、受け取ったURLは捨てる。"""
+    sys.path.insert(0, REPO_ROOT)
+    from PyQt6.QtCore import QCoreApplication
+    from nowb.single_instance import SingleInstanceServer
+    app = QCoreApplication(sys.argv[:1])
+    server = SingleInstanceServer(app)
+    if not server.listen():
+        return 1
+    server.connect_receiver(lambda urls, private: None)
+    print(STUB_READY, flush=True)
+    return app.exec()
+
+
+def start_stub_listener():
+    """URLを受け取るだけのサーバーを起動し、待ち受けを始めたらプロセスを返す。"""
+    process = subprocess.Popen([sys.executable, os.path.abspath(__file__), "--serve-stub"], cwd=REPO_ROOT,
+                               stdout=subprocess.PIPE, text=True)
+    if process.stdout.readline().strip() != STUB_READY:
+        process.terminate()
+        raise SystemExit("待ち受けを開始できませんでした。すでに起動しているインスタンスを終了してから実行してください。")
+    return process
+
+
+def measure_cold(url):
+    """ブラウザを新しく起動し、(経過時間ms, プロセス) を返す。"""
+    previous_mtime = os.path.getmtime(STARTUP_REPORT_FILE) if os.path.exists(STARTUP_REPORT_FILE) else None
+    start = time.perf_counter()
+    process = subprocess.Popen([sys.executable, LAUNCHER, url], cwd=REPO_ROOT)
+    while time.perf_counter() - start < COLD_START_TIMEOUT_S:
+        if process.poll() is not None:
+            raise SystemExit("ブラウザがすぐに終了しました。すでに起動しているインスタンスを終了してから実行してください。")
+        if os.path.exists(STARTUP_REPORT_FILE) and os.path.getmtime(STARTUP_REPORT_FILE) != previous_mtime:
+            return (time.perf_counter() - start) * 1000, process
+        time.sleep(0.005)
+    process.terminate()
+    raise SystemExit(f"{COLD_START_TIMEOUT_S} 秒以内に起動が完了しませんでした。")
+
+
+def measure_warm(url):
+    """起動中のインスタンスにURLを渡し、起動スクリプトが終了するまでの経過時間msを返す。"""
+    start = time.perf_counter()
+    result = subprocess.run([sys.executable, LAUNCHER, url], cwd=REPO_ROOT)
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    if result.returncode != 0:
+        raise SystemExit(f"URLの受け渡しに失敗しました (終了コード {result.returncode})")
+    return elapsed_ms
+
+
+def main():
+    parser = argparse.ArgumentParser(description="コールド起動とウォーム起動でURLを開く時間を比較する")
+    parser.add_argument("--url", default="about:blank", help="開くURL (既定: about:blank)")
+    parser.add_argument("--runs", type=int, default=10, help="ウォーム起動の計測回数 (既定: 10)")
+    parser.add_argument("--stub-listener", action="store_true",
+                        help="ブラウザを起動せず、URLを受け取るだけのサーバーを相手にウォームだけを計測する")
+    parser.add_argument("--serve-stub", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.serve_stub:
+        return serve_stub()
+
+    if args.stub_listener:
+        cold_ms, process = None, start_stub_listener()
+    else:
+        cold_ms, process = measure_cold(args.url)
+    try:
+        warm = [measure_warm(args.url) for _ in range(max(1, args.runs))]
+    finally:
+        process.terminate()
+        process.wait()
+
+    if cold_ms is not None:
+        print(f"コールド: {cold_ms:8.1f} ms")
+    print(f"ウォーム: {statistics.median(warm):8.1f} ms (中央値, 最小 {min(warm):.1f} ms, 最大 {max(warm):.1f} ms, {len(warm)} 回)")
+    if cold_ms is not None:
+        print(f"短縮率:   {cold_ms / statistics.median(warm):8.1f} 倍")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,130 @@
+"""
+設定・履歴・広告ブロックリストの先読み (起動時のワーカースレッドでの読み込み) による、操作可能になるまでの時間の変化を計測する。
+
+使い方 (リポジトリのルートで実行):
+    python benchmarks/bench_startup_preload.py [--ui-work-ms 150] [--history 20000] [--rules 20000] [--runs 5]
+    python benchmarks/bench_startup_preload.py --compare before/startup_report.json after/startup_report.json
+
+1つ目の形式では、一時ディレクトリに設定・履歴・広告ブロックリストを作り、起動レポート (startup_report.json) と
+同じフェーズ形式で次の2通りを計測する。
+  before: ウィジェットの構築の後に、メインスレッドで3つのファイルを順に読み込む (先読みなし)
+  after:  先読みを開始してからウィジェットを構築し、最初に使う時点で結果を待ち合わせる
+ウィジェットの構築は、メインスレッドでPythonのコードを --ui-work-ms の間実行することで模擬する
+(ワーカースレッドとGILを奪い合うため、実際の構築より先読みに不利な条件になる)。
+2つ目の形式では、実際に起動して書き出された2つの起動レポートをフェーズごとに比較する。
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from nowb.config import (ADBLOCK_RULES_FILE, HISTORY_FILE, SETTINGS_FILE, compile_adblock_rules,  # noqa: E402
+                         load_adblock_rules, profile_path, read_history_file, read_settings_file, set_profile_dir)
+from nowb.startup import StartupPreloader, StartupProfiler  # noqa: E402
+
+LOADERS = {
+    'settings': lambda: read_settings_file(profile_path(SETTINGS_FILE)),
+    'history': lambda: read_history_file(profile_path(HISTORY_FILE)),
+    'adblock': lambda: compile_adblock_rules(load_adblock_rules()),
+}
+
+
+def write_profile(directory, history_count, rule_count):
+    """計測用の設定・履歴・広告ブロックリストを書き出す。"""
+    settings = {
+        'settings_version': "1.1", 'home_url': "https://example.com/", 'adblock_enabled': True,
+        'last_session': [f"https://example.com/session/{i}" for i in range(50)],
+        'favorite_sites': {f"site {i}": f"https://example.com/fav/{i}" for i in range(100)},
+    }
+    with open(os.path.join(directory, SETTINGS_FILE), 'w', encoding='utf-8') as f:
+        json.dump(settings, f)
+    history = [{'url': f"https://example.com/page/{i}", 'title': f"Example page {i}",
+                'timestamp': "2026-01-01T00:00:00"} for i in range(history_count)]
+    with open(os.path.join(directory, HISTORY_FILE), 'w', encoding='utf-8') as f:
+        json.dump(history, f)
+    with open(os.path.join(directory, ADBLOCK_RULES_FILE), 'w', encoding='utf-8') as f:
+        f.write("# Project-NOWB AdBlock Rules\n")
+        f.write("\n".join(f"ads{i}.tracker{i % 97}.example" for i in range(rule_count)))
+
+
+def simulate_ui_work(duration_ms):
+    """ウィジェットの構築の代わりに、メインスレッドでPythonのコードを実行し続ける。"""
+    deadline = time.perf_counter() + duration_ms / 1000
+    while time.perf_counter() < deadline:
+        sum(range(1000))
+
+
+def run_once(preload, ui_work_ms):
+    """1回分の起動を模擬し、フェーズの一覧を返す。"""
+    profiler = StartupProfiler()
+    profiler.begin(time.monotonic())
+    preloader = StartupPreloader()
+    if preload:
+        preloader.start(LOADERS)
+    simulate_ui_work(ui_work_ms)
+    profiler.mark('window_init')
+    for name, loader in LOADERS.items():
+        if preloader.take(name) is None:
+            loader()
+        profiler.mark(name)
+    return profiler.phases
+
+
+def summarize(runs):
+    """フェーズごとの所要時間の中央値と、操作可能になるまでの時間の中央値を返す。"""
+    names = [phase['name'] for phase in runs[0]]
+    durations = {name: statistics.median(run[i]['duration_ms'] for run in runs) for i, name in enumerate(names)}
+    return durations, statistics.median(run[-1]['elapsed_ms'] for run in runs)
+
+
+def print_comparison(before, after, before_total, after_total):
+    print(f"{'フェーズ':<14}{'before (ms)':>12}{'after (ms)':>12}")
+    for name in dict.fromkeys(list(before) + list(after)):
+        print(f"{name:<14}{before.get(name, 0):12.1f}{after.get(name, 0):12.1f}")
+    print(f"{'合計':<14}{before_total:12.1f}{after_total:12.1f}  ({after_total - before_total:+.1f} ms)")
+
+
+def compare_reports(before_path, after_path):
+    """実際の起動で書き出された2つの起動レポートをフェーズごとに比較する。"""
+    reports = []
+    for path in (before_path, after_path):
+        with open(path, 'r', encoding='utf-8') as f:
+            reports.append(json.load(f))
+    before, after = ({phase['name']: phase['duration_ms'] for phase in report['phases']} for report in reports)
+    print_comparison(before, after, reports[0]['total_ms'], reports[1]['total_ms'])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="起動時の先読みによる、操作可能になるまでの時間の変化を計測する")
+    parser.add_argument("--ui-work-ms", type=float, default=150.0, help="模擬するウィジェットの構築時間 (ms, 既定: 150)")
+    parser.add_argument("--history", type=int, default=20000, help="履歴の件数 (既定: 20000)")
+    parser.add_argument("--rules", type=int, default=20000, help="広告ブロックのルール数 (既定: 20000)")
+    parser.add_argument("--runs", type=int, default=5, help="それぞれの計測回数 (既定: 5)")
+    parser.add_argument("--compare", nargs=2, metavar=("BEFORE", "AFTER"), help="2つの起動レポートを比較する")
+    args = parser.parse_args()
+
+    if args.compare:
+        compare_reports(*args.compare)
+        return 0
+
+    with tempfile.TemporaryDirectory() as directory:
+        write_profile(directory, args.history, args.rules)
+        set_profile_dir(directory)
+        results = {}
+        for preload in (False, True):
+            runs = [run_once(preload, args.ui_work_ms) for _ in range(max(1, args.runs))]
+            results[preload] = summarize(runs)
+    (before, before_total), (after, after_total) = results[False], results[True]
+    print(f"履歴 {args.history} 件、ルール {args.rules} 件、ウィジェットの構築 {args.ui_work_ms:.0f} ms "
+          f"({args.runs} 回の中央値)")
+    print_comparison(before, after, before_total, after_total)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
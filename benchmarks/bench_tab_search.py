@@ -0,0 +1,84 @@
+"""
+クイックオープン(Ctrl+K)のタブ検索が、1文字入力あたりの予算内に収まるかを計測する。
+
+使い方 (リポジトリのルートで実行):
+    python benchmarks/bench_tab_search.py [--tabs 10000] [--budget-ms 5] [--runs 5]
+
+疑似的なタイトルとURLを持つタブでインデックスを作り、いくつかのクエリを1文字ずつ入力したときの
+1回の検索にかかる時間を計測する。最悪値が予算を超えれば終了コード1で終了する。
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from nowb.tab_index import TabSearchIndex  # noqa: E402
+
+WORDS = ["python", "github", "docs", "issue", "pull", "request", "news", "video", "search", "mail",
+         "calendar", "wiki", "stack", "overflow", "qt", "webengine", "release", "notes", "blog", "shop",
+         "cart", "review", "tutorial", "api", "reference", "japan", "weather", "map", "music", "photo"]
+# 1〜2文字のクエリ、よくある単語、どのタブにも一致しないクエリを含める
+QUERIES = ["python", "webengine", "github", "pg", "qt", "eee", "xyzzy", "docs api"]
+
+
+class _Tab:
+    """weakrefで参照できるウィンドウ/タブの代わり。"""
+
+
+def build_index(tab_count, seed=0):
+    rng = random.Random(seed)
+    index = TabSearchIndex()
+    window = _Tab()
+    tabs = []
+    for i in range(tab_count):
+        title = " ".join(rng.choice(WORDS).capitalize() for _ in range(rng.randint(3, 8))) + f" - Page {i}"
+        url = (f"https://{rng.choice(WORDS)}.{rng.choice(['com', 'org', 'io', 'jp'])}/"
+               + "/".join(rng.choice(WORDS) for _ in range(rng.randint(1, 4))) + f"?id={i}")
+        tab = _Tab()
+        tabs.append(tab)
+        index.add(window, tab, title, url)
+    return index, tabs
+
+
+def measure(index, query):
+    """queryを1文字ずつ入力したときの、各検索の時間 (ms) のリストを返す。"""
+    timings = []
+    for length in range(1, len(query) + 1):
+        start = time.perf_counter()
+        index.search(query[:length])
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description="タブ検索の1文字入力あたりの時間を計測する")
+    parser.add_argument("--tabs", type=int, default=10000, help="インデックスに登録するタブの数 (既定: 10000)")
+    parser.add_argument("--budget-ms", type=float, default=5.0, help="1回の検索の予算 (ms, 既定: 5)")
+    parser.add_argument("--runs", type=int, default=5, help="各クエリを入力する回数 (既定: 5)")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    index, _tabs = build_index(args.tabs)
+    print(f"{args.tabs} タブのインデックス作成: {(time.perf_counter() - start) * 1000:.1f} ms")
+
+    worst = 0.0
+    for query in QUERIES:
+        timings = []
+        for _ in range(max(1, args.runs)):
+            timings.extend(measure(index, query))
+        worst = max(worst, max(timings))
+        print(f"  {query!r:<12} 中央値 {statistics.median(timings):6.2f} ms  最悪 {max(timings):6.2f} ms")
+
+    if worst > args.budget_ms:
+        print(f"\n予算超過: 最悪 {worst:.2f} ms > {args.budget_ms} ms")
+        return 1
+    print(f"\n最悪 {worst:.2f} ms (予算 {args.budget_ms} ms 以内)")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,93 @@
+"""
+2回分の --bench の結果 (JSON) を比較し、URLごとの差分を表示する。
+
+使い方:
+    python benchmarks/compare_bench.py base.json new.json [--threshold 5] [--fail-on-regression]
+
+同じURLを複数回読み込んだ場合 (--bench-repeat) は中央値で比較する。
+時間とメモリは小さいほど良い指標として扱い、threshold (%) を超えて悪化したものを「悪化」と表示する。
+"""
+import argparse
+import json
+import statistics
+import sys
+
+# (表示名, 結果から値を取り出す関数)
+METRICS = [
+    ("load_ms", lambda entry: entry.get('load_time_ms')),
+    ("dcl_ms", lambda entry: (entry.get('navigation') or {}).get('dom_content_loaded_ms')),
+    ("load_event_ms", lambda entry: (entry.get('navigation') or {}).get('load_event_end_ms')),
+    ("rss_kb", lambda entry: entry.get('renderer_rss_kb')),
+    ("blocked", lambda entry: entry.get('blocked_requests')),
+]
+# ブロック数は増減のどちらが良いとは言えないため、悪化の判定に使わない
+NEUTRAL_METRICS = {"blocked"}
+
+
+def load_report(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def summarize(report):
+    """{url: {指標名: 中央値}} を返す。読み込みに失敗した回は除く。"""
+    values = {}
+    for entry in report.get('results', []):
+        if not entry.get('ok'):
+            continue
+        per_url = values.setdefault(entry['url'], {})
+        for name, getter in METRICS:
+            value = getter(entry)
+            if value is not None:
+                per_url.setdefault(name, []).append(value)
+    return {url: {name: statistics.median(samples) for name, samples in metrics.items()}
+            for url, metrics in values.items()}
+
+
+def format_change(base, new):
+    if base is None or new is None:
+        return "-"
+    if base == 0:
+        return f"{new - base:+.0f}"
+    return f"{(new - base) / base * 100:+.1f}%"
+
+
+def compare(base_report, new_report, threshold):
+    """差分の表を表示し、悪化した (URL, 指標) のリストを返す。"""
+    base, new = summarize(base_report), summarize(new_report)
+    regressions = []
+    print(f"base: {base_report.get('timestamp', '?')} ({base_report.get('app_version', '?')}, {base_report.get('mode', '?')})")
+    print(f"new:  {new_report.get('timestamp', '?')} ({new_report.get('app_version', '?')}, {new_report.get('mode', '?')})")
+    for url in list(base) + [url for url in new if url not in base]:
+        print(f"\n{url}")
+        if url not in base or url not in new:
+            print("  (片方の結果にしかありません)")
+            continue
+        for name, _ in METRICS:
+            old_value, new_value = base[url].get(name), new[url].get(name)
+            mark = ""
+            if (name not in NEUTRAL_METRICS and old_value and new_value is not None
+                    and (new_value - old_value) / old_value * 100 > threshold):
+                mark = "  ← 悪化"
+                regressions.append((url, name))
+            old_text = "-" if old_value is None else f"{old_value:.1f}"
+            new_text = "-" if new_value is None else f"{new_value:.1f}"
+            print(f"  {name:<14}{old_text:>12} → {new_text:>12}  {format_change(old_value, new_value):>8}{mark}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="2回分のベンチマーク結果を比較する")
+    parser.add_argument("base", help="比較の基準となる結果のJSON")
+    parser.add_argument("new", help="比較する結果のJSON")
+    parser.add_argument("--threshold", type=float, default=5.0, help="悪化とみなす変化率 (%%, 既定: 5)")
+    parser.add_argument("--fail-on-regression", action="store_true", help="悪化があれば終了コード1で終了する")
+    args = parser.parse_args()
+
+    regressions = compare(load_report(args.base), load_report(args.new), args.threshold)
+    print(f"\n悪化: {len(regressions)} 件 (しきい値 {args.threshold}%)")
+    return 1 if regressions and args.fail_on_regression else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,205 @@
+"""
+ブラウザ全体の性能を計測するためのテスト用サイトを生成し、ローカルのHTTPサーバーで配信する。
+
+使い方 (リポジトリのルートで実行):
+    python benchmarks/fixture_server.py [--port 8765] [--dir DIR]
+    # 別のターミナルで
+    python project-nowb-win.py --bench DIR/urls.txt --bench-output run.json
+
+生成するページ:
+    dom-10k.html     10,000個のDOMノード
+    images-300.html  300枚の画像
+    ads.html         広告ブロッカー (AdblockInterceptor) に一致する他オリジン風のリクエストを多数含むページ
+    long-text.html   長文 (要約・感情分析用)
+    media.html       音声・動画要素 (音量調整用)
+ページの内容は毎回同じになるよう、乱数を使わずに生成する。
+"""
+import argparse
+import functools
+import os
+import struct
+import sys
+import tempfile
+import wave
+import zlib
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+DEFAULT_PORT = 8765
+DEFAULT_DIR = os.path.join(tempfile.gettempdir(), "nowb-bench-fixtures")
+PAGES = ["index.html", "dom-10k.html", "images-300.html", "ads.html", "long-text.html", "media.html"]
+
+PAGE_TEMPLATE = """<!DOCTYPE html>
+<html lang="ja">
+<head><meta charset="utf-8"><title>{title}</title></head>
+<body>
+<h1>{title}</h1>
+{body}
+</body>
+</html>
+"""
+
+POSITIVE_SENTENCES = [
+    "This is a great and beautiful day full of hope.",
+    "素晴らしい成果が出て、チームは最高に楽しい時間を過ごした。",
+    "The best part of the project was its happy success.",
+]
+NEGATIVE_SENTENCES = [
+    "The weather was terrible and the trip was a sad failure.",
+    "最悪の結果に怒りと絶望を感じ、とてもつらい一日だった。",
+    "It was the worst and most painful meeting of the year.",
+]
+NEUTRAL_SENTENCES = [
+    "The committee reviewed the quarterly report and scheduled the next meeting.",
+    "資料は第三章の表に従って整理され、各項目の値が記録された。",
+    "Each section describes the configuration options and their default values.",
+    "Measurements were taken at regular intervals throughout the afternoon.",
+]
+
+
+def write_file(directory, name, data):
+    path = os.path.join(directory, name)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    mode = 'wb' if isinstance(data, bytes) else 'w'
+    with open(path, mode, **({} if mode == 'wb' else {'encoding': 'utf-8'})) as f:
+        f.write(data)
+
+
+def write_page(directory, name, title, body):
+    write_file(directory, name, PAGE_TEMPLATE.format(title=title, body=body))
+
+
+def make_png(width, height, rgb):
+    """単色のPNG画像のバイト列を作成する。"""
+    def chunk(kind, data):
+        return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data))
+    row = b"\x00" + bytes(rgb) * width
+    return (b"\x89PNG\r\n\x1a\n"
+            + chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0))
+            + chunk(b"IDAT", zlib.compress(row * height))
+            + chunk(b"IEND", b""))
+
+
+def make_wav(path, seconds=2, rate=8000):
+    """無音のWAVファイルを作成する。"""
+    with wave.open(path, 'wb') as f:
+        f.setnchannels(1)
+        f.setsampwidth(2)
+        f.setframerate(rate)
+        f.writeframes(b"\x00\x00" * rate * seconds)
+
+
+def build_dom_page(directory):
+    # 100セクション x 20行 x (行 + 4セル) = 10,000ノード (+見出しなど)
+    sections = []
+    for s in range(100):
+        rows = "".join(
+            "<tr>" + "".join(f"<td>{s}-{r}-{c}</td>" for c in range(4)) + "</tr>"
+            for r in range(20))
+        sections.append(f"<section><h2>Section {s}</h2><table>{rows}</table></section>")
+    write_page(directory, "dom-10k.html", "10,000 DOM nodes", "\n".join(sections))
+
+
+def build_images_page(directory):
+    images = []
+    for i in range(300):
+        name = f"images/img-{i:03d}.png"
+        write_file(directory, name, make_png(64, 64, ((i * 37) % 256, (i * 91) % 256, (i * 53) % 256)))
+        images.append(f'<img src="{name}" width="64" height="64" alt="{i}">')
+    write_page(directory, "images-300.html", "300 images", "\n".join(images))
+
+
+def build_ads_page(directory, port):
+    # 他オリジン (localhost) からの広告風リクエスト。パスやクエリが既定の広告ブロックルールに一致する
+    third_party = f"http://localhost:{port}"
+    write_file(directory, "ads/banner.js", "/* ad */\n")
+    write_file(directory, "ads/pixel.gif", make_png(1, 1, (0, 0, 0)))
+    write_file(directory, "ad-frame.html", "<html><body>ad</body></html>\n")
+    write_file(directory, "advert.js", "/* advert */\n")
+    write_file(directory, "static/app.js", "/* first party */\n")
+    elements = []
+    for i in range(50):
+        elements.append(f'<script src="{third_party}/ads/banner.js?slot={i}"></script>')
+        elements.append(f'<img src="{third_party}/ads/pixel.gif?ref=doubleclick.net&amp;n={i}" width="1" height="1">')
+        elements.append(f'<script src="{third_party}/advert.js?n={i}&amp;src=googlesyndication.com"></script>')
+        elements.append(f'<iframe src="{third_party}/ad-frame.html?n={i}" width="10" height="10"></iframe>')
+    # ルールに一致しない通常のリクエスト (誤ってブロックされないことの確認用)
+    for i in range(50):
+        elements.append(f'<script src="static/app.js?n={i}"></script>')
+    write_page(directory, "ads.html", "Ad-heavy page", "\n".join(elements))
+
+
+def build_long_text_page(directory):
+    paragraphs = []
+    for i in range(2000):
+        sentences = [NEUTRAL_SENTENCES[(i + j) % len(NEUTRAL_SENTENCES)] for j in range(4)]
+        if i % 7 == 0:
+            sentences.append(POSITIVE_SENTENCES[i % len(POSITIVE_SENTENCES)])
+        if i % 11 == 0:
+            sentences.append(NEGATIVE_SENTENCES[i % len(NEGATIVE_SENTENCES)])
+        paragraphs.append(f"<p>{' '.join(sentences)}</p>")
+    write_page(directory, "long-text.html", "Long text", "\n".join(paragraphs))
+
+
+def build_media_page(directory):
+    media_dir = os.path.join(directory, "media")
+    os.makedirs(media_dir, exist_ok=True)
+    make_wav(os.path.join(media_dir, "silence.wav"))
+    elements = ['<audio src="media/silence.wav" controls preload="auto" loop></audio>' for _ in range(20)]
+    elements += ['<video src="media/silence.wav" controls preload="auto" width="160" height="90"></video>'
+                 for _ in range(5)]
+    write_page(directory, "media.html", "Media elements", "\n".join(elements))
+
+
+def build_fixtures(directory, port):
+    """テスト用サイトを生成し、--bench に渡すURLリストのパスを返す。"""
+    os.makedirs(directory, exist_ok=True)
+    build_dom_page(directory)
+    build_images_page(directory)
+    build_ads_page(directory, port)
+    build_long_text_page(directory)
+    build_media_page(directory)
+    links = "\n".join(f'<li><a href="{page}">{page}</a></li>' for page in PAGES[1:])
+    write_page(directory, "index.html", "Project-NOWB benchmark fixtures", f"<ul>{links}</ul>")
+
+    url_list = os.path.join(directory, "urls.txt")
+    base = f"http://127.0.0.1:{port}"
+    write_file(directory, "urls.txt", "# Project-NOWB ベンチマーク用URLリスト\n"
+               + "".join(f"{base}/{page}\n" for page in PAGES))
+    return url_list
+
+
+class QuietHandler(SimpleHTTPRequestHandler):
+    """アクセスログを出さないハンドラ。計測中の出力を減らすため。"""
+    def log_message(self, format, *args):
+        pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description="ベンチマーク用のテストサイトを生成して配信する")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help=f"待ち受けるポート (既定: {DEFAULT_PORT})")
+    parser.add_argument("--dir", default=DEFAULT_DIR, help=f"サイトを生成するディレクトリ (既定: {DEFAULT_DIR})")
+    parser.add_argument("--build-only", action="store_true", help="サイトを生成するだけで配信しない")
+    parser.add_argument("--verbose", action="store_true", help="アクセスログを表示する")
+    args = parser.parse_args()
+
+    url_list = build_fixtures(args.dir, args.port)
+    print(f"テストサイトを '{args.dir}' に生成しました。")
+    print(f"URLリスト: {url_list}")
+    if args.build_only:
+        return 0
+
+    handler = SimpleHTTPRequestHandler if args.verbose else QuietHandler
+    server = ThreadingHTTPServer(("127.0.0.1", args.port), functools.partial(handler, directory=args.dir))
+    print(f"http://127.0.0.1:{args.port}/ で配信中です (Ctrl+C で終了)")
+    print(f"計測: python project-nowb-win.py --bench {url_list} --bench-output run.json")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
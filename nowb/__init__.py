@@ -0,0 +1 @@
+"""Project-NOWB 本体のパッケージ。"""
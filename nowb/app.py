@@ -0,0 +1,225 @@
+"""アプリケーションのエントリーポイント。QApplicationとスプラッシュスクリーンを用意してメインウィンドウを起動する。"""
+import sys
+import os
+from PyQt6.QtCore import Qt, QCoreApplication
+from PyQt6.QtWidgets import QApplication, QSplashScreen
+from PyQt6.QtGui import QColor, QPalette, QPainter, QPixmap, QIcon
+
+from .cli import parse_args, resolve_urls
+from .config import (DEBUG_ENV, DEFAULT_STALL_THRESHOLD_MS, HISTORY_FILE, SETTINGS_FILE, compile_adblock_rules,
+                     get_profile_dir, load_adblock_rules, profile_path, read_history_file, read_settings_file,
+                     resource_path, set_profile_dir)
+from .startup import startup_preloader, startup_profiler
+from .single_instance import claim_single_instance
+
+
+def main(argv=None):
+    startup_profiler.mark('imports')
+    args, qt_argv = parse_args(sys.argv if argv is None else argv)
+    # 相対パスのURLは作業ディレクトリを基準に解決する
+    urls = resolve_urls(args.urls)
+    if args.profile_dir:
+        set_profile_dir(args.profile_dir)
+    if args.bench:
+        # ベンチマークは画面を使わずに実行する
+        os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+    # QtWebEngineは二重起動の確認の後で読み込むため、QApplicationの作成前に必要な属性を設定しておく
+    QCoreApplication.setAttribute(Qt.ApplicationAttribute.AA_ShareOpenGLContexts)
+    # QApplicationインスタンスは一度だけ作成する必要がある。
+    app = QApplication(qt_argv)
+    startup_profiler.mark('qapplication')
+
+    # --- 二重起動の防止 ---
+    # 起動中のインスタンスがあればURLを渡して終了する。なければウィンドウを構築する前に待ち受けを始め、
+    # 構築中に起動された2つ目のインスタンスのURLは保留しておいて、ウィンドウができてから開く。
+    instance_server = None
+    if not args.bench and not args.new_instance:
+        instance_server = claim_single_instance(urls, args.private, get_profile_dir(), parent=app)
+        if instance_server is None:
+            sys.exit(0)
+        startup_profiler.mark('single_instance')
+
+    # QtWebEngineとウィンドウまわりの重いモジュールは二重起動の確認が済んでから読み込む
+    from PyQt6.QtWebEngineCore import QWebEngineProfile
+    from .stall_monitor import stall_monitor
+    from .theme import get_system_theme_mode
+    from .window import FullFeaturedBrowser
+
+    if get_profile_dir():
+        # Cookieやキャッシュもプロファイルディレクトリに保存する
+        profile = QWebEngineProfile.defaultProfile()
+        profile.setPersistentStoragePath(os.path.join(get_profile_dir(), "webengine"))
+        profile.setCachePath(os.path.join(get_profile_dir(), "webengine_cache"))
+
+    if args.bench:
+        from .bench import run_benchmark
+        sys.exit(run_benchmark(app, args))
+
+    # --- 初回起動チェック ---
+    if not os.path.exists(profile_path(SETTINGS_FILE)):
+        # 初回起動の場合、設定ダイアログを表示し、設定後にアプリを終了して再起動を促す
+        from .dialogs import handle_first_run
+        if handle_first_run():
+            sys.exit(0) # 正常終了
+        else:
+            sys.exit(1) # 設定保存に失敗した場合はエラー終了
+
+    # --- 設定・履歴・広告ブロックリストの先読み ---
+    # スプラッシュの表示やウィジェットの構築と並行して読み込み、最初に使うときに待ち合わせる。
+    # 設定のマイグレーションはダイアログを表示することがあるため、メインスレッドで行う。
+    startup_preloader.start({
+        'settings': lambda: read_settings_file(profile_path(SETTINGS_FILE)),
+        'history': lambda: read_history_file(profile_path(HISTORY_FILE)),
+        'adblock': lambda: compile_adblock_rules(load_adblock_rules()),
+    })
+
+    # --- スプラッシュスクリーンの設定 ---
+    pixmap = QPixmap(resource_path('browser_logo.png'))
+    if pixmap.isNull():
+        # ロゴ画像が見つからない場合のフォールバック
+        pixmap = QPixmap(400, 250)
+        pixmap.fill(QColor("#2d2d2d"))
+        painter = QPainter(pixmap)
+        font = painter.font()
+        font.setPointSize(24)
+        font.setBold(True)
+        painter.setFont(font)
+        painter.setPen(QColor("white"))
+        painter.drawText(pixmap.rect(), Qt.AlignmentFlag.AlignCenter, "Project-NOWB")
+        painter.end()
+
+    splash = QSplashScreen(pixmap)
+    splash.setWindowFlags(Qt.WindowType.SplashScreen | Qt.WindowType.WindowStaysOnTopHint)
+    splash.showMessage("Project-NOWB を起動しています...",
+                       Qt.AlignmentFlag.AlignBottom | Qt.AlignmentFlag.AlignCenter,
+                       Qt.GlobalColor.white)
+    splash.show()
+    app.processEvents() # スプラッシュスクリーンが確実に表示されるようにする
+    startup_profiler.splash = splash # 以降のフェーズの所要時間をスプラッシュスクリーンに表示する
+    startup_profiler.mark('splash')
+
+    # --- アプリケーションアイコンの設定 ---
+    app_icon = QIcon(resource_path('P-NOWB.ico'))
+    if not app_icon.isNull():
+        app.setWindowIcon(app_icon)
+    else:
+        print("警告: アプリケーションアイコン 'P-NOWB.ico' が見つかりませんでした。", file=sys.stderr)
+
+    # --- テーマ設定 ---
+    initial_theme = get_system_theme_mode()
+    if initial_theme == 'dark':
+        palette = QPalette()
+        palette.setColor(QPalette.ColorRole.Window, QColor(45, 45, 45))
+        palette.setColor(QPalette.ColorRole.WindowText, QColor(240, 240, 240))
+        palette.setColor(QPalette.ColorRole.Base, QColor(30, 30, 30))
+        palette.setColor(QPalette.ColorRole.AlternateBase, QColor(50, 50, 50))
+        palette.setColor(QPalette.ColorRole.Text, QColor(240, 240, 240))
+        palette.setColor(QPalette.ColorRole.Button, QColor(60, 60, 60))
+        palette.setColor(QPalette.ColorRole.ButtonText, QColor(240, 240, 240))
+        app.setPalette(palette)
+        app.setStyleSheet("""
+            QMenu {{ background-color: #282828; color: #F0F0F0; border: 1px solid #3A3A3A; }}
+            QMenu::item {{ padding: 5px 15px 5px 25px; }}
+            QMenu::item:selected {{ background-color: #0078D7; color: #FFFFFF; }}
+            QMenu::separator {{ height: 1px; background: #505050; margin: 5px 0px; }}
+            QTabWidget::pane {{
+                border: 1px solid #3A3A3A;
+                border-top: none;
+            }}
+            QTabBar::tab {{
+                background-color: #3C3C3C;
+                color: #F0F0F0;
+                border: 1px solid #3A3A3A;
+                border-bottom: none;
+                padding: 8px 16px;
+                margin-right: 1px;
+                border-top-left-radius: 8px;
+                border-top-right-radius: 8px;
+                width: 160px; /* タブの幅を固定 */
+                elide-mode: elide-right; /* はみ出したテキストを省略 */
+                text-align: left; /* テキストを左寄せ */
+            }}
+            QTabBar::tab:selected {{
+                background-color: #2D2D2D;
+                margin-bottom: -1px;
+                padding-bottom: 9px;
+            }}
+            QTabBar::tab:!selected:hover {{
+                background-color: #4C4C4C;
+            }}
+        """)
+
+    startup_profiler.mark('theme')
+
+    # --- メインウィンドウの作成と表示 ---
+    if args.private:
+        # --private の場合は通常のウィンドウを構築せず、プライベートウィンドウだけを開く
+        window = _open_private_only_window()
+        startup_profiler.mark('adblock')
+        startup_profiler.watch_first_paint(window)
+        window.show()
+        receiver = _private_launch_receiver(window)
+    else:
+        window = FullFeaturedBrowser() # 時間のかかる初期化処理
+        startup_profiler.watch_first_paint(window)
+        window.show()
+        # 広告ブロッカーの初期設定
+        window.setup_adblocker()
+        startup_profiler.mark('adblock')
+        receiver = window.open_external_urls
+
+    # 2つ目以降の起動から渡されたURLをこのウィンドウで開く (起動中に届いていたものも含む)
+    if instance_server is not None:
+        instance_server.connect_receiver(receiver)
+    if urls or args.private:
+        window.open_external_urls(urls)
+
+    startup_profiler.splash = None
+    splash.finish(window) # メインウィンドウが表示されたらスプラッシュスクリーンを閉じる
+
+    # --- UIスレッドの停止の監視 ---
+    # 起動処理の間はイベントループが回っていないため、ここから監視を始める
+    # 50msごとにUIスレッドへ問い合わせるため、開発時か設定で有効にした場合だけ監視する
+    if args.debug or os.environ.get(DEBUG_ENV) or window.settings.get('stall_monitor_enabled', False):
+        stall_monitor.start(window.settings.get('stall_threshold_ms', DEFAULT_STALL_THRESHOLD_MS))
+        app.aboutToQuit.connect(stall_monitor.stop)
+
+    sys.exit(app.exec())
+
+
+def _open_private_only_window():
+    """
+    --private で起動した場合のプライベートウィンドウを作成する。
+    設定と広告ブロックリストは先読みしたものを使う。設定のマイグレーションは次の通常の起動で行う。
+    """
+    from .webview import AdblockInterceptor
+    from .window import FullFeaturedBrowser
+    settings = startup_preloader.take('settings') or read_settings_file(profile_path(SETTINGS_FILE))
+    window = FullFeaturedBrowser(is_private=True, parent_settings=settings)
+    if settings.get('adblock_enabled', False):
+        window.adblock_interceptor = AdblockInterceptor(window, startup_preloader.take('adblock'))
+        window.private_profile.setUrlRequestInterceptor(window.adblock_interceptor)
+    return window
+
+
+def _private_launch_receiver(private_window):
+    """
+    プライベートウィンドウだけで起動した場合に、2つ目以降の起動から渡されたURLを受け取る関数を返す。
+    通常のウィンドウで開くよう渡されたURLは、そのとき初めて通常のウィンドウを構築して開く。
+    """
+    from .window import FullFeaturedBrowser
+    main_window = None
+
+    def receive(urls, private):
+        nonlocal main_window
+        if main_window is not None:
+            main_window.open_external_urls(urls, private)
+        elif private:
+            private_window.open_external_urls(urls)
+        else:
+            main_window = FullFeaturedBrowser()
+            main_window.show()
+            main_window.setup_adblocker()
+            main_window.open_external_urls(urls)
+    return receive
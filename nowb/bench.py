@@ -0,0 +1,219 @@
+"""
+画面を表示せずにページを読み込むベンチマーク (--bench)。
+URLごとの読み込み時間、Navigation Timing、ブロックしたリクエスト数、レンダラーのメモリ使用量をJSONで出力する。
+"""
+import sys
+import os
+import json
+import time
+import datetime
+from PyQt6.QtCore import QUrl, QTimer, pyqtSignal, QObject
+from PyQt6.QtWebEngineWidgets import QWebEngineView
+from PyQt6.QtWebEngineCore import QWebEngineProfile
+
+from .config import APP_VERSION, compile_adblock_rules, load_adblock_rules
+from .webview import AdblockInterceptor, CustomWebEnginePage, WebViewPool
+
+# loadイベントの処理が終わる前はloadEventEndが0なのでnullを返し、少し待って取り直す
+NAVIGATION_TIMING_JS = """
+(function() {
+    var nav = performance.getEntriesByType('navigation')[0];
+    if (!nav || nav.loadEventEnd === 0) return null;
+    return JSON.stringify({
+        ttfb_ms: nav.responseStart - nav.startTime,
+        response_end_ms: nav.responseEnd - nav.startTime,
+        dom_interactive_ms: nav.domInteractive - nav.startTime,
+        dom_content_loaded_ms: nav.domContentLoadedEventEnd - nav.startTime,
+        load_event_end_ms: nav.loadEventEnd - nav.startTime,
+        transfer_size: nav.transferSize,
+        resource_count: performance.getEntriesByType('resource').length,
+        dom_node_count: document.getElementsByTagName('*').length
+    });
+})();
+"""
+NAVIGATION_TIMING_RETRY_MS = 50
+NAVIGATION_TIMING_MAX_RETRIES = 20
+
+
+def read_url_list(path):
+    """1行に1つURLを書いたファイルを読み込む。空行と#で始まる行は無視する。"""
+    with open(path, 'r', encoding='utf-8') as f:
+        return [line.strip() for line in f if line.strip() and not line.lstrip().startswith('#')]
+
+
+def get_process_rss_kb(pid):
+    """プロセスの常駐メモリ(KB)を返す。psutilがなければLinuxの/procから読み、取得できなければNone。"""
+    if not pid:
+        return None
+    try:
+        import psutil
+        return psutil.Process(pid).memory_info().rss // 1024
+    except ImportError:
+        pass
+    except Exception:
+        return None
+    try:
+        with open(f"/proc/{pid}/status", 'r', encoding='utf-8') as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1])
+    except (OSError, ValueError, IndexError):
+        pass
+    return None
+
+
+class PageLoadBenchmark(QObject):
+    """
+    URLを1つずつ順番に読み込んで計測する。
+    fresh: URLごとに新しいビューを作成する / pooled: ブラウザと同じウォームプールからビューを取り出す。
+    読み込みが終わったビューはタブを閉じたときと同じように破棄する。
+    """
+    finished = pyqtSignal(dict)
+
+    def __init__(self, urls, mode="fresh", repeat=1, timeout_s=30.0, parent=None):
+        super().__init__(parent)
+        self.mode = mode
+        self.timeout_ms = int(timeout_s * 1000)
+        self.queue = [(run, url) for run in range(max(1, repeat)) for url in urls]
+        self.results = []
+        # 実行ごとに条件をそろえるため、キャッシュやCookieを残さないプロファイルを使う
+        self.profile = QWebEngineProfile(self)
+        self.interceptor = AdblockInterceptor(self, compile_adblock_rules(load_adblock_rules()))
+        self.interceptor.log_blocked = False # 標準出力にJSONを書き出すため
+        self.profile.setUrlRequestInterceptor(self.interceptor)
+        self.pool = WebViewPool(self._build_view, parent=self) if mode == "pooled" else None
+
+        self.timeout_timer = QTimer(self)
+        self.timeout_timer.setSingleShot(True)
+        self.timeout_timer.timeout.connect(lambda: self._finish_page(False, timed_out=True))
+        self.browser = None
+        self.current = None
+
+    def _build_view(self):
+        browser = QWebEngineView()
+        browser.setPage(CustomWebEnginePage(self.profile, browser))
+        return browser
+
+    def start(self):
+        if self.pool is not None:
+            self.pool.schedule_refill()
+        QTimer.singleShot(0, self._load_next)
+
+    def _load_next(self):
+        if not self.queue:
+            if self.pool is not None:
+                self.pool.clear()
+            # 破棄を予約したビューが消えてから終了を通知する
+            QTimer.singleShot(0, lambda: self.finished.emit(self._report()))
+            return
+        run, url = self.queue.pop(0)
+        self.browser = self.pool.checkout() if self.pool is not None else self._build_view()
+        self.browser.resize(1280, 800)
+        self.current = {
+            'url': url,
+            'run': run,
+            'start': time.perf_counter(),
+            'blocked_before': self.interceptor.blocked_count,
+            'retries': 0,
+        }
+        self.browser.loadFinished.connect(self._on_load_finished)
+        self.timeout_timer.start(self.timeout_ms)
+        self.browser.setUrl(QUrl.fromUserInput(url))
+
+    def _on_load_finished(self, ok):
+        if self.current is None or 'load_time_ms' in self.current:
+            return
+        if self.browser.url().toString() == "about:blank" and self.current['url'] != "about:blank":
+            return # プールでウォームアップ中だったabout:blankの読み込み完了
+        self.timeout_timer.stop()
+        self.current['load_time_ms'] = (time.perf_counter() - self.current['start']) * 1000
+        self.current['ok'] = ok
+        if not ok:
+            self._finish_page(False)
+            return
+        self._query_navigation_timing()
+
+    def _query_navigation_timing(self):
+        self.browser.page().runJavaScript(NAVIGATION_TIMING_JS, self._on_navigation_timing)
+
+    def _on_navigation_timing(self, result):
+        if self.current is None:
+            return
+        if result is None and self.current['retries'] < NAVIGATION_TIMING_MAX_RETRIES:
+            self.current['retries'] += 1
+            QTimer.singleShot(NAVIGATION_TIMING_RETRY_MS, self._query_navigation_timing)
+            return
+        try:
+            self.current['navigation'] = json.loads(result) if result else None
+        except ValueError:
+            self.current['navigation'] = None
+        self._finish_page(True)
+
+    def _finish_page(self, ok, timed_out=False):
+        current, browser = self.current, self.browser
+        if current is None:
+            return
+        self.current = None
+        self.browser = None
+        self.timeout_timer.stop()
+        entry = {
+            'url': current['url'],
+            'run': current['run'],
+            'ok': ok and current.get('ok', False),
+            'timed_out': timed_out,
+            'load_time_ms': round(current.get('load_time_ms', self.timeout_ms), 2),
+            'navigation': current.get('navigation'),
+            'blocked_requests': self.interceptor.blocked_count - current['blocked_before'],
+            'renderer_rss_kb': get_process_rss_kb(browser.page().renderProcessPid()),
+        }
+        self.results.append(entry)
+        status = "OK" if entry['ok'] else ("タイムアウト" if timed_out else "失敗")
+        print(f"[bench] {status} {entry['load_time_ms']:.0f} ms {entry['url']}", file=sys.stderr)
+        browser.loadFinished.disconnect(self._on_load_finished)
+        browser.stop()
+        browser.deleteLater()
+        QTimer.singleShot(0, self._load_next)
+
+    def _report(self):
+        return {
+            'timestamp': datetime.datetime.now().isoformat(),
+            'app_version': APP_VERSION,
+            'mode': self.mode,
+            'results': self.results,
+        }
+
+
+def run_benchmark(app, args):
+    """--bench の処理。イベントループを回して全URLを計測し、終了コードを返す。"""
+    try:
+        urls = read_url_list(args.bench)
+    except OSError as e:
+        print(f"URLリスト '{args.bench}' を読み込めませんでした: {e}", file=sys.stderr)
+        return 2
+    if not urls:
+        print(f"URLリスト '{args.bench}' にURLがありません。", file=sys.stderr)
+        return 2
+
+    benchmark = PageLoadBenchmark(urls, args.bench_mode, args.bench_repeat, args.bench_timeout)
+    report = {}
+
+    def on_finished(result):
+        report.update(result)
+        app.quit()
+
+    benchmark.finished.connect(on_finished)
+    benchmark.start()
+    app.exec()
+
+    text = json.dumps(report, indent=4, ensure_ascii=False)
+    if args.bench_output == "-":
+        print(text)
+    else:
+        try:
+            with open(args.bench_output, 'w', encoding='utf-8') as f:
+                f.write(text + "\n")
+        except IOError as e:
+            print(f"ベンチマーク結果の保存に失敗しました: {e}", file=sys.stderr)
+            return 2
+        print(f"ベンチマーク結果を '{os.path.abspath(args.bench_output)}' に保存しました。", file=sys.stderr)
+    return 0 if all(entry['ok'] for entry in report.get('results', [])) else 1
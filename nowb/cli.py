@@ -0,0 +1,76 @@
+"""コマンドライン引数の解析。起動スクリプトからも使うため、argparseとQtCore以外は読み込まない。"""
+import os
+import argparse
+from PyQt6.QtCore import QUrl
+
+BENCH_MODES = ("fresh", "pooled")
+# 次の引数を値として取るQtのオプション。argparseに渡すと値がURLとして扱われるため、先に取り除く
+QT_VALUE_OPTIONS = frozenset({
+    "style", "stylesheet", "platform", "platformpluginpath", "platformtheme", "plugin",
+    "qwindowgeometry", "qwindowicon", "qwindowtitle", "display", "geometry", "session",
+})
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="project-nowb-win", description="Project-NOWB ウェブブラウザ")
+    parser.add_argument("urls", nargs="*", metavar="URL", help="新しいタブで開くURLまたはファイル")
+    parser.add_argument("--private", action="store_true", help="プライベートウィンドウで開く")
+    parser.add_argument("--profile-dir", metavar="DIR",
+                        help="設定・履歴・キャッシュなどを保存するディレクトリ (既定: 作業ディレクトリ)")
+    parser.add_argument("--new-instance", action="store_true",
+                        help="起動中のインスタンスにURLを渡さず、新しいインスタンスを起動する")
+    parser.add_argument("--debug", action="store_true",
+                        help="UIスレッドの停止の監視など、開発用の診断機能を有効にする (環境変数 NOWB_DEBUG=1 と同じ)")
+    parser.add_argument("--startup-profile", action="store_true",
+                        help="起動処理をcProfileで計測し、startup_profile.prof に保存する")
+
+    bench = parser.add_argument_group("ベンチマーク", "画面を表示せずにページを読み込み、読み込み時間などをJSONで出力する")
+    bench.add_argument("--bench", metavar="URL_LIST", help="1行に1つURLを書いたファイル (#で始まる行は無視)")
+    bench.add_argument("--bench-output", metavar="FILE", default="-", help="結果のJSONの出力先 (既定: 標準出力)")
+    bench.add_argument("--bench-mode", choices=BENCH_MODES, default="fresh",
+                       help="fresh: URLごとに新しいビューを作成する / pooled: ウォームプールのビューを使う (既定: fresh)")
+    bench.add_argument("--bench-repeat", type=int, default=1, metavar="N", help="各URLを読み込む回数 (既定: 1)")
+    bench.add_argument("--bench-timeout", type=float, default=30.0, metavar="SEC",
+                       help="1ページの読み込みを待つ秒数 (既定: 30)")
+    return parser
+
+
+def parse_args(argv):
+    """
+    コマンドライン引数を解析し、(引数, QApplicationに渡す引数) を返す。
+    解析できないオプション (-style など) はQtのオプションとしてQApplicationに渡す。
+    """
+    qt_argv, rest = split_qt_options(argv[1:])
+    args, unknown = build_parser().parse_known_args(rest)
+    return args, argv[:1] + qt_argv + unknown
+
+
+def split_qt_options(argv):
+    """値を取るQtのオプション (-style fusion など) をその値と一緒に取り出し、(Qtのオプション, 残り) を返す。"""
+    qt_argv = []
+    rest = []
+    arguments = iter(argv)
+    for arg in arguments:
+        name = arg.lstrip("-")
+        if arg.startswith("-") and arg != "--" and name in QT_VALUE_OPTIONS:
+            qt_argv.append(arg)
+            value = next(arguments, None)
+            if value is not None:
+                qt_argv.append(value)
+        elif arg == "--":
+            # これ以降はすべてURLとして扱う
+            rest.append(arg)
+            rest.extend(arguments)
+        else:
+            rest.append(arg)
+    return qt_argv, rest
+
+
+def resolve_urls(urls):
+    """コマンドラインのURLを解決する。相対パスのファイルは作業ディレクトリを基準にする。"""
+    resolved = []
+    for url in urls:
+        qurl = QUrl.fromUserInput(url, os.getcwd(), QUrl.UserInputResolutionOption.AssumeLocalFile)
+        if qurl.isValid():
+            resolved.append(qurl.toString())
+    return resolved
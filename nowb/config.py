@@ -0,0 +1,150 @@
+"""
+バージョン・定数の定義と、設定・履歴・広告ブロックリストのファイル入出力。
+二重起動の確認より前に読み込まれるため、QtWebEngineのモジュールは読み込まない。
+"""
+import sys
+import os
+import json
+import re
+from PyQt6.QtCore import QSize, QEvent
+
+# --- バージョン定数 ---
+APP_VERSION = "V1.0.0-Beta1-Build-7" # アプリケーションのバージョン
+SETTINGS_VERSION = "1.1" # 設定ファイルのバージョン
+
+# --- 定数定義 ---
+ADBLOCK_RULES_FILE = "adblock_list.txt"
+SETTINGS_FILE = 'project_nowb_settings.json'
+HISTORY_FILE = 'project_nowb_history.json'
+DEFAULT_ADBLOCK_RULES = [
+    "doubleclick.net", "adservice.google.", "googlesyndication.com",
+    "googletagservices.com", "google-analytics.com", "scorecardresearch.com",
+    "/ad-", "/ads/", "/advert", "ad.doubleclick.net"
+]
+DEFAULT_WEBVIEW_POOL_SIZE = 2 # ウォームプールに保持するビューの数
+WEBVIEW_POOL_REFILL_DELAY_MS = 500 # プール補充までの待ち時間 (連続したタブ作成を邪魔しないため)
+WEBVIEW_POOL_MEMORY_RETRY_MS = 5000 # メモリ逼迫でプールを空にしたとき、補充を再び試みるまでの間隔
+DEFAULT_PRELOAD_CONCURRENCY = 2 # タブグループを開いたときに同時に読み込むタブの数
+PRELOAD_MEMORY_RETRY_MS = 2000 # メモリ逼迫で先読みを止めたとき、再開を試みるまでの間隔
+PRELOAD_TAB_TIMEOUT_MS = 30 * 1000 # 先読み中のタブの読み込みが終わらないとき、次のタブに枠を譲るまでの時間
+DEFAULT_WEB_PANEL_DISCARD_TIMEOUT_MS = 5 * 60 * 1000 # 非表示のウェブパネルを破棄するまでの時間
+UI_FRAME_INTERVAL_MS = 16 # UI更新をまとめて反映する間隔 (約60fps)
+MEMORY_PRESSURE_THRESHOLD = 0.10 # 空きメモリがこの割合を下回ったらメモリ逼迫とみなす
+MEMORY_PRESSURE_THRESHOLD_STEP = 0.05 # レンダラーがOOMで落ちるたびにしきい値を引き上げる量
+MEMORY_PRESSURE_THRESHOLD_MAX = 0.30
+DEBUG_LEAKS_ENV = "NOWB_DEBUG_LEAKS" # 閉じたタブの解放チェックを有効にする環境変数
+DEBUG_ENV = "NOWB_DEBUG" # UIスレッドの停止の監視など、開発用の診断機能を有効にする環境変数
+SCROLL_SNAPSHOT_SCRIPT_NAME = "project-nowb-scroll-snapshot"
+SCROLL_SNAPSHOT_PREFIX = "__nowb_scroll__:" # スクロール位置の報告に使うコンソールメッセージの接頭辞
+# ページを離れるとき・非表示になるときにスクロール位置をコンソール経由で報告するスクリプト
+SCROLL_SNAPSHOT_JS = """
+(function() {
+    var log = console.log.bind(console); // ページ側でconsole.logが差し替えられても報告できるようにする
+    function report() {
+        log('%s' + window.scrollX + ',' + window.scrollY + ',' + location.href);
+    }
+    window.addEventListener('pagehide', report);
+    document.addEventListener('visibilitychange', function() {
+        if (document.visibilityState === 'hidden') report();
+    });
+})();
+""" % SCROLL_SNAPSHOT_PREFIX
+STARTUP_REPORT_FILE = 'startup_report.json' # 起動フェーズごとの所要時間のレポート
+STARTUP_PROFILE_FILE = 'startup_profile.prof' # --startup-profile 指定時のcProfileの出力
+THUMBNAIL_SIZE = QSize(320, 200) # タブのサムネイルの最大サイズ
+THUMBNAIL_JPEG_QUALITY = 80
+THUMBNAIL_MEMORY_LIMIT = 16 * 1024 * 1024 # メモリ上に保持するサムネイルの合計サイズ (バイト)
+THUMBNAIL_DISK_MAX_FILES = 500 # ディスクキャッシュに残すサムネイルの数
+THUMBNAIL_FLUSH_INTERVAL_MS = 30 * 1000 # 新しいサムネイルをディスクにまとめて書き出すまでの最大の待ち時間
+STALL_PING_INTERVAL_MS = 50 # UIスレッドの応答を確認する間隔
+DEFAULT_STALL_THRESHOLD_MS = 200 # 応答がこれより遅れたらUIの停止として記録する
+STALL_SAMPLE_INTERVAL_MS = 20 # 停止中にUIスレッドのスタックを採取する間隔
+STALL_MAX_RECORDS = 500 # 保持する停止の記録の数 (古いものから捨てる)
+STALL_IGNORE_ABOVE_S = 120 # これより長い停止はスリープからの復帰などとみなして記録しない
+PERF_CAPTURE_DIR = 'perf_captures' # パフォーマンスキャプチャの保存先
+DEFAULT_CAPTURE_SECONDS = 10
+PERF_CAPTURE_SAMPLE_INTERVAL_MS = 10 # ワーカースレッドのスタックを採取する間隔
+PERF_CAPTURE_TRACEMALLOC_FRAMES = 10 # tracemallocで記録するスタックの深さ
+# スリープ判定とスリープからの復帰に使うユーザー入力イベント
+USER_INPUT_EVENTS = frozenset({
+    QEvent.Type.KeyPress, QEvent.Type.MouseButtonPress, QEvent.Type.MouseMove,
+    QEvent.Type.Wheel, QEvent.Type.TouchBegin,
+})
+
+# 起動時の作業ディレクトリ。ロゴやアイコンはここから読み込む
+LAUNCH_DIR = os.getcwd()
+_profile_dir = None
+
+def resource_path(name):
+    """ロゴやアイコンなど、アプリケーションに同梱されるファイルのパスを返す。"""
+    return os.path.join(LAUNCH_DIR, name)
+
+def set_profile_dir(path):
+    """
+    設定・履歴・広告ブロックリストなどを保存するプロファイルディレクトリを指定する。
+    作業ディレクトリは変更しない。これらのファイルのパスはprofile_pathで求める。
+    """
+    global _profile_dir
+    _profile_dir = os.path.abspath(path)
+    os.makedirs(_profile_dir, exist_ok=True)
+
+def get_profile_dir():
+    """--profile-dir で指定されたプロファイルディレクトリ (絶対パス) を返す。指定がなければNone。"""
+    return _profile_dir
+
+def profile_path(name):
+    """設定や履歴などのデータファイルのパスを返す。プロファイルディレクトリの指定がなければ作業ディレクトリからの相対パス。"""
+    return os.path.join(_profile_dir, name) if _profile_dir else name
+
+def load_adblock_rules():
+    """広告ブロックリストをファイルから読み込む共通関数。"""
+    rules_file = profile_path(ADBLOCK_RULES_FILE)
+    if not os.path.exists(rules_file):
+        print(f"警告: 広告ブロックリスト '{rules_file}' が見つかりません。デフォルトルールを使用します。", file=sys.stderr)
+        return DEFAULT_ADBLOCK_RULES
+    try:
+        with open(rules_file, 'r', encoding='utf-8') as f:
+            return [line.strip() for line in f if line.strip() and not line.startswith('#')]
+    except Exception as e:
+        print(f"エラー: 広告ブロックリストの読み込みに失敗しました: {e}", file=sys.stderr)
+        return []
+
+def compile_adblock_rules(rules):
+    """
+    ブロックルール(URLに含まれる文字列)を1つの正規表現にまとめ、(ルール, パターン)を返す。
+    リクエストごとにルールを1つずつ調べる代わりに、1回の検索で判定できるようにする。
+    """
+    rules = [rule for rule in rules if rule]
+    pattern = re.compile("|".join(re.escape(rule) for rule in rules)) if rules else None
+    return rules, pattern
+
+def read_settings_file(path):
+    """設定ファイルを読み込んで返す。ファイルがないか壊れている場合は空の辞書を返す。"""
+    if os.path.exists(path):
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except json.JSONDecodeError:
+            print("設定ファイルが破損しています。新しく作成します。", file=sys.stderr)
+    return {}
+
+def read_history_file(path):
+    """履歴ファイルを読み込んで返す。読み込めない場合は空のリストを返す。"""
+    if os.path.exists(path):
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (json.JSONDecodeError, IOError) as e:
+            print(f"履歴ファイルの読み込みに失敗しました: {e}", file=sys.stderr)
+    return []
+
+def save_adblock_rules(rules):
+    """広告ブロックリストをファイルに保存する共通関数。"""
+    try:
+        with open(profile_path(ADBLOCK_RULES_FILE), 'w', encoding='utf-8') as f:
+            f.write("# Project-NOWB AdBlock Rules\n")
+            f.write("\n".join(rules))
+    except Exception as e:
+        print(f"エラー: 広告ブロックリストの保存に失敗しました: {e}", file=sys.stderr)
+        return False
+    return True
@@ -0,0 +1,362 @@
+"""初回起動時のセットアップダイアログと設定ダイアログ。"""
+import json
+from PyQt6.QtCore import Qt
+from PyQt6.QtWidgets import (QLineEdit, QInputDialog, QComboBox, QMessageBox, QLabel, QCheckBox, QDialog, QGridLayout,
+                             QListWidget, QSpinBox, QPushButton, QVBoxLayout, QHBoxLayout, QGroupBox, QPlainTextEdit)
+
+from .config import APP_VERSION, SETTINGS_FILE, SETTINGS_VERSION, load_adblock_rules, profile_path, save_adblock_rules
+
+class InitialSetupDialog(QDialog):
+    """
+    初回起動時に表示される設定ダイアログ。
+    ホーム画面URLとデフォルト検索エンジンを設定。
+    """
+    def __init__(self, parent=None, initial_settings=None):
+        super().__init__(parent)
+        self.setWindowTitle("Project-NOWB 初回設定")
+        self.setFixedSize(450, 250) # 初回設定なのでコンパクトに
+
+        self.initial_settings = initial_settings or {}
+        self.init_ui()
+
+    def init_ui(self):
+        main_layout = QVBoxLayout(self)
+
+        # ホームページ設定
+        home_group = QGroupBox("ホームページ設定")
+        home_layout = QVBoxLayout()
+        home_layout.addWidget(QLabel("起動時に表示するURL:"))
+        self.home_url_input = QLineEdit(self.initial_settings.get('home_url', 'https://start.popmix-os.net'))
+        home_layout.addWidget(self.home_url_input)
+        home_group.setLayout(home_layout)
+        main_layout.addWidget(home_group)
+
+        # 検索エンジン設定
+        search_group = QGroupBox("デフォルト検索エンジン")
+        search_layout = QVBoxLayout()
+        search_layout.addWidget(QLabel("使用する検索エンジン:"))
+        self.search_engine_combo = QComboBox()
+        self.search_engine_options = {
+            "Google": "https://www.google.com/search?q=",
+            "Bing": "https://www.bing.com/search?q=",
+            "DuckDuckGo": "https://duckduckgo.com/?q=",
+        }
+        self.search_engine_combo.addItems(self.search_engine_options.keys())
+        # デフォルト選択
+        default_engine = self.initial_settings.get('search_engine_name', 'Google')
+        if default_engine in self.search_engine_options:
+            self.search_engine_combo.setCurrentText(default_engine)
+        search_layout.addWidget(self.search_engine_combo)
+        search_group.setLayout(search_layout)
+        main_layout.addWidget(search_group)
+
+        # OKボタン
+        button_layout = QHBoxLayout()
+        ok_button = QPushButton("設定を保存して開始")
+        ok_button.clicked.connect(self.accept)
+        button_layout.addStretch(1)
+        button_layout.addWidget(ok_button)
+        main_layout.addLayout(button_layout)
+
+    def get_settings(self):
+        """ダイアログから設定を取得して返す"""
+        selected_engine_name = self.search_engine_combo.currentText()
+        return {
+            'home_url': self.home_url_input.text(),
+            'search_engine_name': selected_engine_name,
+            'search_engine_url': self.search_engine_options[selected_engine_name]
+        }
+
+class SettingsDialog(QDialog):
+    """
+    設定画面を実装するための専用ダイアログ。
+    """
+    def __init__(self, parent=None, settings_data=None, browser_version="未設定"): # browser_version引数を追加
+        super().__init__(parent)
+        self.setWindowTitle("Project-NOWB 設定")
+        self.setFixedSize(600, 750) # ウィンドウサイズを調整
+        self.settings_data = settings_data or {}
+        self.browser_version = browser_version # バージョン情報をインスタンス変数に保存
+        self.init_ui()
+
+    def init_ui(self):
+        main_layout = QGridLayout(self)
+
+        # --- ホームページ設定グループ ---
+        home_group = QGroupBox("ホームページ設定")
+        home_layout = QVBoxLayout()
+        self.home_url_input = QLineEdit(self.settings_data.get('home_url', 'https://start.popmix-os.net'))
+        home_layout.addWidget(QLabel("URL:"))
+        home_layout.addWidget(self.home_url_input)
+        home_group.setLayout(home_layout)
+        main_layout.addWidget(home_group, 0, 0)
+
+        # --- 集中ポーション (ブロックサイト) グループ ---
+        blocked_group = QGroupBox("集中ポーション (ブロックサイト)")
+        blocked_layout = QVBoxLayout()
+        
+        self.blocked_list = QListWidget()
+        self.blocked_list.setSelectionMode(QListWidget.SelectionMode.SingleSelection)
+        self.blocked_list.addItems(self.settings_data.get('blocked_sites', []))
+        
+        self.add_blocked_button = QPushButton("追加")
+        self.add_blocked_button.clicked.connect(self.add_blocked_site)
+        self.remove_blocked_button = QPushButton("削除")
+        self.remove_blocked_button.clicked.connect(self.remove_blocked_site)
+        
+        button_layout = QHBoxLayout()
+        button_layout.addWidget(self.add_blocked_button)
+        button_layout.addWidget(self.remove_blocked_button)
+        
+        blocked_layout.addWidget(self.blocked_list)
+        blocked_layout.addLayout(button_layout)
+        blocked_group.setLayout(blocked_layout)
+        main_layout.addWidget(blocked_group, 1, 0)
+        
+        # --- 検索エンジン設定グループ ---
+        search_group = QGroupBox("検索エンジン設定")
+        search_layout = QVBoxLayout()
+        self.search_engine_combo = QComboBox()
+        self.search_engine_combo.addItems(self.settings_data.get('search_engines', {}).keys())
+        # 現在のデフォルト検索エンジンを設定
+        current_default_engine_name = next((name for name, url in self.settings_data.get('search_engines', {}).items() if url == self.settings_data.get('current_search_engine_url')), "Google")
+        self.search_engine_combo.setCurrentText(current_default_engine_name)
+
+        search_layout.addWidget(QLabel("デフォルト検索エンジン:"))
+        search_layout.addWidget(self.search_engine_combo)
+        search_group.setLayout(search_layout)
+        main_layout.addWidget(search_group, 0, 1)
+
+        # --- お気に入りサイト管理グループ ---
+        favorites_group = QGroupBox("お気に入りサイト管理")
+        favorites_layout = QVBoxLayout()
+        
+        self.favorites_list = QListWidget()
+        for name, url in self.settings_data.get('favorite_sites', {}).items():
+            self.favorites_list.addItem(f"{name}: {url}")
+            
+        self.add_fav_button = QPushButton("追加")
+        self.add_fav_button.clicked.connect(self.add_favorite_site)
+        self.remove_fav_button = QPushButton("削除")
+        self.remove_fav_button.clicked.connect(self.remove_favorite_site)
+        
+        fav_button_layout = QHBoxLayout()
+        fav_button_layout.addWidget(self.add_fav_button)
+        fav_button_layout.addWidget(self.remove_fav_button)
+        
+        favorites_layout.addWidget(self.favorites_list)
+        favorites_layout.addLayout(fav_button_layout)
+        favorites_group.setLayout(favorites_layout)
+        main_layout.addWidget(favorites_group, 1, 1)
+        
+        # --- UI/カスタマイズ設定グループ ---
+        ui_group = QGroupBox("UI/カスタマイズ設定")
+        ui_layout = QGridLayout()
+
+        # カスタムCSS設定
+        self.custom_css_input = QPlainTextEdit(self.settings_data.get('custom_css', ''))
+        self.custom_css_input.setPlaceholderText("ここにカスタムCSSを入力してください。例: body { background-color: #f0f0f0; }")
+        ui_layout.addWidget(QLabel("カスタムCSS:"), 0, 0, 1, 3)
+        ui_layout.addWidget(self.custom_css_input, 1, 0, 1, 3)
+        
+        # セッション復元設定
+        self.restore_session_checkbox = QCheckBox("起動時に前回のセッションを復元する")
+        self.restore_session_checkbox.setChecked(self.settings_data.get('restore_last_session', True))
+        self.restore_session_checkbox.setToolTip("このオプションを有効にすると、次回起動時に最後に開いていたタブが復元されます。")
+        ui_layout.addWidget(self.restore_session_checkbox, 2, 0, 1, 3)
+
+        # 自動スリープモード設定
+        sleep_group_layout = QHBoxLayout()
+        self.sleep_mode_checkbox = QCheckBox("自動スリープモードを有効にする")
+        self.sleep_mode_checkbox.setChecked(self.settings_data.get('sleep_mode_enabled', True))
+        self.sleep_mode_checkbox.setToolTip("このオプションを有効にすると、指定した時間操作がない場合にタブがスリープ状態になります。")
+
+        self.sleep_time_spinbox = QSpinBox()
+        self.sleep_time_spinbox.setRange(1, 120) # 1分から120分
+        current_interval_min = self.settings_data.get('sleep_mode_interval', 300000) // 60000
+        self.sleep_time_spinbox.setValue(current_interval_min)
+        self.sleep_time_spinbox.setToolTip("無操作状態がこの時間続くとスリープします。")
+
+        sleep_group_layout.addWidget(self.sleep_mode_checkbox)
+        sleep_group_layout.addWidget(self.sleep_time_spinbox)
+        sleep_group_layout.addWidget(QLabel("分間無操作でスリープ"))
+        sleep_group_layout.addStretch(1)
+        self.sleep_time_spinbox.setEnabled(self.sleep_mode_checkbox.isChecked())
+        self.sleep_mode_checkbox.toggled.connect(self.sleep_time_spinbox.setEnabled)
+        ui_layout.addLayout(sleep_group_layout, 3, 0, 1, 3)
+
+        # UIリセットボタン
+        self.reset_ui_button = QPushButton("UIをデフォルトに戻す")
+        self.reset_ui_button.setToolTip("ランダムテーマなどで変更されたUIを、現在の設定に基づいた状態に戻します。")
+        # 親ウィジェット(FullFeaturedBrowser)にリセットメソッドがあれば接続する
+        if hasattr(self.parent(), 'reset_ui_to_defaults'):
+            self.reset_ui_button.clicked.connect(lambda: self.parent().reset_ui_to_defaults(silent=False))
+        ui_layout.addWidget(self.reset_ui_button, 4, 0, 1, 3)
+
+        ui_group.setLayout(ui_layout)
+        main_layout.addWidget(ui_group, 2, 0, 1, 2)
+
+        # --- 広告ブロッカー設定グループ ---
+        adblock_group = QGroupBox("広告ブロッカー設定")
+        adblock_layout = QVBoxLayout()
+        
+        self.adblock_checkbox = QCheckBox("広告ブロッカーを有効にする")
+        self.adblock_checkbox.setChecked(self.settings_data.get('adblock_enabled', True))
+        self.adblock_checkbox.setToolTip("一般的な広告やトラッカーをブロックします。変更は即時反映されます。")
+        adblock_layout.addWidget(self.adblock_checkbox)
+
+        adblock_layout.addWidget(QLabel("ブロックルール (1行に1ルール):"))
+        self.adblock_rules_edit = QPlainTextEdit()
+        self.adblock_rules_edit.setPlaceholderText("例: doubleclick.net")
+        adblock_rules = load_adblock_rules()
+        self.adblock_rules_edit.setPlainText("\n".join(adblock_rules))
+        self.adblock_rules_edit.setFixedHeight(100) # 高さを固定
+        adblock_layout.addWidget(self.adblock_rules_edit)
+
+        adblock_group.setLayout(adblock_layout)
+        main_layout.addWidget(adblock_group, 3, 0, 1, 2)
+
+        # --- OK/キャンセルボタン ---
+        button_box = QHBoxLayout()
+        ok_button = QPushButton("OK")
+        ok_button.clicked.connect(self.accept)
+        cancel_button = QPushButton("キャンセル")
+        cancel_button.clicked.connect(self.reject)
+        button_box.addStretch(1)
+        button_box.addWidget(ok_button)
+        button_box.addWidget(cancel_button)
+        main_layout.addLayout(button_box, 5, 0, 1, 2)
+
+        # --- バージョン情報表示 (最下部に配置) ---
+        version_label = QLabel(f"バージョン: **Project-NOWB {self.browser_version}**")
+        version_label.setAlignment(Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignBottom) # 右下寄せ
+        main_layout.addWidget(version_label, 6, 0, 1, 2)
+
+    def accept(self):
+        """OKボタンが押されたときの処理。ルールを保存してからダイアログを閉じる。"""
+        new_rules = self.adblock_rules_edit.toPlainText().strip().split('\n')
+        if not save_adblock_rules(new_rules):
+            QMessageBox.warning(self, "保存エラー", "広告ブロックルールの保存に失敗しました。")
+        
+        super().accept()
+
+    def add_blocked_site(self):
+        text, ok = QInputDialog.getText(self, "ブロックサイトの追加", "ブロックするURLを入力してください (例: twitter.com):")
+        if ok and text:
+            self.blocked_list.addItem(text)
+    
+    def remove_blocked_site(self):
+        selected_items = self.blocked_list.selectedItems()
+        if not selected_items:
+            return
+        for item in selected_items:
+            self.blocked_list.takeItem(self.blocked_list.row(item))
+
+    def add_favorite_site(self):
+        name, ok_name = QInputDialog.getText(self, "お気に入りの追加", "名前:")
+        if not ok_name or not name: return
+        url, ok_url = QInputDialog.getText(self, "お気に入りの追加", "URL:")
+        if not ok_url or not url: return
+        self.favorites_list.addItem(f"{name}: {url}")
+
+    def remove_favorite_site(self):
+        selected_items = self.favorites_list.selectedItems()
+        if not selected_items:
+            return
+        for item in selected_items:
+            self.favorites_list.takeItem(self.favorites_list.row(item))
+
+    def get_settings(self):
+        """ダイアログから設定を取得して返す"""
+        new_blocked_sites = [self.blocked_list.item(i).text() for i in range(self.blocked_list.count())]
+        new_favorites = {}
+        for i in range(self.favorites_list.count()):
+            item_text = self.favorites_list.item(i).text()
+            if ': ' in item_text:
+                name, url = item_text.split(": ", 1)
+                new_favorites[name] = url
+            else:
+                new_favorites[item_text] = item_text # 名前とURLが同じ場合
+        
+        selected_engine_name = self.search_engine_combo.currentText()
+        # search_engines辞書からURLを取得し、新しい設定として返す
+        search_engines_data = self.settings_data.get('search_engines', {
+            "Google": "https://www.google.com/search?q=",
+            "Bing": "https://www.bing.com/search?q=",
+            "DuckDuckGo": "https://duckduckgo.com/?q=",
+        })
+        selected_engine_url = search_engines_data.get(selected_engine_name, "https://www.google.com/search?q=")
+
+        return {
+            'home_url': self.home_url_input.text(),
+            'blocked_sites': new_blocked_sites,
+            'search_engine_name': selected_engine_name, # 新しく選択された検索エンジンの名前
+            'current_search_engine_url': selected_engine_url, # 新しく選択された検索エンジンのURL
+            'favorite_sites': new_favorites,
+            'custom_css': self.custom_css_input.toPlainText(),
+            'restore_last_session': self.restore_session_checkbox.isChecked(),
+            'adblock_enabled': self.adblock_checkbox.isChecked(),
+            'sleep_mode_enabled': self.sleep_mode_checkbox.isChecked(),
+            'sleep_mode_interval': self.sleep_time_spinbox.value() * 60000, # 分をミリ秒に変換
+        }
+
+def handle_first_run():
+    """初回起動時の設定を行い、設定ファイルを生成する。"""
+    settings_file = profile_path(SETTINGS_FILE)
+    
+    # デフォルト設定
+    settings_data = {
+        'settings_version': SETTINGS_VERSION,
+        'app_version': APP_VERSION,
+        'first_run_completed': False,
+        'home_url': 'https://start.popmix-os.net',
+        'search_engines': {
+            "Google": "https://www.google.com/search?q=",
+            "Bing": "https://www.bing.com/search?q=",
+            "DuckDuckGo": "https://duckduckgo.com/?q=",
+        },
+        'current_search_engine_url': "https://www.google.com/search?q=",
+        'search_engine_name': 'Google',
+        'blocked_sites': ['twitter.com', 'facebook.com', 'tiktok.com'],
+        'favorite_sites': {
+            "Popmix-OS Start": "https://start.popmix-os.net",
+            "GitHub": "https://github.com",
+            "YouTube": "http://youtube.com",
+            "Wikipedia": "https://www.wikipedia.org"
+        },
+        'custom_css': '',
+        'window_size': [1024, 768],
+        'window_pos': [100, 100],
+        'web_panel_url': 'https://www.bing.com/chat',
+        'web_panel_visible': False,
+        'splitter_sizes': [800, 250],
+        'adblock_enabled': True,
+        'restore_last_session': True,
+        'last_session': [],
+        'sleep_mode_enabled': True,
+        'sleep_mode_interval': 300000, # 5分 (ミリ秒)
+    }
+
+    initial_dialog_settings = {
+        'home_url': settings_data['home_url'],
+        'search_engine_name': settings_data['search_engine_name']
+    }
+
+    # 親ウィンドウなしでダイアログを表示
+    dialog = InitialSetupDialog(None, initial_dialog_settings)
+    if dialog.exec():
+        new_settings = dialog.get_settings()
+        settings_data.update(new_settings)
+        settings_data['first_run_completed'] = True
+        QMessageBox.information(None, "設定完了", "初回設定が完了しました。アプリケーションを終了しますので、再度起動してください。")
+    else:
+        settings_data['first_run_completed'] = True
+        QMessageBox.warning(None, "警告", "設定がキャンセルされたため、デフォルト設定で起動します。アプリケーションを終了しますので、再度起動してください。")
+
+    try:
+        with open(settings_file, 'w', encoding='utf-8') as f:
+            json.dump(settings_data, f, indent=4, ensure_ascii=False)
+        return True
+    except IOError as e:
+        QMessageBox.critical(None, "エラー", f"設定ファイルの保存に失敗しました: {e}")
+        return False
@@ -0,0 +1,257 @@
+"""ダウンロードマネージャー。"""
+import time
+import os
+from PyQt6.QtCore import QUrl, QSize, QStandardPaths
+from PyQt6.QtWidgets import (QProgressBar, QFileDialog, QLabel, QWidget, QDialog, QListWidget, QPushButton,
+                             QVBoxLayout, QHBoxLayout, QListWidgetItem, QStyle)
+
+from PyQt6.QtWebEngineCore import QWebEngineDownloadRequest
+from PyQt6.QtGui import QDesktopServices
+from .theme import qta, icon_cache
+
+class DownloadItemWidget(QWidget):
+    """個々のダウンロードアイテムを表示・管理するウィジェット。"""
+    def __init__(self, download_request, parent=None):
+        super().__init__(parent)
+        self.download_request = download_request
+        self.is_paused = False
+        self.last_update_time = time.time()
+        self.last_bytes_received = 0
+
+        self.init_ui()
+        self.setup_connections()
+        self.update_state(self.download_request.state())
+        # Manually trigger an initial progress update
+        self.update_progress(self.download_request.receivedBytes(), self.download_request.totalBytes())
+
+    def init_ui(self):
+        layout = QHBoxLayout(self)
+        layout.setContentsMargins(10, 5, 10, 5)
+        layout.setSpacing(15)
+
+        # ファイルアイコン
+        file_icon_label = QLabel()
+        if qta:
+            icon = icon_cache.get('fa5s.file-download', color='gray', size=32)
+        else:
+            icon = self.style().standardIcon(QStyle.StandardPixmap.SP_FileIcon)
+        file_icon_label.setPixmap(icon.pixmap(QSize(32, 32)))
+        layout.addWidget(file_icon_label)
+
+        # ファイル情報エリア
+        info_layout = QVBoxLayout()
+        info_layout.setSpacing(2)
+        self.file_name_label = QLabel(f"<b>{os.path.basename(self.download_request.downloadFileName())}</b>")
+        self.file_name_label.setWordWrap(True)
+        self.status_label = QLabel("準備中...")
+        self.status_label.setStyleSheet("color: gray;")
+        info_layout.addWidget(self.file_name_label)
+        info_layout.addWidget(self.status_label)
+        
+        # プログレスバー
+        self.progress_bar = QProgressBar()
+        self.progress_bar.setValue(0)
+        self.progress_bar.setFixedHeight(8)
+        self.progress_bar.setTextVisible(False)
+        info_layout.addWidget(self.progress_bar)
+
+        layout.addLayout(info_layout, 1)
+
+        # ボタンエリア
+        self.button_layout = QHBoxLayout()
+        self.button_layout.setContentsMargins(0,0,0,0)
+        self.button_layout.setSpacing(5)
+        self.pause_resume_button = QPushButton()
+        if qta: self.pause_resume_button.setIcon(icon_cache.get('fa5s.pause', color='gray'))
+        self.pause_resume_button.setToolTip("一時停止")
+        self.pause_resume_button.setFixedSize(28, 28)
+        self.pause_resume_button.setFlat(True)
+
+        self.cancel_button = QPushButton()
+        if qta: self.cancel_button.setIcon(icon_cache.get('fa5s.times', color='gray'))
+        self.cancel_button.setToolTip("キャンセル")
+        self.cancel_button.setFixedSize(28, 28)
+        self.cancel_button.setFlat(True)
+
+        self.open_folder_button = QPushButton()
+        if qta: self.open_folder_button.setIcon(icon_cache.get('fa5s.folder-open', color='gray'))
+        self.open_folder_button.setToolTip("フォルダを開く")
+        self.open_folder_button.setFixedSize(28, 28)
+        self.open_folder_button.setVisible(False)
+        self.open_folder_button.setFlat(True)
+
+        self.button_layout.addWidget(self.pause_resume_button)
+        self.button_layout.addWidget(self.cancel_button)
+        self.button_layout.addWidget(self.open_folder_button)
+        
+        layout.addLayout(self.button_layout)
+
+    def setup_connections(self):
+        # The 'downloadProgress' signal seems to be unavailable in some PyQt6 environments.
+        # Using 'receivedBytesChanged' and 'totalBytesChanged' is a more robust alternative.
+        self.download_request.receivedBytesChanged.connect(self.on_progress_changed)
+        self.download_request.totalBytesChanged.connect(self.on_total_bytes_changed)
+        self.download_request.stateChanged.connect(self.update_state)
+        self.pause_resume_button.clicked.connect(self.toggle_pause_resume)
+        self.cancel_button.clicked.connect(self.cancel_download)
+        self.open_folder_button.clicked.connect(self.open_folder)
+
+    def on_progress_changed(self):
+        """Handles progress updates when received bytes change."""
+        self.update_progress(self.download_request.receivedBytes(), self.download_request.totalBytes())
+
+    def on_total_bytes_changed(self):
+        """Handles update when total bytes are determined."""
+        self.update_progress(self.download_request.receivedBytes(), self.download_request.totalBytes())
+
+    def format_size(self, size_bytes):
+        """
+        ファイルサイズを人間が読みやすい形式（KB, MB, GBなど）に変換します。
+        numpyへの依存をなくし、軽量化しました。
+        """
+        if size_bytes <= 0:
+            return "0B"
+        size_name = ("B", "KB", "MB", "GB", "TB", "PB")
+        i = 0
+        if size_bytes > 0:
+            while size_bytes >= 1024 and i < len(size_name) - 1:
+                size_bytes /= 1024.0
+                i += 1
+        return f"{size_bytes:.2f} {size_name[i]}"
+
+    def update_progress(self, bytes_received, bytes_total):
+        current_time = time.time()
+        time_diff = current_time - self.last_update_time
+        bytes_diff = bytes_received - self.last_bytes_received
+
+        if time_diff > 0.5: # 0.5秒ごとに速度を更新
+            speed = bytes_diff / time_diff
+            speed_str = f"{self.format_size(speed)}/s"
+            self.last_update_time = current_time
+            self.last_bytes_received = bytes_received
+            self._last_speed_str = speed_str
+        else:
+            speed_str = getattr(self, '_last_speed_str', '計算中...')
+
+        if bytes_total > 0:
+            progress = int((bytes_received / bytes_total) * 100)
+            self.progress_bar.setValue(progress)
+            status_text = f"{self.format_size(bytes_received)} / {self.format_size(bytes_total)} ({speed_str})"
+        else:
+            status_text = f"{self.format_size(bytes_received)} ({speed_str})"
+        
+        self.status_label.setText(status_text)
+
+    def update_state(self, state):
+        if state == QWebEngineDownloadRequest.DownloadState.DownloadInProgress:
+            if qta: self.pause_resume_button.setIcon(icon_cache.get('fa5s.pause', color='gray'))
+            self.pause_resume_button.setToolTip("一時停止")
+            self.is_paused = False
+        # The integer value for DownloadPaused (4) is used directly to avoid an
+        # AttributeError in some PyQt6/QtWebEngine environments where the Python
+        # wrapper for this specific enum value seems to be missing.
+        elif state == 4: # Corresponds to QWebEngineDownloadRequest.DownloadState.DownloadPaused
+            if qta: self.pause_resume_button.setIcon(icon_cache.get('fa5s.play', color='gray'))
+            self.pause_resume_button.setToolTip("再開")
+            self.status_label.setText("一時停止中")
+            self.is_paused = True
+        elif state == QWebEngineDownloadRequest.DownloadState.DownloadCompleted:
+            self.status_label.setText("ダウンロード完了")
+            self.progress_bar.setValue(100)
+            self.pause_resume_button.setVisible(False)
+            if qta: self.cancel_button.setIcon(icon_cache.get('fa5s.file-alt', color='gray'))
+            self.cancel_button.setToolTip("ファイルを開く")
+            try:
+                self.cancel_button.clicked.disconnect()
+            except TypeError:
+                pass
+            self.cancel_button.clicked.connect(self.open_file)
+            self.open_folder_button.setVisible(True)
+        elif state == QWebEngineDownloadRequest.DownloadState.DownloadCancelled:
+            self.status_label.setText("キャンセルされました")
+            self.progress_bar.setFormat("キャンセル")
+            self.pause_resume_button.setVisible(False)
+            self.cancel_button.setVisible(False)
+        elif state == QWebEngineDownloadRequest.DownloadState.DownloadInterrupted:
+            self.status_label.setText("中断されました")
+            self.progress_bar.setFormat("エラー")
+            self.pause_resume_button.setVisible(False)
+
+    def toggle_pause_resume(self):
+        if self.is_paused:
+            self.download_request.resume()
+        else:
+            self.download_request.pause()
+
+    def cancel_download(self):
+        self.download_request.cancel()
+
+    def open_file(self):
+        QDesktopServices.openUrl(QUrl.fromLocalFile(self.download_request.downloadFileName()))
+
+    def open_folder(self):
+        dir_path = os.path.dirname(self.download_request.downloadFileName())
+        QDesktopServices.openUrl(QUrl.fromLocalFile(dir_path))
+
+class DownloadManagerDialog(QDialog):
+    """ダウンロードをリスト表示し、管理するためのダイアログ。"""
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("ダウンロード")
+        self.setMinimumSize(600, 400)
+        self.init_ui()
+
+    def init_ui(self):
+        main_layout = QVBoxLayout(self)
+        
+        self.download_list = QListWidget()
+        self.download_list.setSelectionMode(QListWidget.SelectionMode.NoSelection)
+        main_layout.addWidget(self.download_list)
+
+        button_layout = QHBoxLayout()
+        clear_button = QPushButton("完了した項目をクリア")
+        clear_button.clicked.connect(self.clear_completed)
+        button_layout.addStretch()
+        button_layout.addWidget(clear_button)
+        main_layout.addLayout(button_layout)
+
+    def add_download(self, download_request):
+        if hasattr(download_request, '_is_handled') and download_request._is_handled:
+            return
+        download_request._is_handled = True
+
+        default_dir = QStandardPaths.writableLocation(QStandardPaths.StandardLocation.DownloadLocation)
+        suggested_path = os.path.join(default_dir, download_request.suggestedFileName())
+        
+        file_path, _ = QFileDialog.getSaveFileName(self.parent(), "ファイルを保存", suggested_path)
+        
+        if file_path:
+            download_request.setDownloadFileName(file_path)
+            
+            item_widget = DownloadItemWidget(download_request)
+            list_item = QListWidgetItem(self.download_list)
+            list_item.setSizeHint(item_widget.sizeHint())
+            
+            self.download_list.insertItem(0, list_item)
+            self.download_list.setItemWidget(list_item, item_widget)
+            
+            download_request.accept()
+            self.show()
+            self.raise_()
+            self.activateWindow()
+        else:
+            download_request.cancel()
+
+    def clear_completed(self):
+        for i in range(self.download_list.count() - 1, -1, -1):
+            list_item = self.download_list.item(i)
+            item_widget = self.download_list.itemWidget(list_item)
+            state = item_widget.download_request.state()
+            if state == QWebEngineDownloadRequest.DownloadState.DownloadCompleted or \
+               state == QWebEngineDownloadRequest.DownloadState.DownloadCancelled or \
+               state == QWebEngineDownloadRequest.DownloadState.DownloadInterrupted:
+                self.download_list.takeItem(i)
+
+    def closeEvent(self, event):
+        self.hide()
+        event.ignore()
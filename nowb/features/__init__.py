@@ -0,0 +1,4 @@
+"""
+遊び心のある追加機能。
+起動を軽くするため、各モジュールはメニューなどから最初に使われたときに読み込まれる。
+"""
@@ -0,0 +1,21 @@
+"""AIアシスタントとの簡易チャット。"""
+from PyQt6.QtWidgets import QInputDialog, QMessageBox
+
+
+def start_ai_chat(window):
+    current_browser = window.tabs.currentWidget()
+    if current_browser:
+        question, ok = QInputDialog.getText(window, "AIアシスタント", "質問を入力してください:")
+        if ok and question:
+            window.statusBar().showMessage("AIアシスタントが考えています...", 3000)
+            # ここにAI API呼び出しのロジックを実装
+            # 例: APIから応答を取得
+            response_from_ai = get_ai_response(window, question)
+            QMessageBox.information(window, "AIアシスタントからの返信", response_from_ai)
+
+def get_ai_response(window, question):
+    # AI応答をシミュレート
+    if "猫" in question or "ねこ" in question: return "ニャー。猫は液体のようですからね。"
+    elif "天気" in question: return "今日の天気は散歩にぴったりです。お出かけしますか？"
+    elif "人生の意味" in question: return "その質問は量子力学のようなものです。答えはあなたの中にあります。"
+    else: return "その質問は私の知識を超えています。もっと哲学的なことを聞いてみてください。"
@@ -0,0 +1,52 @@
+"""画面上を動き回るお掃除ロボット。"""
+
+
+def activate_cleaning_robot(window):
+    """画面にお掃除ロボットを表示する。"""
+    current_browser = window.tabs.currentWidget()
+    if not current_browser: return
+
+    # JavaScriptでアニメーションと要素削除をシミュレート
+    js_code = """
+        // 小さなロボット要素を作成
+        var robot = document.createElement('div');
+        robot.style.position = 'fixed';
+        robot.style.width = '50px';
+        robot.style.height = '50px';
+        robot.style.background = 'url("https://www.flaticon.com/svg/v2/search/p/13444/13444652.svg") no-repeat center center / contain';
+        robot.style.bottom = '10px';
+        robot.style.right = '10px';
+        robot.style.zIndex = '99999';
+        robot.style.transition = 'transform 1s ease-in-out';
+        document.body.appendChild(robot);
+
+        // ロボットをアニメーションさせる
+        var positions = [
+            {x: 100, y: -200}, {x: -300, y: -50}, {x: 50, y: 150},
+            {x: -150, y: -150}, {x: 200, y: 10}, {x: -200, y: 200}
+        ];
+        var i = 0;
+        var interval = setInterval(function() {
+            if (i >= positions.length) {
+                clearInterval(interval);
+                robot.remove(); // アニメーション後にロボットを削除
+                return;
+            }
+            var pos = positions[i];
+            robot.style.transform = `translate(${pos.x}px, ${pos.y}px) rotate(${i * 60}deg)`;
+            i++;
+        }, 1000);
+
+        // クリーニングをシミュレート (ランダムなdivをいくつか削除)
+        var all_divs = document.querySelectorAll('div');
+        for(var i = 0; i < 5; i++){
+            var random_div = all_divs[Math.floor(Math.random() * all_divs.length)];
+            if(random_div && random_div.parentElement){
+                random_div.style.opacity = 0;
+                random_div.style.transition = 'opacity 0.5s ease-out';
+                setTimeout(() => random_div.remove(), 500);
+            }
+        }
+    """
+    current_browser.page().runJavaScript(js_code)
+    window.statusBar().showMessage("お掃除ロボットが起動しました！ブラウザをきれいにしています。", 5000)
@@ -0,0 +1,29 @@
+"""隠し機能 (テーマ変更、隠された哲学、ランダムジャンプ)。"""
+import random
+from PyQt6.QtCore import QUrl
+from PyQt6.QtWidgets import QApplication, QMessageBox
+from PyQt6.QtGui import QColor, QPalette
+
+
+def change_theme(window):
+    palette = window.palette(); random_color = QColor(random.randint(0, 255), random.randint(0, 255), random.randint(0, 255))
+    palette.setColor(QPalette.ColorRole.Window, random_color); palette.setColor(QPalette.ColorRole.Base, random_color.lighter(120)); palette.setColor(QPalette.ColorRole.AlternateBase, random_color.darker(120)); palette.setColor(QPalette.ColorRole.Text, random_color.lighter(200)); palette.setColor(QPalette.ColorRole.Button, random_color.darker(120)); palette.setColor(QPalette.ColorRole.ButtonText, random_color.lighter(200))
+    window.setPalette(palette); QApplication.setPalette(palette)
+    window.statusBar().showMessage(f"テーマの色がランダムに変更されました！", 3000)
+
+def show_proverb(window):
+    proverbs = ["人生は短い、しかしタブは無限である。", "眠いなら眠れ。それも生産性の一部だ。", "完璧なコードなどない。動けばそれで十分だ。", "最大のバグは睡眠不足だ。", "デバッグは探偵の仕事だ。手がかりはエラーメッセージにある。",]
+    QMessageBox.information(window, "隠された哲学", random.choice(proverbs))
+
+def jump_to_random_site(window):
+    """
+    履歴からランダムなサイトにジャンプする。
+    """
+    if window.history:
+        random_entry = random.choice(window.history)
+        url = random_entry["url"]
+        title = random_entry["title"]
+        window.add_new_tab(QUrl(url), title)
+        window.statusBar().showMessage(f"ランダムサイトジャンプ！'{title}'にアクセスします。", 5000)
+    else:
+        window.statusBar().showMessage("ジャンプできる履歴がありません。", 3000)
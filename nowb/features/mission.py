@@ -0,0 +1,23 @@
+"""ランダムなミッションを提示するミッションモード。"""
+import random
+from PyQt6.QtWidgets import QMessageBox
+
+
+def start_mission_mode(window):
+    """
+    ランダムなミッションを提示する。
+    """
+    missions = [
+        "「猫」と検索して、一番かわいい猫を見つけよう！",
+        "YouTubeにアクセスせずに30分間リサーチをしてみよう。",
+        "今日の年月日を3つの異なるウェブサイトで見つけよう！",
+        "URLバーに「about:blank」と入力して、心の空白と向き合ってみよう。",
+        "開いているタブを全部閉じよう。そして、新しい世界に飛び出そう。",
+        "Wikipediaのランダム記事に5回ジャンプして、知識の冒険を楽しもう。",
+        "集中ポーションを飲んで、60分間SNSを開かないように頑張ろう！",
+        "お気に入りのウェブサイトのファビコンのスクリーンショットを撮って保存しよう。",
+    ]
+
+    random_mission = random.choice(missions)
+    QMessageBox.information(window, "ミッション開始！", f"あなたのミッションは…**'{random_mission}'**\n\nミッションの成功を祈ります！")
+    window.statusBar().showMessage("新しいミッションが割り当てられました。", 5000)
@@ -0,0 +1,82 @@
+"""ウェブサイトのムード分析。"""
+import json
+import re
+from PyQt6.QtWidgets import QMessageBox
+from ..tracing import traced
+
+
+def analyze_website_mood(window):
+    """ウェブサイトのムード分析機能"""
+    current_browser = window.tabs.currentWidget()
+    if not current_browser: return
+
+    # JavaScriptを実行してCSSとキーワードを抽出
+    js_code = r"""
+        var colors = {};
+        var styleSheets = document.styleSheets;
+        for(var i = 0; i < styleSheets.length; i++){
+            try {
+                var rules = styleSheets[i].cssRules;
+                for(var j = 0; j < rules.length; j++){
+                    if(rules[j].style){
+                        var cssText = rules[j].style.cssText;
+                        var matches = cssText.matchAll(/rgb\((\d+),\s*(\d+),\s*(\d+)\)|#[0-9a-fA-F]{6}|#[0-9a-fA-F]{3}/g);
+                        for(var match of matches) {
+                            var color = match[0];
+                            colors[color] = (colors[color] || 0) + 1;
+                        }
+                    }
+                }
+            } catch(e) { /* クロスオリジンのスタイルシートエラーは無視 */ }
+        }
+        var text = document.body.innerText;
+        var keywords = text.split(/\s+/);
+        JSON.stringify({ colors: colors, keywords: keywords.slice(0, 500) });
+    """
+    current_browser.page().runJavaScript(js_code, lambda json_data: handle_mood_analysis_result(window, json_data))
+
+@traced()
+def handle_mood_analysis_result(window, json_data):
+    try:
+        data = json.loads(json_data)
+        colors = data.get('colors', {})
+        keywords = data.get('keywords', [])
+
+        # --- 単純なムード判定ロジック ---
+        mood_scores = {
+            'エネルギッシュ': 0,
+            '穏やか': 0,
+            'サイバーパンク': 0,
+            '真面目': 0
+        }
+
+        # 1. 色分析
+        for color_str, count in colors.items():
+            if '#' in color_str:
+                r, g, b = int(color_str[1:3], 16), int(color_str[3:5], 16), int(color_str[5:7], 16)
+            else: # rgb(r, g, b)形式
+                r, g, b = map(int, re.findall(r'\d+', color_str))
+
+            if r > 150 and g < 100 and b < 100: mood_scores['エネルギッシュ'] += count # 赤っぽい色
+            if g > 150 and b > 150: mood_scores['穏やか'] += count # 青緑色
+            if g > 200 and b < 50 and r < 50: mood_scores['サイバーパンク'] += count # ネオングリーン
+            if r < 100 and g < 100 and b < 100: mood_scores['真面目'] += count # 黒っぽい色
+
+        # 2. キーワード分析 (非常に単純な例)
+        for keyword in keywords:
+            if keyword in ['fun', 'great', 'exciting', 'exciting']: mood_scores['エネルギッシュ'] += 1
+            if keyword in ['calm', 'quiet', 'relaxing', 'peaceful']: mood_scores['穏やか'] += 1
+            if keyword in ['technology', 'future', 'data', 'cyber']: mood_scores['サイバーパンク'] += 1
+            if keyword in ['paper', 'research', 'analysis', 'information']: mood_scores['真面目'] += 1
+
+        total_score = sum(mood_scores.values())
+        if total_score == 0:
+            result_mood = "判定不能なムード..."
+        else:
+            result_mood = max(mood_scores, key=mood_scores.get)
+
+        QMessageBox.information(window, "ウェブサイトのムード分析", f"このサイトのムードは**'{result_mood}'**です！\n\n(分析結果は主観的なものです。)")
+        window.statusBar().showMessage(f"サイトのムードを分析しました: {result_mood}", 5000)
+
+    except Exception as e:
+        QMessageBox.critical(window, "エラー", f"ムード分析に失敗しました: {e}")
@@ -0,0 +1,17 @@
+"""メモ帳ダイアログ。"""
+from PyQt6.QtWidgets import QDialog, QPushButton, QVBoxLayout, QHBoxLayout, QPlainTextEdit
+
+
+def show_notes_dialog(window):
+    current_tab_index = window.tabs.currentIndex()
+    if current_tab_index not in window.notes:
+        window.notes[current_tab_index] = ""
+    notes_dialog = QDialog(window)
+    notes_dialog.setWindowTitle("シンプルメモ帳"); notes_dialog.setFixedSize(400, 300)
+    layout = QVBoxLayout(notes_dialog); text_edit = QPlainTextEdit()
+    text_edit.setPlaceholderText("ここにメモを入力してください..."); text_edit.setPlainText(window.notes[current_tab_index])
+    layout.addWidget(text_edit); button_layout = QHBoxLayout()
+    ok_button = QPushButton("OK"); cancel_button = QPushButton("キャンセル")
+    button_layout.addStretch(1); button_layout.addWidget(ok_button); button_layout.addWidget(cancel_button)
+    layout.addLayout(button_layout); ok_button.clicked.connect(notes_dialog.accept); cancel_button.clicked.connect(notes_dialog.reject)
+    if notes_dialog.exec(): window.notes[current_tab_index] = text_edit.toPlainText(); window.statusBar().showMessage("メモを保存しました。", 2000)
@@ -0,0 +1,32 @@
+"""ページに重ねる表示フィルター (ノスタルジー、サイバーパンク)。"""
+
+
+def toggle_nostalgia_filter(window, checked):
+    current_browser = window.tabs.currentWidget()
+    if not current_browser: return
+    if checked:
+        filter_css = """
+            body::before {content:'';position:fixed;top:0;left:0;width:100%;height:100%;background:repeating-linear-gradient(0deg, transparent, rgba(0,0,0,0.1) 1px, transparent 2px);z-index:9999;pointer-events:none;opacity:0.5;}
+            body::after {content:'';position:fixed;top:0;left:0;width:100%;height:100%;box-shadow:inset 0 0 100px 50px rgba(0,0,0,0.5);z-index:9999;pointer-events:none;}
+        """
+        current_browser.page().runJavaScript(f"var style = document.createElement('style'); style.id = 'nostalgia-filter'; style.innerHTML = `{filter_css}`; document.head.appendChild(style);")
+        window.statusBar().showMessage("ノスタルジアフィルターON！古き良き思い出に浸りましょう。", 3000)
+    else:
+        current_browser.page().runJavaScript("var style = document.getElementById('nostalgia-filter'); if(style) style.remove();")
+        window.statusBar().showMessage("ノスタルジアフィルターOFF。", 3000)
+
+def toggle_cyberpunk_mode(window, checked):
+    current_browser = window.tabs.currentWidget()
+    if not current_browser: return
+    if checked:
+        cyberpunk_css = """
+            body { background-color: black !important; color: limegreen !important; filter: drop-shadow(0 0 1px limegreen); }
+            a { color: cyan !important; }
+            * { border-color: limegreen !important; }
+            input, textarea, select, button { background-color: #1a1a1a !important; color: limegreen !important; border: 1px solid cyan !important; }
+        """
+        current_browser.page().runJavaScript(f"var style = document.createElement('style'); style.id = 'cyberpunk-style'; style.innerHTML = `{cyberpunk_css}`; document.head.appendChild(style);")
+        window.statusBar().showMessage("サイバーパンクモードON！ネオンの光が輝く世界へようこそ。", 3000)
+    else:
+        current_browser.page().runJavaScript("var style = document.getElementById('cyberpunk-style'); if(style) style.remove();")
+        window.statusBar().showMessage("サイバーパンクモードOFF。", 3000)
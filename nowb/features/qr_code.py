@@ -0,0 +1,26 @@
+"""現在のページのQRコード生成。"""
+from PyQt6.QtWidgets import QMessageBox
+from PyQt6.QtGui import QPixmap
+
+
+def generate_qr_code(window):
+    # 機能が呼び出された時に初めてモジュールをインポートする（起動時間短縮のため）
+    try:
+        import qrcode
+        from PIL.ImageQt import ImageQt
+    except ImportError:
+        QMessageBox.warning(window, "機能不足", "QRコードを生成するには 'qrcode' と 'Pillow' ライブラリが必要です。\n'pip install qrcode Pillow' を実行してください。")
+        return
+
+    current_url = window.tabs.currentWidget().url().toString()
+    if not current_url:
+        QMessageBox.warning(window, "QRコード生成", "無効なURLです。")
+        return
+    qr_img = qrcode.make(current_url)
+    img_qt = ImageQt(qr_img.convert("RGBA"))
+    pixmap = QPixmap.fromImage(img_qt)
+    msg = QMessageBox(window)
+    msg.setWindowTitle("QRコード")
+    msg.setText(f"現在のURLのQRコード:\n{current_url}")
+    msg.setIconPixmap(pixmap)
+    msg.exec()
@@ -0,0 +1,70 @@
+"""ページ上の画像をピクセル化するレトロピクセルモード。"""
+
+
+def toggle_retro_pixel_mode(window, checked):
+    """ウェブページ上の画像をピクセル化する。"""
+    window.is_retro_mode_active = checked
+    if checked:
+        # JavaScriptで全ての画像をピクセル化
+        js_code = """
+            document.querySelectorAll('img').forEach(img => {
+                var canvas = document.createElement('canvas');
+                var context = canvas.getContext('2d');
+                var width = img.naturalWidth;
+                var height = img.naturalHeight;
+                canvas.width = width;
+                canvas.height = height;
+
+                context.webkitImageSmoothingEnabled = false;
+                context.mozImageSmoothingEnabled = false;
+                context.imageSmoothingEnabled = false;
+
+                // 低解像度で描画してから拡大
+                var pixelSize = 16;
+                context.drawImage(img, 0, 0, width / pixelSize, height / pixelSize);
+                context.drawImage(canvas, 0, 0, width / pixelSize, height / pixelSize, 0, 0, width, height);
+
+                img.src = canvas.toDataURL();
+            });
+        """
+        current_browser = window.tabs.currentWidget()
+        if current_browser:
+            current_browser.page().runJavaScript(js_code)
+            window.statusBar().showMessage("レトロピクセルモードON！ピクセルアートの世界へようこそ。", 3000)
+    else:
+        # タブをリロードして元に戻す
+        window.tabs.currentWidget().reload()
+        window.statusBar().showMessage("レトロピクセルモードOFF。", 3000)
+
+def apply_retro_pixel_filter(window, browser):
+    """Applies the retro pixel filter to a given browser instance's page when it finishes loading."""
+    if not browser:
+        return
+
+    js_code = """
+        document.querySelectorAll('img').forEach(img => {
+            var canvas = document.createElement('canvas');
+            var context = canvas.getContext('2d');
+            var width = img.naturalWidth;
+            var height = img.naturalHeight;
+            if (width === 0 || height === 0) return; // Skip unloaded images
+            canvas.width = width;
+            canvas.height = height;
+
+            context.webkitImageSmoothingEnabled = false;
+            context.mozImageSmoothingEnabled = false;
+            context.imageSmoothingEnabled = false;
+
+            // 低解像度で描画してから拡大
+            var pixelSize = 16;
+            context.drawImage(img, 0, 0, width / pixelSize, height / pixelSize);
+            context.drawImage(canvas, 0, 0, width / pixelSize, height / pixelSize, 0, 0, width, height);
+
+            img.src = canvas.toDataURL();
+        });
+    """
+    # Run the script after the page has finished loading.
+    # Registered under a fixed key so repeated calls replace the handler instead of stacking lambdas.
+    browser.tab_connections.connect(browser.loadFinished,
+                                    lambda ok, b=browser: b.page().runJavaScript(js_code) if ok else None,
+                                    key='retro_pixel_filter')
@@ -0,0 +1,49 @@
+"""ページの感情分析 (シンプル版)。"""
+from PyQt6.QtWidgets import QMessageBox
+from ..tracing import traced
+
+
+def analyze_sentiment(window):
+    """
+    ページの感情を分析する (シンプル版)。
+    """
+    current_browser = window.tabs.currentWidget()
+    if not current_browser: return
+
+    js_code = "document.body.innerText;"
+    current_browser.page().runJavaScript(js_code, lambda text: handle_sentiment_result(window, text))
+
+@traced()
+def handle_sentiment_result(window, text):
+    if not text:
+        QMessageBox.warning(window, "感情分析", "分析するテキストが見つかりませんでした。")
+        return
+
+    # 感情キーワードの単純なリスト
+    positive_words = ['great', 'best', 'fun', 'happy', 'success', 'beautiful', 'hope', '素晴らしい', '最高', '楽しい', '幸せ', '成功', '美しい', '希望']
+    negative_words = ['terrible', 'worst', 'sad', 'painful', 'anger', 'failure', 'ugly', 'despair', 'ひどい', '最悪', '悲しい', 'つらい', '怒り', '失敗', '醜い', '絶望']
+
+    positive_score = sum(1 for word in positive_words if word in text.lower())
+    negative_score = sum(1 for word in negative_words if word in text.lower())
+
+    total_score = positive_score + negative_score
+
+    if total_score == 0:
+        sentiment_result = "中立"
+    elif positive_score > negative_score:
+        sentiment_result = "ポジティブ"
+    elif negative_score > positive_score:
+        sentiment_result = "ネガティブ"
+    else:
+        sentiment_result = "中立" # 同点の場合
+
+    sentiment_info = f"""
+    **感情分析結果:**
+    - **全体:** {sentiment_result}
+    - **ポジティブスコア:** {positive_score}
+    - **ネガティブスコア:** {negative_score}
+
+    この結果は単純なキーワード分析に基づいています。
+    """
+    QMessageBox.information(window, "ページ内感情分析", sentiment_info)
+    window.statusBar().showMessage(f"ページの感情を分析しました: {sentiment_result}", 5000)
@@ -0,0 +1,30 @@
+"""AIページ要約。"""
+import re
+from PyQt6.QtWidgets import QMessageBox
+from ..tracing import traced
+
+
+def summarize_page(window):
+    """AIページ要約機能"""
+    current_browser = window.tabs.currentWidget()
+    if not current_browser: return
+
+    # JavaScriptを実行してページ内のテキストコンテンツを取得
+    js_code = "document.body.innerText;"
+    current_browser.page().runJavaScript(js_code, lambda text: handle_summary_result(window, text))
+
+@traced()
+def handle_summary_result(window, text):
+    if not text:
+        QMessageBox.warning(window, "AIによる要約", "要約するテキストが見つかりませんでした。")
+        return
+
+    # AI要約ロジックをシミュレート
+    sentences = re.split(r'[。.]', text)
+    sentences = [s.strip() for s in sentences if s.strip()]
+
+    # 最初の5文を要約として抽出 (単純な要約)
+    summary = "。 ".join(sentences[:5]) + "。"
+
+    QMessageBox.information(window, "AIによる要約", summary)
+    window.statusBar().showMessage("ページの要約が完了しました！", 5000)
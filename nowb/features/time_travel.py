@@ -0,0 +1,28 @@
+"""タイムマシン (Wayback Machine) とタイムトラベルモード。"""
+from PyQt6.QtCore import QUrl
+from PyQt6.QtWidgets import QInputDialog
+
+
+def activate_timemachine(window):
+    current_url = window.tabs.currentWidget().url().toString()
+    archive_url = f"https://web.archive.org/web/*/{current_url}"
+    window.add_new_tab(QUrl(archive_url), "タイムマシン")
+
+def toggle_time_travel_mode(window):
+    current_browser = window.tabs.currentWidget()
+    if not current_browser: return
+    mode, ok = QInputDialog.getItem(window, "タイムトラベルモード", "どの時代にタイムトラベルしますか？", ["過去 (CSSなし)", "未来 (派手なCSS)", "現在 (リセット)"], 0, False)
+    if ok and mode:
+        if mode == "過去 (CSSなし)":
+            current_browser.page().runJavaScript("document.querySelectorAll('link[rel=stylesheet],style').forEach(el => el.remove());")
+            window.statusBar().showMessage("タイムトラベル成功！過去のウェブサイトに到着しました。", 5000)
+        elif mode == "未来 (派手なCSS)":
+            css = """
+                body { transition: background-color 2s ease-in-out; }
+                * { border: 2px solid neonpink !important; box-shadow: 0 0 10px 5px cyan !important; animation: flicker 0.5s infinite alternate; }
+                @keyframes flicker { from { opacity: 1; } to { opacity: 0.8; } }
+            """
+            current_browser.page().runJavaScript(f"var style = document.createElement('style'); style.id = 'cyberpunk-style'; style.innerHTML = `{css}`; document.head.appendChild(style);")
+            window.statusBar().showMessage("タイムトラベル成功！未来のウェブサイトに到着しました。", 5000)
+        else:
+            current_browser.reload(); window.statusBar().showMessage("現在に戻りました。", 3000)
@@ -0,0 +1,19 @@
+"""ページの翻訳。"""
+from PyQt6.QtWidgets import QMessageBox
+
+
+def translate_page(window):
+    current_browser = window.tabs.currentWidget()
+    if current_browser:
+        js_code = """
+            if (typeof google !== 'undefined' && google.translate) {
+                google.translate.translateInit(function() {
+                    google.translate.translatePage('ja');
+                });
+            } else {
+                alert('翻訳機能は利用できません。');
+            }
+        """
+        current_browser.page().runJavaScript(js_code)
+        window.statusBar().showMessage("ページの翻訳を試みています...", 3000)
+        QMessageBox.information(window, "自動翻訳", "これはシミュレートされた機能です。")
@@ -0,0 +1,212 @@
+"""
+ツールメニューからのパフォーマンスキャプチャ。
+指定した秒数の間、UIスレッドをcProfileで計測し、tracemallocで開始時と終了時のメモリ割り当ての差分を取る。
+Python 3.12以降のcProfileはsys.monitoringを使うため、UIスレッドだけでなくすべてのスレッドの呼び出しが計測に含まれる。
+必要ならワーカースレッドのスタックも定期的に採取する。結果は .prof とテキストのレポートとして保存する。
+"""
+import os
+import sys
+import io
+import time
+import pstats
+import cProfile
+import datetime
+import threading
+import tracemalloc
+from collections import Counter
+from PyQt6.QtCore import QTimer, pyqtSignal, QObject
+from PyQt6.QtWidgets import QDialog, QVBoxLayout, QFormLayout, QSpinBox, QCheckBox, QDialogButtonBox
+
+from .config import (DEFAULT_CAPTURE_SECONDS, PERF_CAPTURE_DIR, PERF_CAPTURE_SAMPLE_INTERVAL_MS,
+                     PERF_CAPTURE_TRACEMALLOC_FRAMES, profile_path)
+
+REPORT_TOP_FUNCTIONS = 60
+REPORT_TOP_ALLOCATIONS = 40
+PROFILES_ALL_THREADS = sys.version_info >= (3, 12) # cProfileがすべてのスレッドを計測するか
+
+
+class CaptureOptionsDialog(QDialog):
+    """キャプチャの秒数と、ワーカースレッドを採取するかを選ぶダイアログ。"""
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("パフォーマンスキャプチャ")
+        layout = QVBoxLayout(self)
+        form = QFormLayout()
+        self.seconds_spin = QSpinBox()
+        self.seconds_spin.setRange(1, 300)
+        self.seconds_spin.setValue(DEFAULT_CAPTURE_SECONDS)
+        self.seconds_spin.setSuffix(" 秒")
+        form.addRow("記録する時間:", self.seconds_spin)
+        self.sample_threads_check = QCheckBox("ワーカースレッドのスタックも採取する")
+        form.addRow("", self.sample_threads_check)
+        self.memory_check = QCheckBox("メモリ割り当ての差分を取る (tracemalloc)")
+        self.memory_check.setChecked(True)
+        form.addRow("", self.memory_check)
+        layout.addLayout(form)
+        buttons = QDialogButtonBox(QDialogButtonBox.StandardButton.Ok | QDialogButtonBox.StandardButton.Cancel)
+        buttons.accepted.connect(self.accept)
+        buttons.rejected.connect(self.reject)
+        layout.addWidget(buttons)
+
+    def get_options(self):
+        return self.seconds_spin.value(), self.sample_threads_check.isChecked(), self.memory_check.isChecked()
+
+
+class _ThreadSampler(threading.Thread):
+    """UIスレッド以外のスレッドのスタックを定期的に採取し、折りたたみ形式 (a;b;c) で数える。"""
+    def __init__(self, main_thread_id):
+        super().__init__(name="nowb-capture-sampler", daemon=True)
+        self.main_thread_id = main_thread_id
+        self.stacks = Counter()
+        self.sample_count = 0
+        self._stop_event = threading.Event()
+
+    def run(self):
+        own_id = threading.get_ident()
+        names = {}
+        while not self._stop_event.wait(PERF_CAPTURE_SAMPLE_INTERVAL_MS / 1000):
+            if len(names) != threading.active_count():
+                names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id in (self.main_thread_id, own_id):
+                    continue
+                # traceback.extract_stackはソースの行を読み込む (メモリの差分に混ざる) ため、フレームを直接たどる
+                frames = []
+                while frame is not None:
+                    code = frame.f_code
+                    frames.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+                    frame = frame.f_back
+                frames.append(names.get(thread_id, str(thread_id)))
+                self.stacks[";".join(reversed(frames))] += 1
+            self.sample_count += 1
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+
+
+class PerformanceCapture(QObject):
+    """一定時間のパフォーマンスキャプチャ。終了するとfinishedで保存したファイルのリストを通知する。"""
+    finished = pyqtSignal(list)
+    failed = pyqtSignal(str)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.profiler = None
+        self.sampler = None
+        self.memory_before = None
+        self.started_tracemalloc = False
+        self.started_at = None
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.timeout.connect(self.stop)
+
+    def is_running(self):
+        return self.profiler is not None
+
+    def start(self, seconds, sample_threads=False, trace_memory=True):
+        """キャプチャを開始する。UIスレッドから呼び出す。"""
+        if self.is_running():
+            return False
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError as e:
+            # 別のプロファイラ (--startup-profile など) が動作中
+            self.failed.emit(f"プロファイラを開始できませんでした: {e}")
+            return False
+        self.profiler = profiler
+        self.started_at = time.perf_counter()
+        if trace_memory:
+            self.started_tracemalloc = not tracemalloc.is_tracing()
+            if self.started_tracemalloc:
+                tracemalloc.start(PERF_CAPTURE_TRACEMALLOC_FRAMES)
+            self.memory_before = tracemalloc.take_snapshot()
+        if sample_threads:
+            self.sampler = _ThreadSampler(threading.get_ident())
+            self.sampler.start()
+        self.timer.start(seconds * 1000)
+        return True
+
+    def stop(self):
+        """キャプチャを終了し、結果を保存する。"""
+        if not self.is_running():
+            return
+        self.timer.stop()
+        self.profiler.disable()
+        elapsed_s = time.perf_counter() - self.started_at
+        memory_after = tracemalloc.take_snapshot() if self.memory_before is not None else None
+        if self.started_tracemalloc:
+            tracemalloc.stop()
+        if self.sampler is not None:
+            self.sampler.stop()
+
+        try:
+            paths = self._write_reports(elapsed_s, memory_after)
+        except OSError as e:
+            print(f"パフォーマンスキャプチャの保存に失敗しました: {e}", file=sys.stderr)
+            self.failed.emit(f"パフォーマンスキャプチャの保存に失敗しました: {e}")
+            paths = None
+        finally:
+            self.profiler = None
+            self.sampler = None
+            self.memory_before = None
+            self.started_tracemalloc = False
+        if paths is not None:
+            self.finished.emit(paths)
+
+    def _write_reports(self, elapsed_s, memory_after):
+        capture_dir = profile_path(PERF_CAPTURE_DIR)
+        os.makedirs(capture_dir, exist_ok=True)
+        base = os.path.join(capture_dir, f"capture_{datetime.datetime.now().strftime('%Y%m%d_%H%M%S')}")
+        paths = []
+
+        prof_path = base + ".prof"
+        self.profiler.dump_stats(prof_path)
+        paths.append(prof_path)
+
+        summary_path = base + "_profile.txt"
+        with open(summary_path, 'w', encoding='utf-8') as f:
+            scope = "全スレッド" if PROFILES_ALL_THREADS else "UIスレッド"
+            f.write(f"Project-NOWB パフォーマンスキャプチャ ({scope}, {elapsed_s:.1f} 秒)\n\n")
+            for sort_key, title in (('cumulative', "累積時間順"), ('tottime', "関数自身の時間順")):
+                stream = io.StringIO()
+                stats = pstats.Stats(self.profiler, stream=stream)
+                stats.strip_dirs().sort_stats(sort_key).print_stats(REPORT_TOP_FUNCTIONS)
+                f.write(f"=== {title} ===\n{stream.getvalue()}\n")
+        paths.append(summary_path)
+
+        if memory_after is not None:
+            memory_path = base + "_memory.txt"
+            self._write_memory_report(memory_path, memory_after, elapsed_s)
+            paths.append(memory_path)
+
+        if self.sampler is not None:
+            threads_path = base + "_threads.txt"
+            with open(threads_path, 'w', encoding='utf-8') as f:
+                # 1行に「スレッド名;外側の関数;...;内側の関数 採取回数」。flamegraph.plなどでそのまま読める
+                for stack, count in self.sampler.stacks.most_common():
+                    f.write(f"{stack} {count}\n")
+            paths.append(threads_path)
+        return paths
+
+    def _write_memory_report(self, path, memory_after, elapsed_s):
+        # キャプチャ自身の割り当てはレポートに含めない
+        filters = [tracemalloc.Filter(False, tracemalloc.__file__), tracemalloc.Filter(False, __file__)]
+        before = self.memory_before.filter_traces(filters)
+        after = memory_after.filter_traces(filters)
+        differences = after.compare_to(before, 'lineno')
+        growth = sum(diff.size_diff for diff in differences)
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(f"Project-NOWB メモリ割り当ての差分 ({elapsed_s:.1f} 秒)\n")
+            if self.started_tracemalloc:
+                f.write("注: キャプチャの開始時にtracemallocを開始したため、開始前から残っている割り当ては含まれない。\n")
+            f.write(f"合計の増減: {growth / 1024:+.1f} KiB\n\n")
+            f.write(f"=== 増減の大きい上位 {REPORT_TOP_ALLOCATIONS} 行 ===\n")
+            for diff in differences[:REPORT_TOP_ALLOCATIONS]:
+                f.write(f"{diff}\n")
+            f.write(f"\n=== 最も増えた上位 {min(10, len(differences))} 件のスタック ===\n")
+            after_by_trace = after.compare_to(before, 'traceback')
+            for diff in after_by_trace[:10]:
+                f.write(f"\n{diff.size_diff / 1024:+.1f} KiB ({diff.count_diff:+d} ブロック)\n")
+                f.write("\n".join(diff.traceback.format()) + "\n")
@@ -0,0 +1,170 @@
+"""
+二重起動の防止。
+2つ目以降の起動では、コマンドラインのURLを起動中のインスタンスにQLocalSocketで渡してすぐに終了する。
+QApplicationの作成直後、ウィンドウを構築する前に呼ばれるため、QtCoreとQtNetwork以外の重いモジュールは読み込まない。
+"""
+import sys
+import os
+import json
+import hashlib
+import getpass
+from PyQt6.QtCore import QObject, pyqtSignal
+from PyQt6.QtNetwork import QLocalServer, QLocalSocket, QAbstractSocket
+
+FORWARD_CONNECT_TIMEOUT_MS = 200 # 起動中のインスタンスへの接続を待つ時間
+FORWARD_WRITE_TIMEOUT_MS = 1000 # URLの送信が終わるのを待つ時間
+FORWARD_REPLY_TIMEOUT_MS = 2000 # 起動中のインスタンスがURLを受け取るのを待つ時間
+FORWARD_ACK = b"ok\n"
+
+
+def get_server_name(profile_dir=None):
+    """
+    インスタンス間の通信に使うサーバー名。
+    設定ファイルや履歴はプロファイルディレクトリ (指定がなければ作業ディレクトリ) に保存されるため、
+    ユーザーとプロファイルディレクトリごとに1つのインスタンスとする。
+    """
+    try:
+        user = getpass.getuser()
+    except Exception:
+        user = "user"
+    directory = os.path.abspath(profile_dir) if profile_dir else os.getcwd()
+    key = hashlib.sha1(f"{user}\0{directory}".encode('utf-8')).hexdigest()[:16]
+    return f"project-nowb-{key}"
+
+
+def claim_single_instance(urls, private=False, profile_dir=None, parent=None):
+    """
+    起動中のインスタンスがあればURLを渡してNoneを返す。呼び出し側はそのまま終了する。
+    なければ待ち受けを始めたSingleInstanceServerを返す。
+    ウィンドウの構築中に起動された2つ目のインスタンスも受け付けられるよう、QApplicationの作成直後に呼び出す。
+    """
+    if forward_to_running_instance(urls, private, profile_dir):
+        return None
+    server = SingleInstanceServer(parent)
+    if not server.listen(profile_dir) and forward_to_running_instance(urls, private, profile_dir):
+        # ほぼ同時に起動した別のインスタンスが先に待ち受けを始めていた
+        server.deleteLater()
+        return None
+    return server
+
+
+def forward_to_running_instance(urls, private=False, profile_dir=None):
+    """
+    起動中のインスタンスにURLを渡す。privateがTrueならプライベートウィンドウで開くよう依頼する。
+    URLを送信できればTrueを、起動中のインスタンスがなければFalseを返す。
+    QLocalSocketの待機関数を使うため、QApplicationを作成してから呼び出す。
+    """
+    return _send_urls(get_server_name(profile_dir), urls, private)
+
+
+def _server_is_alive(server_name):
+    """サーバー名で待ち受けているインスタンスが実際に応答するかを確認する。"""
+    socket = QLocalSocket()
+    socket.connectToServer(server_name)
+    alive = socket.waitForConnected(FORWARD_CONNECT_TIMEOUT_MS)
+    socket.abort()
+    return alive
+
+
+def _send_urls(server_name, urls, private):
+    socket = QLocalSocket()
+    socket.connectToServer(server_name)
+    if not socket.waitForConnected(FORWARD_CONNECT_TIMEOUT_MS):
+        return False
+    message = json.dumps({'urls': urls, 'private': private}, ensure_ascii=False) + "\n"
+    socket.write(message.encode('utf-8'))
+    if not socket.waitForBytesWritten(FORWARD_WRITE_TIMEOUT_MS):
+        print(f"警告: 起動中のインスタンスにURLを渡せませんでした: {socket.errorString()}", file=sys.stderr)
+        socket.abort()
+        return False
+    # 起動処理中のインスタンスはイベントループが回るまで応答しないが、送ったURLは起動後に開かれる
+    reply = b""
+    while not reply.endswith(b"\n"):
+        if not socket.waitForReadyRead(FORWARD_REPLY_TIMEOUT_MS):
+            break
+        reply += bytes(socket.readAll())
+    if reply != FORWARD_ACK:
+        print("起動中のインスタンスは起動処理中です。URLは起動が終わってから開かれます。", file=sys.stderr)
+    socket.disconnectFromServer()
+    if socket.state() != QLocalSocket.LocalSocketState.UnconnectedState:
+        socket.waitForDisconnected(FORWARD_WRITE_TIMEOUT_MS)
+    return True
+
+
+class SingleInstanceServer(QObject):
+    """
+    2つ目以降の起動から渡されたURLを受け取るサーバー。
+    受け取ったURLのリストとプライベートウィンドウで開くかをurls_receivedで通知する (URLがない場合は空のリスト)。
+    connect_receiverで受け取り先が決まるまでに届いたURLは保留しておき、接続したときにまとめて通知する。
+    """
+    urls_received = pyqtSignal(list, bool)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.server = QLocalServer(self)
+        self.server.setSocketOptions(QLocalServer.SocketOption.UserAccessOption)
+        self.server.newConnection.connect(self._on_new_connection)
+        self._buffers = {}
+        self._pending = [] # 受け取り先が決まる前に届いた (URLのリスト, プライベートか)。決まった後はNone
+
+    def listen(self, profile_dir=None):
+        """
+        待ち受けを開始する。失敗した場合はFalseを返し、二重起動の防止を行わずに続行する。
+        別のインスタンスが既に待ち受けている場合は警告を表示せずにFalseを返す。
+        """
+        name = get_server_name(profile_dir)
+        if self.server.listen(name):
+            return True
+        if self.server.serverError() == QAbstractSocket.SocketError.AddressInUseError:
+            if _server_is_alive(name):
+                return False
+            # 異常終了したインスタンスのソケットファイルが残っている (Unix)
+            QLocalServer.removeServer(name)
+            if self.server.listen(name):
+                return True
+        print(f"警告: 二重起動の防止を有効にできませんでした: {self.server.errorString()}", file=sys.stderr)
+        return False
+
+    def connect_receiver(self, slot):
+        """受け取ったURLをslotに渡すよう接続し、それまでに届いていたURLもまとめて渡す。"""
+        self.urls_received.connect(slot)
+        pending, self._pending = self._pending, None
+        for urls, private in pending or []:
+            self.urls_received.emit(urls, private)
+
+    def _on_new_connection(self):
+        while self.server.hasPendingConnections():
+            socket = self.server.nextPendingConnection()
+            self._buffers[socket] = b""
+            socket.readyRead.connect(lambda s=socket: self._on_ready_read(s))
+            socket.disconnected.connect(lambda s=socket: self._on_disconnected(s))
+            # 起動処理中に届いたメッセージは接続を受け付けた時点で既に読み出せる
+            if socket.bytesAvailable():
+                self._on_ready_read(socket)
+
+    def _on_ready_read(self, socket):
+        buffer = self._buffers.get(socket, b"") + bytes(socket.readAll())
+        if not buffer.endswith(b"\n"):
+            self._buffers[socket] = buffer
+            return
+        self._buffers[socket] = b""
+        try:
+            message = json.loads(buffer.decode('utf-8'))
+            urls = message.get('urls', [])
+            private = bool(message.get('private', False))
+        except (ValueError, AttributeError) as e:
+            print(f"他のインスタンスからのメッセージを読み取れませんでした: {e}", file=sys.stderr)
+            socket.disconnectFromServer()
+            return
+        socket.write(FORWARD_ACK)
+        socket.flush()
+        urls = [url for url in urls if isinstance(url, str)]
+        if self._pending is not None:
+            self._pending.append((urls, private))
+        else:
+            self.urls_received.emit(urls, private)
+
+    def _on_disconnected(self, socket):
+        self._buffers.pop(socket, None)
+        socket.deleteLater()
+
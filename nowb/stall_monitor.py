@@ -0,0 +1,247 @@
+"""
+UIスレッドの停止 (ジャンク) の検出。
+監視スレッドが一定間隔でUIスレッドにキュー経由で問い合わせを送り、応答が遅れている間は
+sys._current_frames() でUIスレッドのPythonのスタックを採取する。応答が戻ったら停止時間とスタックを記録する。
+"""
+import os
+import sys
+import time
+import datetime
+import threading
+import traceback
+from collections import Counter, deque
+from PyQt6.QtCore import Qt, pyqtSignal, QObject
+from PyQt6.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QTreeWidget, QTreeWidgetItem, QPlainTextEdit,
+                             QPushButton, QLabel, QSplitter)
+
+from .config import (DEBUG_ENV, DEFAULT_STALL_THRESHOLD_MS, STALL_IGNORE_ABOVE_S, STALL_MAX_RECORDS, STALL_PING_INTERVAL_MS,
+                     STALL_SAMPLE_INTERVAL_MS)
+from .tracing import tracer
+
+PACKAGE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+class StallRecord:
+    """1回分のUIスレッドの停止。"""
+    __slots__ = ('timestamp', 'duration_ms', 'stack', 'samples', 'location')
+
+    def __init__(self, timestamp, duration_ms, stack, samples):
+        self.timestamp = timestamp
+        self.duration_ms = duration_ms
+        self.stack = stack # 最も多く採取されたスタック (外側から内側への FrameSummary のリスト)
+        self.samples = samples
+        self.location = describe_location(stack)
+
+
+def describe_location(stack):
+    """停止の原因とみなす場所として、スタックの最も内側にあるnowbパッケージ内のフレームを返す。"""
+    if not stack or 'app.exec()' in (stack[-1].line or ''):
+        # イベントループから戻っていない = Pythonのコードではなく、Qt/Chromium内部の処理で止まっている
+        return "(Qt内部の処理)"
+    for frame in reversed(stack):
+        if os.path.abspath(frame.filename).startswith(PACKAGE_DIR):
+            return f"{frame.name} ({os.path.relpath(frame.filename, PACKAGE_DIR)}:{frame.lineno})"
+    frame = stack[-1]
+    return f"{frame.name} ({os.path.basename(frame.filename)}:{frame.lineno})"
+
+
+class StallMonitor(QObject):
+    """
+    UIスレッドの停止を検出する監視役。
+    pingは監視スレッドから発行され、このオブジェクトはUIスレッドに属するため、スロットはUIスレッドで実行される。
+    pauseで一時停止している間は監視スレッドも問い合わせを止めて待機する。
+    """
+    ping = pyqtSignal()
+
+    def __init__(self):
+        super().__init__()
+        self.threshold_ms = DEFAULT_STALL_THRESHOLD_MS
+        self.records = deque(maxlen=STALL_MAX_RECORDS)
+        self._records_lock = threading.Lock()
+        self._pong = threading.Event()
+        self._resumed = threading.Event() # 一時停止中でなければセットされている
+        self._resumed.set()
+        self._pause_count = 0
+        self._running = False
+        self._thread = None
+        self._main_thread_id = None
+        self.ping.connect(self._on_ping, Qt.ConnectionType.QueuedConnection)
+
+    def start(self, threshold_ms=DEFAULT_STALL_THRESHOLD_MS):
+        """監視を開始する。UIスレッドから呼び出す。"""
+        if self._running:
+            return
+        self.threshold_ms = threshold_ms
+        self._main_thread_id = threading.get_ident()
+        self._running = True
+        self._thread = threading.Thread(target=self._watch, name="nowb-stall-monitor", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._running = False
+        self._pong.set()
+        self._resumed.set()
+
+    @property
+    def running(self):
+        return self._running
+
+    def pause(self):
+        """
+        スリープモードの間など、監視を一時停止する。UIスレッドから呼び出し、resumeと対にする。
+        複数のウィンドウから呼ばれた場合は、すべてがresumeするまで停止したままにする。
+        """
+        self._pause_count += 1
+        self._resumed.clear()
+
+    def resume(self):
+        """pauseで一時停止した監視を再開する。"""
+        if self._pause_count == 0:
+            return
+        self._pause_count -= 1
+        if self._pause_count == 0:
+            self._resumed.set()
+
+    def _on_ping(self):
+        self._pong.set()
+
+    def _sample_main_stack(self):
+        frame = sys._current_frames().get(self._main_thread_id)
+        if frame is None:
+            return ()
+        return tuple(traceback.extract_stack(frame))
+
+    def _watch(self):
+        threshold_s = self.threshold_ms / 1000
+        while self._running:
+            self._resumed.wait()
+            if not self._running:
+                break
+            self._pong.clear()
+            sent = time.perf_counter()
+            sent_ns = time.perf_counter_ns()
+            self.ping.emit()
+            if self._pong.wait(threshold_s):
+                elapsed = time.perf_counter() - sent
+                time.sleep(max(0.0, STALL_PING_INTERVAL_MS / 1000 - elapsed))
+                continue
+            # 応答が遅れている間、UIスレッドのスタックを採取し続ける
+            samples = Counter()
+            while self._running:
+                samples[self._sample_main_stack()] += 1
+                if self._pong.wait(STALL_SAMPLE_INTERVAL_MS / 1000):
+                    break
+            if not self._running:
+                break
+            duration_s = time.perf_counter() - sent
+            if duration_s > STALL_IGNORE_ABOVE_S:
+                continue
+            self._record(duration_s * 1000, samples)
+            if tracer.enabled:
+                tracer.record("UIスレッドの停止", sent_ns, time.perf_counter_ns())
+
+    def _record(self, duration_ms, samples):
+        stack, _ = samples.most_common(1)[0]
+        record = StallRecord(datetime.datetime.now(), duration_ms, list(stack), sum(samples.values()))
+        with self._records_lock:
+            self.records.append(record)
+        print(f"UIスレッドが {duration_ms:.0f} ms 停止しました: {record.location}", file=sys.stderr)
+
+    def snapshot(self):
+        with self._records_lock:
+            return list(self.records)
+
+    def clear(self):
+        with self._records_lock:
+            self.records.clear()
+
+    def top_offenders(self):
+        """場所ごとに停止を集計し、(場所, 回数, 合計ms, 最大ms, 最長の記録) を合計時間の降順で返す。"""
+        groups = {}
+        for record in self.snapshot():
+            count, total, longest = groups.get(record.location, (0, 0.0, None))
+            if longest is None or record.duration_ms > longest.duration_ms:
+                longest = record
+            groups[record.location] = (count + 1, total + record.duration_ms, longest)
+        rows = [(location, count, total, longest.duration_ms, longest)
+                for location, (count, total, longest) in groups.items()]
+        rows.sort(key=lambda row: row[2], reverse=True)
+        return rows
+
+
+stall_monitor = StallMonitor()
+
+
+class StallReportDialog(QDialog):
+    """UIスレッドの停止を場所ごとに集計し、時間のかかっている順に表示するダイアログ。"""
+    def __init__(self, monitor, parent=None):
+        super().__init__(parent)
+        self.monitor = monitor
+        self.setWindowTitle("UIの停止 (上位)")
+        self.resize(900, 600)
+
+        layout = QVBoxLayout(self)
+        self.summary_label = QLabel()
+        layout.addWidget(self.summary_label)
+
+        splitter = QSplitter(Qt.Orientation.Vertical)
+        self.tree = QTreeWidget()
+        self.tree.setHeaderLabels(["場所", "回数", "合計 (ms)", "最大 (ms)"])
+        self.tree.setRootIsDecorated(False)
+        self.tree.setSortingEnabled(False)
+        self.tree.currentItemChanged.connect(self._show_stack)
+        splitter.addWidget(self.tree)
+        self.stack_view = QPlainTextEdit()
+        self.stack_view.setReadOnly(True)
+        splitter.addWidget(self.stack_view)
+        splitter.setSizes([300, 300])
+        layout.addWidget(splitter)
+
+        buttons = QHBoxLayout()
+        refresh_button = QPushButton("更新")
+        refresh_button.clicked.connect(self.refresh)
+        clear_button = QPushButton("記録を消去")
+        clear_button.clicked.connect(self._clear)
+        close_button = QPushButton("閉じる")
+        close_button.clicked.connect(self.accept)
+        buttons.addWidget(refresh_button)
+        buttons.addWidget(clear_button)
+        buttons.addStretch()
+        buttons.addWidget(close_button)
+        layout.addLayout(buttons)
+
+        self.refresh()
+
+    def refresh(self):
+        self.tree.clear()
+        rows = self.monitor.top_offenders()
+        total_count = sum(row[1] for row in rows)
+        summary = f"しきい値 {self.monitor.threshold_ms} ms を超えた停止: {total_count} 回"
+        if not self.monitor.running:
+            summary += f" (監視は無効です。--debug か環境変数{DEBUG_ENV}=1で起動すると有効になります)"
+        self.summary_label.setText(summary)
+        for location, count, total_ms, max_ms, longest in rows:
+            item = QTreeWidgetItem([location, str(count), f"{total_ms:.0f}", f"{max_ms:.0f}"])
+            for column in (1, 2, 3):
+                item.setTextAlignment(column, Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter)
+            item.setData(0, Qt.ItemDataRole.UserRole, longest)
+            self.tree.addTopLevelItem(item)
+        for column in range(1, 4):
+            self.tree.resizeColumnToContents(column)
+        self.tree.setColumnWidth(0, 520)
+        if self.tree.topLevelItemCount():
+            self.tree.setCurrentItem(self.tree.topLevelItem(0))
+        else:
+            self.stack_view.setPlainText("記録された停止はありません。")
+
+    def _show_stack(self, current, _previous):
+        if current is None:
+            return
+        record = current.data(0, Qt.ItemDataRole.UserRole)
+        header = (f"最長の停止: {record.duration_ms:.0f} ms ({record.timestamp.strftime('%H:%M:%S')}, "
+                  f"スタックの採取 {record.samples} 回)\n\n")
+        self.stack_view.setPlainText(header + "".join(traceback.format_list(record.stack)))
+
+    def _clear(self):
+        self.monitor.clear()
+        self.refresh()
@@ -0,0 +1,119 @@
+"""起動時のファイル先読みと、起動フェーズの計測。"""
+import sys
+import time
+import os
+import json
+import datetime
+from PyQt6.QtCore import Qt, QTimer, QObject, QEvent
+
+from .config import STARTUP_PROFILE_FILE, STARTUP_REPORT_FILE, profile_path
+
+class StartupPreloader:
+    """
+    起動時に必要なファイルの読み込みを、QApplicationの作成直後からワーカースレッドで並行して行う。
+    ウィジェットの構築と並行して進め、結果は最初に使う時点でtakeで待ち合わせる。
+    """
+    def __init__(self):
+        self._futures = {}
+
+    def start(self, tasks):
+        """tasks: 名前 -> 引数なしの関数 の辞書"""
+        from concurrent.futures import ThreadPoolExecutor
+        executor = ThreadPoolExecutor(max_workers=len(tasks), thread_name_prefix="nowb-startup")
+        for name, task in tasks.items():
+            self._futures[name] = executor.submit(task)
+        executor.shutdown(wait=False) # 投入済みのタスクは最後まで実行される
+
+    def take(self, name):
+        """
+        先読みした結果を待って返す。先読みしていないか失敗した場合はNoneを返し、呼び出し側で読み込む。
+        結果は一度しか返さない (以降の読み込みは常に最新のファイルから行われる)。
+        """
+        future = self._futures.pop(name, None)
+        if future is None:
+            return None
+        try:
+            return future.result()
+        except Exception as e:
+            print(f"起動時の先読みに失敗しました ({name}): {e}", file=sys.stderr)
+            return None
+
+startup_preloader = StartupPreloader()
+
+class StartupProfiler(QObject):
+    """
+    起動処理の各フェーズの所要時間をモノトニック時計で計測する。
+    フェーズが終わるたびにスプラッシュスクリーンに表示し、最初の描画が終わったらJSONのレポートを書き出す。
+    """
+    def __init__(self):
+        super().__init__()
+        self.start_time = time.monotonic()
+        self.cprofile = None # --startup-profile 指定時のみ
+        self.splash = None
+        self.phases = []
+        self.finished = False
+        self._last_time = self.start_time
+
+    def begin(self, start_time, cprofile=None):
+        """計測の起点を設定する。起動スクリプトがプロセス開始直後に記録した時刻を渡す。"""
+        self.start_time = start_time
+        self._last_time = start_time
+        self.cprofile = cprofile
+
+    def mark(self, name):
+        """前回のマークから現在までをフェーズnameとして記録する。起動完了後は何もしない。"""
+        if self.finished:
+            return
+        now = time.monotonic()
+        duration_ms = (now - self._last_time) * 1000
+        self._last_time = now
+        self.phases.append({
+            'name': name,
+            'duration_ms': round(duration_ms, 2),
+            'elapsed_ms': round((now - self.start_time) * 1000, 2),
+        })
+        if self.splash is not None:
+            self.splash.showMessage(f"起動中... {name} ({duration_ms:.0f} ms)",
+                                    Qt.AlignmentFlag.AlignBottom | Qt.AlignmentFlag.AlignCenter,
+                                    Qt.GlobalColor.white)
+
+    def watch_first_paint(self, widget):
+        """ウィジェットが最初に描画されたときに計測を終える。"""
+        widget.installEventFilter(self)
+
+    def eventFilter(self, obj, event):
+        if event.type() == QEvent.Type.Paint:
+            obj.removeEventFilter(self)
+            self.mark('first_paint')
+            # 描画処理を邪魔しないよう、レポートはイベントループに戻ってから書き出す
+            QTimer.singleShot(0, self.finish)
+        return super().eventFilter(obj, event)
+
+    def finish(self):
+        """計測を終了し、レポートを書き出す。"""
+        if self.finished:
+            return
+        self.finished = True
+        total_ms = (self._last_time - self.start_time) * 1000
+        report = {
+            'timestamp': datetime.datetime.now().isoformat(),
+            'total_ms': round(total_ms, 2),
+            'phases': self.phases,
+        }
+        if self.cprofile is not None:
+            self.cprofile.disable()
+            profile_file = profile_path(STARTUP_PROFILE_FILE)
+            try:
+                self.cprofile.dump_stats(profile_file)
+                report['cprofile'] = os.path.abspath(profile_file)
+            except OSError as e:
+                print(f"起動プロファイルの保存に失敗しました: {e}", file=sys.stderr)
+        report_file = profile_path(STARTUP_REPORT_FILE)
+        try:
+            with open(report_file, 'w', encoding='utf-8') as f:
+                json.dump(report, f, indent=4, ensure_ascii=False)
+        except IOError as e:
+            print(f"起動レポートの保存に失敗しました: {e}", file=sys.stderr)
+        print(f"起動完了: {total_ms:.0f} ms (詳細は '{report_file}')")
+
+startup_profiler = StartupProfiler()
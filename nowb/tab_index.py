@@ -0,0 +1,244 @@
+"""タブのあいまい検索用インデックス。"""
+import re
+import heapq
+import weakref
+from itertools import islice
+
+
+# --- クイックオープン(Ctrl+K)用のあいまい検索 ---
+FUZZY_WORD_SEPARATORS = frozenset(" /.-_:?&=#")
+FUZZY_TITLE_BONUS = 2 # URLよりタイトルでの一致を優先する
+WORD_PREFIX_LENGTH = 3 # 単語の先頭の何文字までを接頭辞インデックスに登録するか
+# 1回の検索でfuzzy_scoreを評価する候補の上限。1万タブでも1文字入力あたり5ms以内に収めるための値
+SEARCH_SCORE_BUDGET = 250
+# 候補が多いときに、集合演算の前に新しい順に調べるエントリの数 (評価する候補の上限に対する倍率)
+RECENT_SCAN_FACTOR = 4
+
+_NO_KEYS = frozenset()
+_WORD_SPLIT = re.compile("[" + re.escape("".join(sorted(FUZZY_WORD_SEPARATORS))) + "]+")
+
+def fuzzy_score(query, text):
+    """
+    queryがtextの部分列であれば一致スコアを、そうでなければNoneを返す。
+    連続した一致や単語の先頭での一致ほど高く、離れた一致ほど低く評価する。
+    """
+    # よくある「部分文字列としての一致」はC実装のfindだけで評価する
+    position = text.find(query)
+    if position != -1:
+        return _fuzzy_char_score(text, position, -1) + 3 * (len(query) - 1)
+
+    score = 0
+    previous = -1
+    for char in query:
+        position = text.find(char, previous + 1)
+        if position == -1:
+            return None
+        score += _fuzzy_char_score(text, position, previous)
+        previous = position
+    return score
+
+def _fuzzy_char_score(text, position, previous):
+    """1文字分の一致スコア。連続一致や単語の先頭ほど高く、離れた一致ほど低い。"""
+    if position == previous + 1:
+        return 3 # 連続一致
+    if text[position - 1] in FUZZY_WORD_SEPARATORS:
+        return 2 # 単語の先頭
+    return -min(position - previous, 5) # 離れた一致
+
+class TabIndexEntry:
+    """タブ検索インデックスの1エントリ。ウィンドウとタブはweakrefで保持する。"""
+    __slots__ = ('window_ref', 'widget_ref', 'title', 'url', 'title_key', 'url_key', 'chars', 'prefixes')
+
+    def __init__(self, window, widget, title, url):
+        self.window_ref = weakref.ref(window)
+        self.widget_ref = weakref.ref(widget)
+        self.title = title
+        self.url = url
+        self.refresh()
+
+    def refresh(self):
+        """検索用の小文字化した文字列、文字集合、単語の先頭の接頭辞の集合を作り直す。"""
+        self.title_key = self.title.lower()
+        self.url_key = self.url.lower()
+        self.chars = frozenset(self.title_key) | frozenset(self.url_key)
+        self.prefixes = frozenset(word[:length]
+                                  for word in _WORD_SPLIT.split(self.title_key) + _WORD_SPLIT.split(self.url_key)
+                                  for length in range(1, min(len(word), WORD_PREFIX_LENGTH) + 1))
+
+class TabSearchIndex:
+    """
+    すべてのウィンドウのタブ(未読み込みのタブを含む)のタイトルとURLを保持する検索インデックス。
+    タイトル/URLの変更シグナルで逐次更新する。検索時は文字ごとの転置インデックスの積集合で候補を絞り、
+    前回のクエリを延長した入力では前回の候補だけを再評価する。
+    候補がSEARCH_SCORE_BUDGETを超える短いクエリでは、単語の先頭で一致する候補を優先し、
+    その中でも最近追加・更新されたタブから順に上限件数だけ評価する。
+    """
+    def __init__(self):
+        self._entries = {} # id(widget) -> TabIndexEntry (最近追加・更新したものほど後ろ)
+        self._order = {} # id(widget) -> 追加・更新した順番。大きいほど新しい
+        self._sequence = 0
+        self._by_char = {} # 文字 -> その文字を含むエントリのキーの集合
+        # 単語の先頭の接頭辞 -> その接頭辞で始まる単語を持つエントリのキーを最近追加・更新した順に並べた辞書 (値はNone)
+        self._by_prefix = {}
+        self.version = 0
+        self._last_query = ""
+        self._last_version = -1
+        self._last_matches = None # 前回一致したエントリのキーの集合 (評価を打ち切った場合はNone)
+
+    def _index(self, key, entry):
+        self._entries[key] = entry
+        self._order[key] = self._sequence
+        self._sequence += 1
+        for char in entry.chars:
+            self._by_char.setdefault(char, set()).add(key)
+        for prefix in entry.prefixes:
+            self._by_prefix.setdefault(prefix, {})[key] = None
+
+    def _unindex(self, key, entry):
+        for table, terms in ((self._by_char, entry.chars), (self._by_prefix, entry.prefixes)):
+            for term in terms:
+                keys = table.get(term)
+                if keys is not None:
+                    if isinstance(keys, set):
+                        keys.discard(key)
+                    else:
+                        keys.pop(key, None)
+                    if not keys:
+                        del table[term]
+
+    def _discard(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            del self._order[key]
+            self._unindex(key, entry)
+        return entry
+
+    def add(self, window, widget, title, url):
+        key = id(widget)
+        self._discard(key)
+        entry = TabIndexEntry(window, widget, title or url, url)
+        self._index(key, entry)
+        self.version += 1
+
+    def update(self, widget, title=None, url=None):
+        """登録済みのタブのタイトル/URLを更新する。未登録のビュー(ウォームプール内など)は無視する。"""
+        key = id(widget)
+        entry = self._entries.get(key)
+        if entry is None or entry.widget_ref() is not widget:
+            return
+        self._discard(key)
+        if title:
+            entry.title = title
+        if url is not None:
+            entry.url = url
+        entry.refresh()
+        self._index(key, entry)
+        self.version += 1
+
+    def remove(self, widget):
+        if self._discard(id(widget)) is not None:
+            self.version += 1
+
+    def remove_window(self, window):
+        """閉じられたウィンドウのタブをすべて削除する。"""
+        for key, entry in list(self._entries.items()):
+            if entry.window_ref() in (window, None):
+                self._discard(key)
+        self.version += 1
+
+    def _take_recent(self, ordered, postings, exclude, count):
+        """
+        orderedのキーのうちpostingsのすべての集合に含まれ、excludeに含まれないものを、
+        最近追加・更新された順にcount件まで返す。orderedはキーを古い順に並べた辞書。
+        2つ目の戻り値は、該当するキーをすべて返したかどうか。
+        """
+        chosen = []
+        # 該当するキーが多ければ、新しいものから順に調べるだけで集まる
+        for key in islice(reversed(ordered), RECENT_SCAN_FACTOR * count):
+            if key in exclude:
+                continue
+            for keys in postings:
+                if key not in keys:
+                    break
+            else:
+                chosen.append(key)
+                if len(chosen) >= count:
+                    return chosen, False
+        if len(ordered) <= RECENT_SCAN_FACTOR * count:
+            return chosen, True
+        # 該当するキーが少なければ、集合演算でまとめて求めてから新しい順に並べる
+        hits = ordered.keys() - exclude
+        for keys in postings:
+            hits &= keys
+        if len(hits) <= count:
+            return sorted(hits, key=self._order.__getitem__, reverse=True), True
+        return list(islice((key for key in reversed(ordered) if key in hits), count)), False
+
+    def _candidate_keys(self, query, limit):
+        """
+        評価する候補のキーと、それがqueryの文字をすべて含むエントリを漏れなく含むかどうかを返す。
+        どの文字も多数のエントリに含まれる短いクエリでは、すべての候補を求めずに
+        単語の先頭でqueryの先頭部分と一致するものを、最近追加・更新された順にSEARCH_SCORE_BUDGET件まで集める。
+        """
+        query_chars = set(query)
+        postings = sorted((self._by_char.get(char, _NO_KEYS) for char in query_chars), key=len)
+        if not postings[0]:
+            return _NO_KEYS, True
+        # 前回のクエリを延長した入力なら、前回一致したものだけを調べれば十分
+        # (インデックスが更新されていないことをversionで確認する)
+        if (self._last_matches is not None and self._last_query and query.startswith(self._last_query)
+                and self._last_version == self.version):
+            return self._last_matches.intersection(*postings), True
+        if len(postings[0]) <= SEARCH_SCORE_BUDGET:
+            return postings[0].intersection(*postings[1:]), True
+
+        chosen = []
+        seen = set()
+        for prefix in dict.fromkeys((query[:WORD_PREFIX_LENGTH], query[:1])):
+            bucket = self._by_prefix.get(prefix)
+            if not bucket:
+                continue
+            others = [self._by_char[char] for char in query_chars - set(prefix)]
+            hits, complete = self._take_recent(bucket, others, seen, SEARCH_SCORE_BUDGET - len(chosen))
+            chosen.extend(hits)
+            if not complete or len(chosen) >= limit:
+                return chosen, False
+            seen.update(hits)
+        # 単語の先頭での一致が少なければ、残りの候補からも補う
+        hits, complete = self._take_recent(self._entries, postings, seen, SEARCH_SCORE_BUDGET - len(chosen))
+        chosen.extend(hits)
+        return chosen, complete
+
+    def search(self, query, limit=50):
+        """queryにあいまい一致するエントリをスコアの高い順に最大limit件返す。"""
+        query = query.lower().replace(" ", "")
+        if not query:
+            return list(islice(self._entries.values(), limit))
+
+        keys, complete = self._candidate_keys(query, limit)
+
+        entries = self._entries
+        order = self._order
+        score_of = fuzzy_score # ループ内の名前解決を減らす
+        matched = []
+        scored = []
+        for key in keys:
+            entry = entries[key]
+            # タイトルで一致すればURLは調べない (タイトルでの一致を優先する)
+            score = score_of(query, entry.title_key)
+            if score is not None:
+                score += FUZZY_TITLE_BONUS
+            else:
+                score = score_of(query, entry.url_key)
+                if score is None:
+                    continue
+            matched.append(key)
+            scored.append((score, order[key], key)) # 同じスコアなら最近追加・更新されたタブを優先する
+
+        # 評価を打ち切った場合、一致の一覧は不完全なので次の入力の絞り込みには使わない
+        self._last_query, self._last_version = query, self.version
+        self._last_matches = set(matched) if complete else None
+        return [entries[key] for _, _, key in heapq.nlargest(limit, scored)]
+
+# 全ウィンドウで共有するタブ検索インデックス
+tab_search_index = TabSearchIndex()
@@ -0,0 +1,388 @@
+"""タブ関連のウィジェット (タブ本体、未読み込み・クラッシュ時のプレースホルダー、縦タブ、クイックオープン、タブ一覧)。"""
+from PyQt6.QtCore import (QUrl, Qt, pyqtSignal, QEvent, QByteArray, QAbstractListModel, QModelIndex,
+                          QSortFilterProxyModel, QMimeData)
+from PyQt6.QtWidgets import (QLineEdit, QTabWidget, QTabBar, QLabel, QWidget, QDialog, QListWidget, QPushButton, QVBoxLayout,
+                             QListWidgetItem, QListView, QAbstractItemView)
+from PyQt6.QtGui import QPalette, QPixmap, QIcon
+
+from PyQt6.QtWebEngineWidgets import QWebEngineView
+from .config import THUMBNAIL_SIZE
+
+class UnloadedTabPlaceholder(QWidget):
+    """
+    まだロードされていないタブのプレースホルダー。
+    クリックされると実際のWebEngineViewに置き換えられる。
+    起動時のセッション復元を高速化するために使用する。
+    history_dataとscroll_posがあれば、読み込むときに履歴とスクロール位置を復元する。
+    """
+    def __init__(self, url, title, parent=None, history_data=None, scroll_pos=None):
+        super().__init__(parent)
+        self.url = QUrl(url)
+        self.title = title if title else url
+        self.history_data = history_data # serialize_historyで保存した戻る・進むの履歴
+        self.scroll_pos = scroll_pos # (x, y)
+
+        layout = QVBoxLayout(self)
+        layout.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        
+        # テーマに合わせて色が変わるようにする
+        palette = self.palette()
+        text_color = palette.color(QPalette.ColorRole.Text)
+        
+        self._build_contents(layout, text_color)
+        self.setAutoFillBackground(True)
+
+    def _build_contents(self, layout, text_color):
+        label = QLabel(f"タブはまだ読み込まれていません\n\n<b>{self.title}</b>\n\n<p style='color: {text_color.name()};'>クリックして読み込みます</p>")
+        label.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        label.setWordWrap(True)
+        layout.addWidget(label)
+
+
+class CrashedTabPlaceholder(UnloadedTabPlaceholder):
+    """
+    レンダラープロセスが終了したタブの代わりに表示する軽量なプレースホルダー。
+    アクティブにするか再読み込みボタンを押すと、履歴とスクロール位置を復元して読み込み直す。
+    """
+    reload_requested = pyqtSignal()
+
+    def __init__(self, url, title, reason, history_data=None, scroll_pos=None, parent=None):
+        self.reason = reason # _build_contentsより先に必要
+        super().__init__(url, title, parent, history_data, scroll_pos)
+
+    def _build_contents(self, layout, text_color):
+        label = QLabel(f"このタブは正常に表示できませんでした ({self.reason})\n\n<b>{self.title}</b>\n\n<p style='color: {text_color.name()};'>タブを開き直すと再読み込みします</p>")
+        label.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        label.setWordWrap(True)
+        layout.addWidget(label)
+        reload_button = QPushButton("再読み込み")
+        reload_button.clicked.connect(self.reload_requested)
+        layout.addWidget(reload_button, alignment=Qt.AlignmentFlag.AlignCenter)
+
+def get_tab_scroll(widget):
+    """
+    タブのスクロール位置 (x, y) を返す。記録がなければNone。
+    表示中のページは現在の位置を、レンダラーが終了したページは最後に報告された位置を使う。
+    """
+    if isinstance(widget, UnloadedTabPlaceholder):
+        return widget.scroll_pos
+    if not isinstance(widget, QWebEngineView):
+        return None
+    pos = widget.page().scrollPosition()
+    if pos.x() or pos.y():
+        return pos.x(), pos.y()
+    snapshot = getattr(widget, 'scroll_snapshot', None)
+    # 別のページに移動する前に報告された位置は使わない
+    if snapshot and QUrl(snapshot[0]).matches(widget.url(), QUrl.UrlFormattingOption.StripTrailingSlash):
+        return snapshot[1], snapshot[2]
+    return None
+
+def get_tab_url(widget):
+    """タブのウィジェット(ビューまたはプレースホルダー)のURL文字列を返す。"""
+    if isinstance(widget, QWebEngineView):
+        return widget.url().toString()
+    if isinstance(widget, UnloadedTabPlaceholder):
+        return widget.url.toString()
+    return ""
+
+class BrowserTabWidget(QTabWidget):
+    """
+    タブの追加・削除をシグナルで通知するQTabWidget。垂直タブリストのモデル同期に使う。
+    表示中のタブが切り替わる直前には、まだ表示されている切り替え前のタブをcurrent_about_to_changeで通知する。
+    ページのシグナルのたびに呼ばれるrow_ofのために、ウィジェットから位置への対応を保持する。
+    """
+    tab_inserted = pyqtSignal(int)
+    tab_removed = pyqtSignal(int)
+    current_about_to_change = pyqtSignal(QWidget) # 切り替え前のタブのウィジェット
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        # QTabWidgetはタブバーのcurrentChangedを受けてページを切り替える。
+        # スロットは接続した順に呼ばれるので、setTabBarより先に接続すれば切り替え前に呼ばれる。
+        tab_bar = QTabBar(self)
+        tab_bar.currentChanged.connect(self._on_tab_bar_current_changed)
+        tab_bar.tabMoved.connect(self._invalidate_rows)
+        self.setTabBar(tab_bar)
+        self._rows = None # widget -> 位置 (タブの追加・削除・移動で破棄し、次に使うときに作り直す)
+
+    def row_of(self, widget):
+        """
+        ウィジェットのタブの位置を返す。なければ-1。
+        indexOfはタブを先頭から順に調べるため、タイトルやアイコンの更新のたびに呼ぶと数千タブで重くなる。
+        """
+        if self._rows is None:
+            self._rows = {self.widget(i): i for i in range(self.count())}
+        return self._rows.get(widget, -1)
+
+    def _invalidate_rows(self, *args):
+        self._rows = None
+
+    def _on_tab_bar_current_changed(self, index):
+        # この時点ではまだページは切り替わっておらず、currentWidgetは切り替え前のタブを返す
+        previous = self.currentWidget()
+        if previous is not None and previous is not self.widget(index):
+            self.current_about_to_change.emit(previous)
+
+    def tabInserted(self, index):
+        super().tabInserted(index)
+        self._rows = None
+        self.tab_inserted.emit(index)
+
+    def tabRemoved(self, index):
+        super().tabRemoved(index)
+        self._rows = None
+        self.tab_removed.emit(index)
+
+class TabListModel(QAbstractListModel):
+    """
+    垂直タブリスト用のモデル。BrowserTabWidgetのタブをそのまま行として公開する。
+    タイトルやアイコンは表示される行の分だけタブウィジェットから取得し、
+    変更はrefresh_rowでdataChangedとして通知するため、数千タブでも軽く動作する。
+    """
+    SEARCH_ROLE = Qt.ItemDataRole.UserRole + 1 # 絞り込み用 (タイトル + URL)
+    TAB_MIME_TYPE = "application/x-nowb-tab-index"
+
+    def __init__(self, tabs, parent=None):
+        super().__init__(parent)
+        self.tabs = tabs
+        self._count = tabs.count()
+        tabs.tab_inserted.connect(self._on_tab_inserted)
+        tabs.tab_removed.connect(self._on_tab_removed)
+        tabs.tabBar().tabMoved.connect(self._on_tab_moved)
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self._count
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid() or index.row() >= self.tabs.count():
+            return None
+        row = index.row()
+        if role == Qt.ItemDataRole.DisplayRole:
+            return self.tabs.tabText(row)
+        if role == Qt.ItemDataRole.DecorationRole:
+            return self.tabs.tabIcon(row)
+        if role == Qt.ItemDataRole.ToolTipRole:
+            return self.tabs.tabToolTip(row) or get_tab_url(self.tabs.widget(row))
+        if role == self.SEARCH_ROLE:
+            return f"{self.tabs.tabText(row)} {get_tab_url(self.tabs.widget(row))}"
+        return None
+
+    def flags(self, index):
+        if not index.isValid():
+            return Qt.ItemFlag.ItemIsDropEnabled
+        return Qt.ItemFlag.ItemIsEnabled | Qt.ItemFlag.ItemIsSelectable | Qt.ItemFlag.ItemIsDragEnabled
+
+    def supportedDropActions(self):
+        return Qt.DropAction.MoveAction
+
+    def mimeTypes(self):
+        return [self.TAB_MIME_TYPE]
+
+    def mimeData(self, indexes):
+        mime_data = QMimeData()
+        if indexes:
+            mime_data.setData(self.TAB_MIME_TYPE, QByteArray(str(indexes[0].row()).encode()))
+        return mime_data
+
+    def dropMimeData(self, data, action, row, column, parent):
+        """ドラッグで並べ替えられたタブを、タブバー側で移動する。"""
+        if action != Qt.DropAction.MoveAction or not data.hasFormat(self.TAB_MIME_TYPE):
+            return False
+        from_row = int(bytes(data.data(self.TAB_MIME_TYPE)).decode())
+        if row == -1:
+            row = parent.row() if parent.isValid() else self._count
+        to_row = row - 1 if row > from_row else row
+        if to_row != from_row:
+            # 行の移動はtabMovedシグナル経由で_on_tab_movedが反映する
+            self.tabs.tabBar().moveTab(from_row, to_row)
+        # ビュー側で元の行が削除されないようにFalseを返す
+        return False
+
+    def refresh_row(self, row):
+        """タブのタイトルやアイコンが変わったことをビューに通知する。"""
+        if 0 <= row < self._count:
+            index = self.index(row)
+            self.dataChanged.emit(index, index)
+
+    def reset(self):
+        """シグナルを止めた一括操作の後などに、タブウィジェットの状態から作り直す。"""
+        self.beginResetModel()
+        self._count = self.tabs.count()
+        self.endResetModel()
+
+    def _on_tab_inserted(self, index):
+        self.beginInsertRows(QModelIndex(), index, index)
+        self._count += 1
+        self.endInsertRows()
+
+    def _on_tab_removed(self, index):
+        self.beginRemoveRows(QModelIndex(), index, index)
+        self._count -= 1
+        self.endRemoveRows()
+
+    def _on_tab_moved(self, from_index, to_index):
+        destination = to_index + 1 if to_index > from_index else to_index
+        if self.beginMoveRows(QModelIndex(), from_index, from_index, QModelIndex(), destination):
+            self.endMoveRows()
+
+class VerticalTabSidebar(QWidget):
+    """
+    垂直タブのサイドバー。QListView(uniformItemSizes)で表示される行だけを描画し、
+    入力欄によるタイトル/URLの絞り込みとドラッグによる並べ替えに対応する。
+    """
+    def __init__(self, tabs, parent=None):
+        super().__init__(parent)
+        self.tabs = tabs
+
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+        self.filter_input = QLineEdit()
+        self.filter_input.setPlaceholderText("タブを絞り込み...")
+        self.filter_input.setClearButtonEnabled(True)
+        layout.addWidget(self.filter_input)
+
+        self.model = TabListModel(tabs, self)
+        self.proxy_model = QSortFilterProxyModel(self)
+        self.proxy_model.setSourceModel(self.model)
+        self.proxy_model.setFilterRole(TabListModel.SEARCH_ROLE)
+        self.proxy_model.setFilterCaseSensitivity(Qt.CaseSensitivity.CaseInsensitive)
+        self.filter_input.textChanged.connect(self.proxy_model.setFilterFixedString)
+
+        self.list_view = QListView()
+        self.list_view.setModel(self.proxy_model)
+        self.list_view.setUniformItemSizes(True) # 行の高さを固定し、レイアウト計算を省く
+        self.list_view.setVerticalScrollMode(QAbstractItemView.ScrollMode.ScrollPerPixel)
+        self.list_view.setSelectionMode(QAbstractItemView.SelectionMode.SingleSelection)
+        self.list_view.setDragDropMode(QAbstractItemView.DragDropMode.InternalMove)
+        self.list_view.setDefaultDropAction(Qt.DropAction.MoveAction)
+        self.list_view.setTextElideMode(Qt.TextElideMode.ElideRight)
+        self.list_view.clicked.connect(self._activate_tab)
+        layout.addWidget(self.list_view)
+
+        tabs.currentChanged.connect(self.select_tab)
+        self.select_tab(tabs.currentIndex())
+
+    def _activate_tab(self, proxy_index):
+        self.tabs.setCurrentIndex(self.proxy_model.mapToSource(proxy_index).row())
+
+    def select_tab(self, index):
+        """現在のタブをリスト上で選択し、見える位置までスクロールする。"""
+        proxy_index = self.proxy_model.mapFromSource(self.model.index(index))
+        if proxy_index.isValid():
+            self.list_view.setCurrentIndex(proxy_index)
+            self.list_view.scrollTo(proxy_index)
+
+class QuickOpenDialog(QDialog):
+    """
+    Ctrl+Kで開くタブ切り替えパレット。
+    すべてのウィンドウの開いているタブと未読み込みのタブを、タイトルとURLであいまい検索する。
+    """
+    MAX_RESULTS = 50
+
+    def __init__(self, index, parent=None):
+        super().__init__(parent)
+        self.index = index
+        self.setWindowTitle("タブを検索")
+        self.setMinimumSize(500, 400)
+
+        layout = QVBoxLayout(self)
+        self.search_input = QLineEdit()
+        self.search_input.setPlaceholderText("タブのタイトルまたはURLを入力...")
+        self.search_input.installEventFilter(self)
+        layout.addWidget(self.search_input)
+        self.result_list = QListWidget()
+        self.result_list.setUniformItemSizes(True)
+        layout.addWidget(self.result_list)
+
+        self.search_input.textChanged.connect(self.update_results)
+        self.search_input.returnPressed.connect(self.activate_current)
+        self.result_list.itemActivated.connect(lambda item: self.activate_current())
+        self.update_results("")
+
+    def eventFilter(self, obj, event):
+        """入力欄にフォーカスを置いたまま、上下キーで候補を選べるようにする。"""
+        if obj is self.search_input and event.type() == QEvent.Type.KeyPress:
+            if event.key() in (Qt.Key.Key_Down, Qt.Key.Key_Up):
+                step = 1 if event.key() == Qt.Key.Key_Down else -1
+                row = max(0, min(self.result_list.count() - 1, self.result_list.currentRow() + step))
+                self.result_list.setCurrentRow(row)
+                return True
+        return super().eventFilter(obj, event)
+
+    def update_results(self, text):
+        self.result_list.clear()
+        for entry in self.index.search(text, self.MAX_RESULTS):
+            item = QListWidgetItem(f"{entry.title}\n{entry.url}")
+            item.setData(Qt.ItemDataRole.UserRole, entry)
+            self.result_list.addItem(item)
+        if self.result_list.count():
+            self.result_list.setCurrentRow(0)
+
+    def activate_current(self):
+        """選択中のタブを持つウィンドウを前面に出し、そのタブに切り替える。"""
+        item = self.result_list.currentItem()
+        if item is None:
+            return
+        entry = item.data(Qt.ItemDataRole.UserRole)
+        window, widget = entry.window_ref(), entry.widget_ref()
+        if window is None or widget is None:
+            return
+        index = window.tabs.indexOf(widget)
+        if index == -1:
+            return
+        window.tabs.setCurrentIndex(index)
+        if window.isMinimized():
+            window.showNormal()
+        window.raise_()
+        window.activateWindow()
+        self.accept()
+
+class TabOverviewDialog(QDialog):
+    """開いているすべてのタブをサムネイルのグリッドで表示し、クリックで切り替えるダイアログ。"""
+    def __init__(self, window, parent=None):
+        super().__init__(parent)
+        self.window = window
+        self.setWindowTitle("タブ一覧")
+        self.setMinimumSize(800, 600)
+
+        layout = QVBoxLayout(self)
+        self.grid = QListWidget()
+        self.grid.setViewMode(QListView.ViewMode.IconMode)
+        self.grid.setIconSize(THUMBNAIL_SIZE)
+        self.grid.setResizeMode(QListView.ResizeMode.Adjust)
+        self.grid.setMovement(QListView.Movement.Static)
+        self.grid.setUniformItemSizes(True)
+        self.grid.setWordWrap(True)
+        self.grid.itemActivated.connect(self.activate_item)
+        self.grid.itemClicked.connect(self.activate_item)
+        layout.addWidget(self.grid)
+
+        self._items_by_url = {}
+        tabs = window.tabs
+        for i in range(tabs.count()):
+            url = get_tab_url(tabs.widget(i))
+            item = QListWidgetItem(tabs.tabText(i))
+            item.setToolTip(url)
+            item.setData(Qt.ItemDataRole.UserRole, i)
+            self._set_item_thumbnail(item, url)
+            self.grid.addItem(item)
+            self._items_by_url.setdefault(url, []).append(item)
+        # キャプチャが後から届いた場合に反映する
+        window.thumbnail_cache.thumbnail_updated.connect(self.update_thumbnail)
+
+    def _set_item_thumbnail(self, item, url):
+        image = self.window.thumbnail_cache.get(url)
+        if image is not None:
+            item.setIcon(QIcon(QPixmap.fromImage(image)))
+
+    def update_thumbnail(self, url):
+        for item in self._items_by_url.get(url, []):
+            self._set_item_thumbnail(item, url)
+
+    def activate_item(self, item):
+        self.window.tabs.setCurrentIndex(item.data(Qt.ItemDataRole.UserRole))
+        self.accept()
+
+    def done(self, result):
+        self.window.thumbnail_cache.thumbnail_updated.disconnect(self.update_thumbnail)
+        super().done(result)
@@ -0,0 +1,84 @@
+"""テーマの検出とテーマ変更の通知、アイコンのキャッシュ。"""
+import sys
+import platform
+import os
+from PyQt6.QtCore import QSize, pyqtSignal, QObject
+from PyQt6.QtGui import QIcon
+
+try:
+    import qtawesome as qta
+except ImportError:
+    print("警告: qtawesomeがインストールされていません。モダンアイコンは表示されません。", file=sys.stderr)
+    print("インストールするには、ターミナルで 'pip install qtawesome' を実行してください。", file=sys.stderr)
+    qta = None
+
+# テーマごとのアイコンの既定の色 (ないテーマはqtawesomeの既定の色)
+THEME_ICON_COLORS = {'dark': '#DCDCDC'}
+
+# テーマ変更を通知するためのグローバルシグナルクラス
+class ThemeSignal(QObject):
+    theme_changed = pyqtSignal(str)
+theme_signal = ThemeSignal()
+
+class IconCache:
+    """
+    qtawesomeのアイコンをプロセス全体で共有するキャッシュ。
+    (名前, 色, サイズ, テーマ) ごとに一度だけピクスマップを描画し、以降は同じQIconを返す。
+    色を指定しなければテーマに合わせた色で描画する。テーマが変わると破棄する。
+    qtawesomeがなければ空のQIconを返す。
+    """
+    def __init__(self):
+        self.theme = None
+        self._icons = {}
+
+    def get(self, name, color=None, size=16):
+        if not qta:
+            return QIcon()
+        color = color or THEME_ICON_COLORS.get(self.theme)
+        key = (name, color, size, self.theme)
+        icon = self._icons.get(key)
+        if icon is None:
+            options = {'color': color} if color else {}
+            # qtawesomeのアイコンは表示のたびにフォントのグリフを描画するため、固定サイズのピクスマップにしておく
+            icon = QIcon(qta.icon(name, **options).pixmap(QSize(size, size)))
+            self._icons[key] = icon
+        return icon
+
+    def invalidate(self, theme=None):
+        self.theme = theme
+        self._icons.clear()
+
+icon_cache = IconCache()
+theme_signal.theme_changed.connect(icon_cache.invalidate)
+
+def get_system_theme_mode():
+    """
+    システムのテーマ設定 (ダーク/ライト) を取得する (macOS, Windows, Linux)。
+    """
+    if platform.system() == "Darwin":
+        try:
+            import subprocess
+            result = subprocess.run(['defaults', 'read', '-g', 'AppleInterfaceStyle'], capture_output=True, text=True)
+            return 'dark' if result.returncode == 0 and 'Dark' in result.stdout else 'light'
+        except Exception:
+            return 'light'
+    elif platform.system() == "Windows":
+        try:
+            import winreg
+            reg_key = winreg.OpenKey(winreg.HKEY_CURRENT_USER, r'Software\Microsoft\Windows\CurrentVersion\Themes\Personalize')
+            value, _ = winreg.QueryValueEx(reg_key, 'AppsUseLightTheme')
+            return 'light' if value == 1 else 'dark'
+        except Exception:
+            return 'light'
+    elif platform.system() == "Linux":
+        try:
+            settings_path = os.path.expanduser('~/.config/gtk-3.0/settings.ini')
+            if os.path.exists(settings_path):
+                with open(settings_path, 'r') as f:
+                    for line in f:
+                        if line.strip().startswith('gtk-application-prefer-dark-theme'):
+                            return 'dark' if 'true' in line.lower() else 'light'
+        except Exception:
+            pass
+        return 'light'
+    return 'light' # その他のOSまたは失敗
@@ -0,0 +1,145 @@
+"""
+ホットパスの計測 (スパン)。
+区間の開始・終了時刻をスレッドごとのリングバッファに記録し、Chromeのtrace event形式のJSONで書き出す。
+書き出したファイルは chrome://tracing や Perfetto (https://ui.perfetto.dev) で開ける。
+無効なときは、フラグを1つ確認するだけで元の関数を呼ぶ。
+"""
+import os
+import sys
+import json
+import time
+import functools
+import threading
+from collections import deque
+
+TRACE_ENV = "NOWB_TRACE" # 1にすると起動時からトレースを有効にする
+DEFAULT_TRACE_BUFFER_SIZE = 20000 # スレッドごとに保持するスパンの数 (古いものから捨てる)
+TRACE_FILE = 'nowb_trace.json'
+
+
+class _NullSpan:
+    """トレースが無効なときに返す、何もしないコンテキストマネージャー。"""
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    __slots__ = ('tracer', 'name', 'args', 'start')
+
+    def __init__(self, tracer, name, args):
+        self.tracer = tracer
+        self.name = name
+        self.args = args
+
+    def __enter__(self):
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.tracer.record(self.name, self.start, time.perf_counter_ns(), self.args)
+        return False
+
+
+class Tracer:
+    """
+    スパンを記録するトレーサー。記録は呼び出したスレッドのバッファに追加するだけなのでロックを取らない。
+    バッファの登録と書き出しのときだけロックを使う。
+    """
+    def __init__(self, capacity=DEFAULT_TRACE_BUFFER_SIZE):
+        self.enabled = False
+        self.capacity = capacity
+        self._local = threading.local()
+        self._buffers = [] # (スレッドID, スレッド名, deque)
+        self._lock = threading.Lock()
+        self._origin_ns = time.perf_counter_ns()
+
+    def set_enabled(self, enabled):
+        self.enabled = enabled
+
+    def span(self, name, **args):
+        """with tracer.span("名前"): の形で区間を計測する。"""
+        if not self.enabled:
+            return _NULL_SPAN
+        return _Span(self, name, args or None)
+
+    def record(self, name, start_ns, end_ns, args=None):
+        buffer = getattr(self._local, 'buffer', None)
+        if buffer is None:
+            buffer = deque(maxlen=self.capacity)
+            self._local.buffer = buffer
+            thread = threading.current_thread()
+            with self._lock:
+                self._buffers.append((threading.get_ident(), thread.name, buffer))
+        buffer.append((name, start_ns, end_ns, args))
+
+    def clear(self):
+        with self._lock:
+            for _, _, buffer in self._buffers:
+                buffer.clear()
+
+    def to_trace_events(self):
+        """記録したスパンをChromeのtrace event形式の辞書に変換する。"""
+        pid = os.getpid()
+        events = []
+        with self._lock:
+            buffers = [(tid, name, list(buffer)) for tid, name, buffer in self._buffers]
+        for tid, thread_name, spans in buffers:
+            events.append({'name': 'thread_name', 'ph': 'M', 'pid': pid, 'tid': tid, 'args': {'name': thread_name}})
+            for name, start_ns, end_ns, args in spans:
+                event = {
+                    'name': name,
+                    'cat': 'nowb',
+                    'ph': 'X',
+                    'ts': (start_ns - self._origin_ns) / 1000,
+                    'dur': (end_ns - start_ns) / 1000,
+                    'pid': pid,
+                    'tid': tid,
+                }
+                if args:
+                    event['args'] = {key: str(value) for key, value in args.items()}
+                events.append(event)
+        return {'traceEvents': events, 'displayTimeUnit': 'ms'}
+
+    def dump(self, path=TRACE_FILE):
+        """トレースをJSONファイルに書き出し、記録したスパンの数を返す。"""
+        data = self.to_trace_events()
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False)
+        return sum(1 for event in data['traceEvents'] if event['ph'] == 'X')
+
+
+tracer = Tracer()
+tracer.set_enabled(os.environ.get(TRACE_ENV) == "1")
+
+
+def traced(name=None):
+    """関数の呼び出しをスパンとして記録するデコレーター。nameを省略すると関数の修飾名を使う。"""
+    def decorator(func):
+        label = name or func.__qualname__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not tracer.enabled:
+                return func(*args, **kwargs)
+            start = time.perf_counter_ns()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                tracer.record(label, start, time.perf_counter_ns())
+        return wrapper
+    return decorator
+
+
+def dump_trace(path=TRACE_FILE):
+    """トレースを書き出す。失敗した場合はNoneを返す。"""
+    try:
+        return tracer.dump(path)
+    except IOError as e:
+        print(f"トレースの保存に失敗しました: {e}", file=sys.stderr)
+        return None
@@ -0,0 +1,418 @@
+"""QWebEngineView/QWebEnginePageまわりの部品 (ページ、ビューのプール、接続管理、広告ブロックなど)。"""
+import sys
+import gc
+import weakref
+from collections import deque
+from PyQt6.QtCore import QUrl, QTimer, pyqtSignal, QObject, QCoreApplication, QEvent, QByteArray, QDataStream, QIODevice
+
+from PyQt6.QtWebEngineCore import (QWebEnginePage, QWebEngineUrlRequestInterceptor, QWebEngineUrlRequestInfo,
+                                   QWebEngineScript)
+from .config import (DEFAULT_PRELOAD_CONCURRENCY, DEFAULT_WEBVIEW_POOL_SIZE,
+                     MEMORY_PRESSURE_THRESHOLD, MEMORY_PRESSURE_THRESHOLD_MAX, MEMORY_PRESSURE_THRESHOLD_STEP,
+                     PRELOAD_MEMORY_RETRY_MS, PRELOAD_TAB_TIMEOUT_MS,
+                     SCROLL_SNAPSHOT_JS, SCROLL_SNAPSHOT_PREFIX, SCROLL_SNAPSHOT_SCRIPT_NAME,
+                     UI_FRAME_INTERVAL_MS, WEBVIEW_POOL_MEMORY_RETRY_MS, WEBVIEW_POOL_REFILL_DELAY_MS,
+                     compile_adblock_rules,
+                     load_adblock_rules)
+from .tracing import traced
+
+# --- Feature detection for version compatibility ---
+try:
+    # For recent PyQt6 versions
+    FULLSCREEN_FEATURE = QWebEnginePage.Feature.FullScreenRequested
+except AttributeError:
+    # Fallback for older PyQt6 versions where this enum member is missing.
+    # The integer value is 7.
+    FULLSCREEN_FEATURE = 7
+
+class RendererCrashMonitor:
+    """
+    レンダラープロセスの異常終了を記録する。
+    OOMによる強制終了が繰り返されるほど、メモリ逼迫とみなすしきい値を引き上げて予算を引き締める。
+    """
+    REASONS = {
+        QWebEnginePage.RenderProcessTerminationStatus.AbnormalTerminationStatus: "異常終了",
+        QWebEnginePage.RenderProcessTerminationStatus.CrashedTerminationStatus: "クラッシュ",
+        QWebEnginePage.RenderProcessTerminationStatus.KilledTerminationStatus: "強制終了 (メモリ不足の可能性)",
+    }
+
+    def __init__(self):
+        self.crash_count = 0
+        self.oom_count = 0 # 強制終了 (OOMキラーなど) の回数
+
+    def record(self, status, exit_code):
+        """異常終了を記録し、表示用の理由を返す。"""
+        self.crash_count += 1
+        if status == QWebEnginePage.RenderProcessTerminationStatus.KilledTerminationStatus:
+            self.oom_count += 1
+        reason = self.REASONS.get(status, "不明な理由")
+        print(f"レンダラープロセスが終了しました: {reason} (終了コード: {exit_code}, 累計: {self.crash_count}回)", file=sys.stderr)
+        return reason
+
+    def memory_pressure_threshold(self):
+        return min(MEMORY_PRESSURE_THRESHOLD + self.oom_count * MEMORY_PRESSURE_THRESHOLD_STEP,
+                   MEMORY_PRESSURE_THRESHOLD_MAX)
+
+renderer_crash_monitor = RendererCrashMonitor()
+
+def install_scroll_snapshot_script(profile):
+    """プロファイルにスクロール位置を報告するスクリプトを一度だけ登録する。"""
+    scripts = profile.scripts()
+    if scripts.find(SCROLL_SNAPSHOT_SCRIPT_NAME):
+        return
+    script = QWebEngineScript()
+    script.setName(SCROLL_SNAPSHOT_SCRIPT_NAME)
+    script.setSourceCode(SCROLL_SNAPSHOT_JS)
+    script.setInjectionPoint(QWebEngineScript.InjectionPoint.DocumentCreation)
+    # ページのスクリプトと干渉しないよう独立したワールドで、メインフレームだけに注入する
+    script.setWorldId(QWebEngineScript.ScriptWorldId.ApplicationWorld)
+    script.setRunsOnSubFrames(False)
+    scripts.insert(script)
+
+def is_memory_pressure():
+    """
+    システムの空きメモリが少ないかどうかを返す。psutilがなければ常にFalse。
+    しきい値はレンダラーのOOM回数に応じて引き上げられる。
+    """
+    try:
+        import psutil
+    except ImportError:
+        return False
+    memory = psutil.virtual_memory()
+    return memory.available < memory.total * renderer_crash_monitor.memory_pressure_threshold()
+
+class CustomWebEnginePage(QWebEnginePage):
+    """
+    新しいタブで開くリクエスト（例: target="_blank"）を処理するためのカスタムクラス。
+    """
+    new_tab_requested = pyqtSignal(QWebEnginePage)
+    scroll_snapshot = pyqtSignal(str, float, float) # url, x, y
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.featurePermissionRequested.connect(self.handle_feature_permission)
+
+    def javaScriptConsoleMessage(self, level, message, line_number, source_id):
+        # 注入したスクリプトからのスクロール位置の報告はシグナルに変換し、コンソールには出さない
+        if message.startswith(SCROLL_SNAPSHOT_PREFIX):
+            try:
+                x, y, url = message[len(SCROLL_SNAPSHOT_PREFIX):].split(',', 2)
+                self.scroll_snapshot.emit(url, float(x), float(y))
+            except ValueError:
+                pass
+            return
+        super().javaScriptConsoleMessage(level, message, line_number, source_id)
+
+    def createWindow(self, _type):
+        # 新しいページオブジェクトを作成し、プロファイルは現在のページから継承する
+        new_page = CustomWebEnginePage(self.profile(), self)
+        # メインウィンドウにこの新しいページをタブとして追加するように要求
+        self.new_tab_requested.emit(new_page)
+        return new_page
+
+    def handle_feature_permission(self, url, feature):
+        """
+        ウェブページからの機能利用許可リクエストを処理する。
+        特にフルスクリーンリクエストを許可する。
+        """
+        if feature == FULLSCREEN_FEATURE:
+            self.setFeaturePermission(url, feature, QWebEnginePage.PermissionPolicy.PermissionGrantedByUser)
+
+def serialize_history(page):
+    """ページのナビゲーション履歴(戻る/進む)をQDataStreamでバイト列に変換する。"""
+    data = QByteArray()
+    stream = QDataStream(data, QIODevice.OpenModeFlag.WriteOnly)
+    stream << page.history()
+    return data
+
+def restore_history(page, data):
+    """
+    serialize_historyで保存した履歴をページに復元する。
+    復元すると現在の項目へ遷移し、HTTPキャッシュ上のリソースはそのまま再利用される。
+    復元できなかった場合はFalseを返す。
+    """
+    try:
+        stream = QDataStream(QByteArray(data), QIODevice.OpenModeFlag.ReadOnly)
+        stream >> page.history()
+    except (TypeError, RuntimeError) as e:
+        print(f"履歴の復元に失敗しました: {e}", file=sys.stderr)
+        return False
+    return stream.status() == QDataStream.Status.Ok
+
+class TabConnections:
+    """
+    1つのタブ(ビューとページ)が持つシグナル接続をすべて所有するレジストリ。
+    タブを閉じる・破棄するときにdisconnect_allで確実に切断し、
+    ビューを捕まえたラムダが残ってレンダラーのメモリが解放されない問題を防ぐ。
+    """
+    def __init__(self):
+        self._connections = []
+        self._keyed = {} # 同じ用途の接続が重複しないようにキーで管理するもの
+
+    def connect(self, signal, slot, key=None):
+        """シグナルを接続して記録する。keyを指定すると同じkeyの古い接続を置き換える。"""
+        if key is not None:
+            self.disconnect(key)
+        entry = (signal, signal.connect(slot))
+        if key is None:
+            self._connections.append(entry)
+        else:
+            self._keyed[key] = entry
+
+    def disconnect(self, key):
+        """keyで登録した接続を切断する。"""
+        entry = self._keyed.pop(key, None)
+        if entry:
+            self._disconnect_entry(entry)
+
+    def disconnect_all(self):
+        """登録されているすべての接続を切断する。"""
+        for entry in self._connections + list(self._keyed.values()):
+            self._disconnect_entry(entry)
+        self._connections = []
+        self._keyed = {}
+
+    @staticmethod
+    def _disconnect_entry(entry):
+        signal, connection = entry
+        try:
+            signal.disconnect(connection)
+        except (TypeError, RuntimeError):
+            # 既に切断済み、またはオブジェクトが削除済みの場合
+            pass
+
+class ClosedViewTracker:
+    """
+    デバッグ用: 閉じたタブのビューが実際にガベージコレクトされたかをweakrefで確認する。
+    環境変数NOWB_DEBUG_LEAKS=1で有効になる。テストからはassert_collectedを呼び出す。
+    """
+    def __init__(self):
+        self._refs = [] # (weakref, 閉じたときのURL)
+
+    def track(self, browser):
+        self._refs.append((weakref.ref(browser), browser.url().toString()))
+
+    def leaked(self):
+        """削除待ちのオブジェクトを処理してGCを実行し、まだ生きているビューのURL一覧を返す。"""
+        QCoreApplication.sendPostedEvents(None, QEvent.Type.DeferredDelete)
+        gc.collect()
+        self._refs = [(ref, url) for ref, url in self._refs if ref() is not None]
+        return [url for _, url in self._refs]
+
+    def assert_collected(self):
+        """閉じたビューが1つでも残っていればAssertionErrorを送出する。"""
+        leaked = self.leaked()
+        if leaked:
+            raise AssertionError(f"閉じたタブのビューが解放されていません ({len(leaked)}件): {leaked}")
+
+class WebViewPool(QObject):
+    """
+    事前に初期化したQWebEngineViewを保持するウォームプール。
+    新しいタブはプールから取り出してsetUrlするだけで済むため、Ctrl+T連打時の遅延を抑える。
+    補充はアイドル時にQTimerで1つずつ非同期に行い、メモリ逼迫時はプールを縮小して、逼迫が解けてから補充し直す。
+    """
+    def __init__(self, factory, size=DEFAULT_WEBVIEW_POOL_SIZE, parent=None):
+        super().__init__(parent)
+        self.factory = factory # ページ・属性・シグナル接続まで済ませたビューを返す関数
+        self.size = size
+        self._views = []
+        self._refill_timer = QTimer(self)
+        self._refill_timer.setSingleShot(True)
+        self._refill_timer.setInterval(WEBVIEW_POOL_REFILL_DELAY_MS)
+        self._refill_timer.timeout.connect(self._refill_one)
+        self._retry_timer = QTimer(self)
+        self._retry_timer.setSingleShot(True)
+        self._retry_timer.setInterval(WEBVIEW_POOL_MEMORY_RETRY_MS)
+        self._retry_timer.timeout.connect(self.schedule_refill)
+
+    def checkout(self):
+        """ウォーム済みのビューを1つ取り出す。プールが空ならその場で作成する。"""
+        browser = self._views.pop() if self._views else self.factory()
+        # ウォームアップ用のabout:blankが戻る履歴に残らないようにする
+        browser.page().history().clear()
+        self.schedule_refill()
+        return browser
+
+    def schedule_refill(self):
+        """プールが定員に満たなければ、少し待ってから補充を開始する。"""
+        if len(self._views) < self.size and not self._refill_timer.isActive():
+            self._refill_timer.start()
+
+    def _refill_one(self):
+        """ビューを1つだけ作成してプールに戻す。UIスレッドを長く塞がないよう1回に1つずつ。"""
+        if is_memory_pressure():
+            self.shrink(0)
+            self._retry_timer.start()
+            return
+        if len(self._views) >= self.size:
+            return
+        browser = self.factory()
+        # about:blankを読み込ませてレンダラープロセスを先に起動しておく
+        browser.setUrl(QUrl("about:blank"))
+        self._views.append(browser)
+        self.schedule_refill()
+
+    def shrink(self, keep=0):
+        """プール内のビューを指定数まで減らして破棄する。"""
+        while len(self._views) > keep:
+            self._views.pop().deleteLater()
+
+    def clear(self):
+        """補充を止めてプールを空にする。ウィンドウを閉じるときに呼び出す。"""
+        self._refill_timer.stop()
+        self._retry_timer.stop()
+        self.shrink(0)
+
+class TabPreloader(QObject):
+    """
+    未読み込みのタブ(プレースホルダー)を、同時読み込み数を制限しながらバックグラウンドで順番に読み込む。
+    タブグループを開いたときに、すべてのタブが一斉に読み込まれるのを防ぐ。
+    メモリ逼迫中は先読みを止め、一定間隔で再開を試みる。
+    読み込みがPRELOAD_TAB_TIMEOUT_MS経っても終わらないタブは、読み込みを続けたまま次のタブに枠を譲る。
+    """
+    def __init__(self, window, max_concurrent=DEFAULT_PRELOAD_CONCURRENCY):
+        super().__init__(window)
+        self.window = window
+        self.max_concurrent = max_concurrent
+        self._queue = deque() # 読み込み待ちのプレースホルダー
+        self._loading = {} # 読み込み中のビュー -> 枠を譲るまでのタイマー
+        self._retry_timer = QTimer(self)
+        self._retry_timer.setSingleShot(True)
+        self._retry_timer.setInterval(PRELOAD_MEMORY_RETRY_MS)
+        self._retry_timer.timeout.connect(self._pump)
+
+    def enqueue(self, placeholders):
+        self._queue.extend(placeholders)
+        self._pump()
+
+    def forget(self, browser):
+        """閉じられた・破棄されたビューを読み込み中の一覧から外し、次のタブの読み込みを始める。"""
+        timer = self._loading.pop(browser, None)
+        if timer is not None:
+            timer.stop()
+            QTimer.singleShot(0, self._pump)
+
+    def clear(self):
+        self._queue.clear()
+        self._retry_timer.stop()
+
+    def _pump(self):
+        if not self._queue:
+            return
+        # メモリが逼迫している間は先読みしない (アクティブにしたタブは通常どおり読み込まれる)
+        # 読み込み中のタブがなければ_pumpを呼ぶものがないため、タイマーで再開を試みる
+        if is_memory_pressure():
+            self._retry_timer.start()
+            return
+        while self._queue and len(self._loading) < self.max_concurrent:
+            placeholder = self._queue.popleft()
+            index = self.window.tabs.indexOf(placeholder)
+            if index == -1:
+                continue # 既に閉じられたか、アクティブにされて読み込み済み
+            browser = self.window.materialize_tab(index, interactive=False)
+            if browser is None:
+                continue
+            # タイマーはビューの子にして、タブを閉じたときに一緒に破棄されるようにする
+            timer = QTimer(browser)
+            timer.setSingleShot(True)
+            timer.setInterval(PRELOAD_TAB_TIMEOUT_MS)
+            self._loading[browser] = timer
+            browser.tab_connections.connect(browser.loadFinished, lambda ok, b=browser: self._on_load_finished(b), key='preload')
+            browser.tab_connections.connect(timer.timeout, lambda b=browser: self._on_load_finished(b), key='preload_timeout')
+            timer.start()
+
+    def _on_load_finished(self, browser):
+        """読み込みが終わったか、タイムアウトしたタブの枠を空ける。"""
+        browser.tab_connections.disconnect('preload')
+        browser.tab_connections.disconnect('preload_timeout')
+        self.forget(browser)
+
+class UiUpdateScheduler(QObject):
+    """
+    ページのシグナル(URL/タイトル/進捗/ロード完了)によるUI更新をまとめて反映するスケジューラ。
+    シグナルは変更内容を記録するだけで、実際のウィジェット更新は1フレーム(約16ms)に1回だけ行う。
+    URLバー・プログレスバー・ステータスバーは表示中のタブの分だけ更新する。
+    """
+    def __init__(self, window, interval_ms=UI_FRAME_INTERVAL_MS):
+        super().__init__(window)
+        self.window = window
+        self._pending = {} # browser -> 変更内容の辞書
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(interval_ms)
+        self._timer.timeout.connect(self.flush)
+
+    def mark(self, browser, **changes):
+        """ブラウザの変更内容を記録し、次のフレームでの反映を予約する。"""
+        self._pending.setdefault(browser, {}).update(changes)
+        self.schedule()
+
+    def forget(self, browser):
+        """閉じられたタブの未反映の変更を破棄する。"""
+        self._pending.pop(browser, None)
+
+    def schedule(self):
+        if self._pending and not self._timer.isActive():
+            self._timer.start()
+
+    def _is_window_hidden(self):
+        return not self.window.isVisible() or self.window.isMinimized()
+
+    def flush(self):
+        """記録された変更をまとめてUIに反映する。"""
+        # 最小化中は何もしない。復帰時にchangeEventから再度呼び出される。
+        if self._is_window_hidden():
+            return
+        pending, self._pending = self._pending, {}
+        current = self.window.tabs.currentWidget()
+        for browser, changes in pending.items():
+            try:
+                # タブのタイトルはタブバーに常に見えているので、最新の値だけを反映する
+                if 'title' in changes:
+                    self.window.update_tab_text(changes['title'], browser)
+                if changes.get('icon'):
+                    self.window.update_tab_icon(browser)
+                if browser is not current:
+                    continue
+                if changes.get('url'):
+                    self.window.update_url_bar(browser.url(), browser)
+                if 'progress' in changes:
+                    self.window.update_progress_bar(changes['progress'], browser)
+                if changes.get('status'):
+                    self.window.update_status_bar(browser)
+            except RuntimeError:
+                # フラッシュ前にタブが削除された場合
+                pass
+
+class AdblockInterceptor(QWebEngineUrlRequestInterceptor):
+    """
+    URLリクエストをインターセプトして広告をブロックするクラス。
+    """
+    def __init__(self, parent=None, compiled_rules=None):
+        super().__init__(parent)
+        if compiled_rules is None:
+            self._load_rules()
+        else:
+            # 起動時にバックグラウンドで読み込み・コンパイル済みのルール
+            self.rules, self.pattern = compiled_rules
+        self.blocked_count = 0 # ブロックしたリクエストの数 (ベンチマークで使用)
+        self.log_blocked = True # ブロックしたURLを標準出力に表示するか
+
+    def _load_rules(self, file_path="adblock_list.txt"):
+        """ブロックリストを読み込む。"""
+        self.rules, self.pattern = compile_adblock_rules(load_adblock_rules())
+        return self.rules
+
+    @traced()
+    def interceptRequest(self, info: QWebEngineUrlRequestInfo):
+        """リクエストをインターセプトし、ルールに一致すればブロックする。"""
+        pattern = self.pattern
+        if pattern is None:
+            return
+        url = info.requestUrl().toString()
+        match = pattern.search(url)
+        if match:
+            self.blocked_count += 1
+            if self.log_blocked:
+                print(f"[AdBlock] ブロックしました: {url} (ルール: {match.group(0)})")
+            info.block(True)
@@ -0,0 +1,2418 @@
+"""メインウィンドウ。"""
+import sys
+import random
+import time
+import platform
+import os
+import json
+import datetime
+import html
+from urllib.parse import urlparse
+from PyQt6.QtCore import QUrl, Qt, QTimer, pyqtSignal, QThreadPool, QEvent
+from PyQt6.QtWidgets import (QApplication, QMainWindow, QToolBar, QLineEdit, QProgressBar, QMenu, QFileDialog,
+                             QInputDialog, QComboBox, QMessageBox, QSlider, QLabel, QSplitter, QStyle, QDockWidget,
+                             QToolTip)
+from PyQt6.QtGui import QAction, QKeySequence, QColor, QPalette, QImage, QPainter, QIcon
+
+from PyQt6.QtWebEngineWidgets import QWebEngineView
+from PyQt6.QtWebEngineCore import QWebEngineSettings, QWebEngineProfile, QWebEnginePage
+from .config import (APP_VERSION, DEBUG_LEAKS_ENV, DEFAULT_PRELOAD_CONCURRENCY, DEFAULT_WEBVIEW_POOL_SIZE,
+                     DEFAULT_WEB_PANEL_DISCARD_TIMEOUT_MS, HISTORY_FILE, SETTINGS_FILE, SETTINGS_VERSION,
+                     USER_INPUT_EVENTS, profile_path, read_history_file, read_settings_file)
+from .startup import startup_preloader, startup_profiler
+from .tab_index import tab_search_index
+from .tabs import (BrowserTabWidget, CrashedTabPlaceholder, QuickOpenDialog, TabOverviewDialog,
+                   UnloadedTabPlaceholder, VerticalTabSidebar, get_tab_scroll, get_tab_url)
+from .theme import qta, get_system_theme_mode, icon_cache, theme_signal
+from .tracing import TRACE_FILE, dump_trace, traced, tracer
+from .webview import (AdblockInterceptor, ClosedViewTracker, CustomWebEnginePage, TabConnections, TabPreloader,
+                      UiUpdateScheduler, WebViewPool, install_scroll_snapshot_script, renderer_crash_monitor,
+                      restore_history, serialize_history)
+from .workers import FaviconFetcher, ThumbnailCache, get_thumbnail_cache_dir
+
+class FullFeaturedBrowser(QMainWindow):
+    window_closed = pyqtSignal(object)
+
+    def __init__(self, is_private=False, parent_settings=None):
+        super().__init__()
+        self.is_private_window = is_private
+        self.settings_file = profile_path(SETTINGS_FILE)
+        self.history_file = profile_path(HISTORY_FILE)
+        self.adblock_interceptor = None
+        self.qss_parts = {} # QSSを部品ごとに管理
+        
+        # Download Managerは必要になった時に初期化する（起動時間短縮のため）
+        self.download_manager = None
+        self.performance_capture = None # パフォーマンスキャプチャも初回の使用時に作成する
+        # ここにバージョン情報を定義
+        self.browser_version = APP_VERSION
+        self.settings_version = SETTINGS_VERSION
+
+        # current_search_engine_url を、save_settings() が呼び出される前にデフォルト値で初期化します。
+        self.current_search_engine_url = "https://www.google.com/search?q=" 
+        
+        if self.is_private_window:
+            self.setWindowTitle("㊙️ プライベートブラウジング - Project-NOWB")
+            self.settings = parent_settings
+            self.private_profile = QWebEngineProfile(f"private_{id(self)}", self)
+            self.private_profile.downloadRequested.connect(self.handle_download)
+        else:
+            # デフォルトプロファイルのダウンロードリクエストをハンドル。
+            # 複数ウィンドウが開かれても、各インスタンスが自身のハンドラを接続する。
+            # ハンドラ側で重複処理を防ぐ。
+            QWebEngineProfile.defaultProfile().downloadRequested.connect(self.handle_download)
+            self.private_windows = []
+            
+            # 設定ファイルをロード
+            self.settings_data = self.load_settings()
+            if not self.settings_data:
+                QMessageBox.critical(None, "致命的なエラー", f"設定ファイル '{self.settings_file}' が見つからないか、破損しています。")
+                sys.exit(1)
+
+            # --- 設定ファイルのマイグレーション ---
+            self.settings_data = self.migrate_settings(self.settings_data)
+            # --- ここまで ---
+
+            self.settings = self.settings_data.copy()
+            self.current_search_engine_url = self.settings_data.get('current_search_engine_url', self.settings.get('search_engines', {}).get("Google", "https://www.google.com/search?q="))
+        startup_profiler.mark('settings')
+        
+        self.is_preaching_mode_active = False
+        self.blocked_timer = QTimer()
+        self.blocked_timer.setSingleShot(True)
+        self.blocked_timer.timeout.connect(self.unblock_sites)
+
+        self.is_sleeping = False
+        self._last_input_time = time.monotonic() # 最後にユーザー入力があった時刻
+        self._timers_paused_for_sleep = [] # スリープ中に止めたタイマー (復帰時に再開する)
+        self.sleep_timer = QTimer()
+        self.sleep_timer.setInterval(self.settings.get('sleep_mode_interval', 300000)) # デフォルト5分
+        self.sleep_timer.timeout.connect(self.activate_sleep_mode)
+        if not self.is_private_window and self.settings.get('sleep_mode_enabled', True):
+            self.sleep_timer.start()
+
+        # タブグループはセッションとして設定ファイルに保存する (プライベートウィンドウでは保存しない)
+        if self.is_private_window:
+            self.tab_groups = {}
+        else:
+            self.tab_groups = self.settings.setdefault('tab_groups', {})
+        self.tab_group_counter = len(self.tab_groups)
+        self.notes = {}
+        
+        self.auto_scroll_timer = QTimer()
+        self.auto_scroll_timer.setInterval(50) # 50ms間隔
+        self.auto_scroll_timer.timeout.connect(self.perform_auto_scroll)
+        self.scroll_speed = 10 # 10px per tick
+        
+        self.is_retro_mode_active = False
+        self.is_rain_mode_active = False
+        self.rain_timer = QTimer()
+        self.rain_timer.setInterval(100) # 雨滴の間隔
+        self.threadpool = QThreadPool.globalInstance()
+        self.is_html_fullscreen = False # HTML5 APIによるフルスクリーン状態か
+
+        # 新規タブ用のウォームプール（プライベートウィンドウは自身のプロファイル用に小さく保つ）
+        pool_size = self.settings.get('webview_pool_size', DEFAULT_WEBVIEW_POOL_SIZE)
+        if self.is_private_window:
+            pool_size = min(pool_size, 1)
+        self.webview_pool = WebViewPool(self._build_browser_view, pool_size, self)
+        # スクロール位置の記録用スクリプトは、このプロファイルで作られるすべてのページに注入される
+        install_scroll_snapshot_script(self._get_web_profile())
+        # 未読み込みのタブを同時読み込み数を制限して先読みする
+        self.tab_preloader = TabPreloader(self, self.settings.get('tab_preload_concurrency', DEFAULT_PRELOAD_CONCURRENCY))
+        # ページのシグナルによるUI更新はフレーム単位にまとめて反映する
+        self.ui_scheduler = UiUpdateScheduler(self)
+        # タブのサムネイル (プライベートウィンドウはディスクに保存しない)
+        self.thumbnail_cache = ThumbnailCache(None if self.is_private_window else get_thumbnail_cache_dir(), parent=self)
+        # デバッグ時のみ、閉じたタブが解放されたかを追跡する
+        self.closed_view_tracker = ClosedViewTracker() if os.environ.get(DEBUG_LEAKS_ENV) else None
+        
+        # --- メインウィンドウの設定 ---
+        if not self.is_private_window:
+            self.setWindowTitle("Project-NOWB")
+            self.setGeometry(self.settings['window_pos'][0], self.settings['window_pos'][1],
+                             self.settings['window_size'][0], self.settings['window_size'][1])
+        else:
+            self.setGeometry(150, 150, 1024, 768) # プライベートウィンドウのデフォルトサイズ
+
+        # --- メインコンテンツとウェブパネル用のスプリッター ---
+        self.splitter = QSplitter(Qt.Orientation.Horizontal)
+        self.setCentralWidget(self.splitter)
+
+        # --- タブウィジェットの設定 ---
+        self.tabs = BrowserTabWidget()
+        self.tabs.setTabsClosable(True)
+        self.tabs.tabCloseRequested.connect(self.close_current_tab)
+        self.tabs.currentChanged.connect(self.handle_tab_changed) # 起動高速化のため、タブの遅延読み込みを処理するハンドラに接続
+        # 非アクティブになるタブは、まだ表示されているうちにサムネイルとしてキャプチャする
+        self.tabs.current_about_to_change.connect(self._capture_deactivated_tab)
+        # タブの右クリックメニューを有効化
+        self.tabs.setContextMenuPolicy(Qt.ContextMenuPolicy.CustomContextMenu)
+        self.tabs.customContextMenuRequested.connect(self.show_tab_context_menu)
+        # タブの移動を有効にする
+        self.tabs.tabBar().setMovable(True)
+        # タブにホバーしたときにサムネイルのプレビューを表示する
+        self.tabs.tabBar().installEventFilter(self)
+        self.splitter.addWidget(self.tabs)
+
+        # 垂直タブのサイドバーは有効にされたときに作成する
+        self.vertical_tab_dock = None
+        self.vertical_tab_sidebar = None
+        self.vertical_tabs_enabled = False
+
+        # --- ウェブパネルの設定 ---
+        # レンダラープロセスと読み込みを節約するため、パネルは最初に表示されるときに作成する。
+        # 非表示にするとフリーズし、一定時間非表示のままなら破棄する。
+        self.web_panel = None
+        # 開発者ツールは開かれたときに作成し、タブを切り替えても同じビューで現在のタブを調べる
+        self.devtools_view = None
+        self.web_panel_discard_timer = QTimer(self)
+        self.web_panel_discard_timer.setSingleShot(True)
+        self.web_panel_discard_timer.setInterval(self.settings.get('web_panel_discard_timeout_ms', DEFAULT_WEB_PANEL_DISCARD_TIMEOUT_MS))
+        self.web_panel_discard_timer.timeout.connect(self._discard_web_panel)
+
+        # プライベートウィンドウではウェブパネルは使わない
+        if not self.is_private_window and self.settings.get('web_panel_visible', False):
+            self._ensure_web_panel()
+        # --- ナビゲーションツールバー ---
+        self._themed_icons = {} # アクション -> (アイコン名, サイズ)。テーマの変更時に描き直す
+        self.nav_toolbar = QToolBar("Navigation")
+        # Windows/LinuxはCtrl、MacはCmd
+        mod_key = "Ctrl"
+        if platform.system() == "Darwin":
+            mod_key = "Cmd"
+        
+        self.addToolBar(self.nav_toolbar)
+
+        back_btn = self._toolbar_action('fa5s.arrow-left', QStyle.StandardPixmap.SP_ArrowBack, "戻る")
+        back_btn.triggered.connect(lambda: self.tabs.currentWidget().back())
+        self.nav_toolbar.addAction(back_btn)
+
+        forward_btn = self._toolbar_action('fa5s.arrow-right', QStyle.StandardPixmap.SP_ArrowForward, "進む")
+        forward_btn.triggered.connect(lambda: self.tabs.currentWidget().forward())
+        self.nav_toolbar.addAction(forward_btn)
+
+        reload_btn = self._toolbar_action('fa5s.redo', QStyle.StandardPixmap.SP_BrowserReload, "リロード")
+        reload_btn.triggered.connect(lambda: self.tabs.currentWidget().reload())
+        self.nav_toolbar.addAction(reload_btn)
+
+        home_btn = self._toolbar_action('fa5s.home', QStyle.StandardPixmap.SP_DirHomeIcon, "ホーム")
+        home_btn.triggered.connect(self.navigate_home)
+        self.nav_toolbar.addAction(home_btn)
+
+        # --- 新規タブボタンの追加 (URLバーの左隣) ---
+        if qta:
+            # アイコンを表示する場合、テキストは空にする
+            new_tab_button = QAction("", self)
+            self._set_themed_icon(new_tab_button, 'fa5s.plus', self._toolbar_icon_size())
+        else:
+            new_tab_button = QAction("＋", self)
+        new_tab_button.setToolTip("新しいタブを開く")
+        new_tab_button.triggered.connect(lambda: self.add_new_tab(QUrl(self.settings['home_url'])))
+        self.nav_toolbar.addAction(new_tab_button)
+
+        # --- URLバー ---
+        self.url_bar = QLineEdit()
+        self.url_bar.returnPressed.connect(self.navigate_or_search)
+        self.nav_toolbar.addWidget(self.url_bar)
+
+        # --- 検索エンジンセレクター ---
+        self.search_engine_combo = QComboBox()
+        self.search_engine_combo.addItems(self.settings['search_engines'].keys())
+        # 初回起動で設定された検索エンジンを初期選択
+        initial_search_engine_name = next((name for name, url in self.settings['search_engines'].items() if url == self.current_search_engine_url), "Google")
+        self.search_engine_combo.setCurrentText(initial_search_engine_name)
+
+        self.search_engine_combo.currentTextChanged.connect(self.update_search_engine)
+        self.nav_toolbar.addWidget(self.search_engine_combo)
+        
+        # --- プログレスバー ---
+        self.progress_bar = QProgressBar()
+        self.progress_bar.setMaximumHeight(8)
+        self.progress_bar.setVisible(False)
+        self.nav_toolbar.addWidget(self.progress_bar)
+
+        # --- 音量コントロール ---
+        self.nav_toolbar.addSeparator()
+
+        # ミュートボタン
+        self.mute_button = QAction(self)
+        self.mute_button.setCheckable(True)
+        self.mute_button.triggered.connect(self.toggle_mute)
+        self.nav_toolbar.addAction(self.mute_button)
+
+        # 音量スライダー
+        self.volume_slider = QSlider(Qt.Orientation.Horizontal)
+        self.volume_slider.setRange(0, 100) # 0から100の範囲で音量調整
+        self.volume_slider.setValue(100)    # デフォルトは最大音量
+        self.volume_slider.valueChanged.connect(self.slider_volume_changed)
+        self.nav_toolbar.addWidget(self.volume_slider)
+        self.last_volume = 100 # ミュート前の音量を保存
+        self._mute_icon_key = None # 現在表示しているミュートボタンのアイコン
+        self._update_volume_ui(100) # 初期UI設定
+
+        # --- ハンバーガーメニューボタン ---
+        self.hamburger_menu_button = self._toolbar_action('fa5s.bars', QStyle.StandardPixmap.SP_TitleBarMenuButton, "メニュー")
+        self.hamburger_menu_button.setToolTip("メニューを開く")
+        self.hamburger_menu = QMenu(self)
+        self.hamburger_menu_button.setMenu(self.hamburger_menu)
+        self.nav_toolbar.addSeparator()
+        self.nav_toolbar.addAction(self.hamburger_menu_button)
+
+        # --- ステータスバー ---
+        self.status_bar = self.statusBar()
+        self.status_label = QLabel("準備完了。")
+        self.status_bar.addWidget(self.status_label)
+        
+        # --- ハンバーガーメニューコンテンツの構築 ---
+        startup_profiler.mark('widgets')
+        self.setup_hamburger_menu()
+        startup_profiler.mark('menus')
+        
+        # お気に入りツールバー
+        self.favorites_toolbar = QToolBar("お気に入り")
+        self.addToolBar(Qt.ToolBarArea.BottomToolBarArea, self.favorites_toolbar)
+        self.update_favorite_sites_toolbar()
+        
+        # イースターエッグ
+        self.set_easter_eggs()
+        
+        # --- 最初のタブを追加 ---
+        startup_profiler.mark('toolbars')
+        if self.is_private_window:
+            self.add_new_tab(QUrl(self.settings['home_url']), 'プライベートタブ')
+        elif self.settings.get('restore_last_session', True):
+            last_session_urls = self.settings.get('last_session', [])
+            last_session_scrolls = self.settings.get('last_session_scroll', [])
+            if len(last_session_scrolls) != len(last_session_urls):
+                last_session_scrolls = [None] * len(last_session_urls)
+            if last_session_urls:
+                # 起動高速化のため、最初のタブだけを即時ロード
+                browser = self.add_new_tab(QUrl(last_session_urls[0]))
+                if browser is not None and last_session_scrolls[0]:
+                    self._restore_scroll_on_load(browser, last_session_scrolls[0])
+                # 残りのタブはプレースホルダーとして追加
+                for url, scroll in zip(last_session_urls[1:], last_session_scrolls[1:]):
+                    placeholder = self.add_unloaded_tab(url, "読み込み待機中...")
+                    placeholder.scroll_pos = scroll
+            else:
+                # 復元するセッションがない場合はホームページを開く
+                self.add_new_tab(QUrl(self.settings['home_url']), 'ホームページ')
+        else:
+            # セッション復元が無効な場合はホームページを開く
+            self.add_new_tab(QUrl(self.settings['home_url']), 'ホームページ')
+        startup_profiler.mark('session_restore')
+
+        if self.is_private_window:
+            self.history_menu.setEnabled(False)
+            self.bookmarks_menu.setEnabled(False)
+        theme_signal.theme_changed.connect(self.update_palette)
+        self.reset_ui_to_defaults(silent=True) # 起動時にUIをデフォルト状態にリセット
+        if self.settings.get('vertical_tabs_enabled', False):
+            self.toggle_vertical_tabs(True)
+        if not self.is_private_window:
+            # 無操作時間の計測とスリープからの復帰のため、アプリ全体の入力イベントを監視する
+            QApplication.instance().installEventFilter(self)
+        # 最初のCtrl+Tから温まったビューを使えるよう、イベントループが回り始めたらプールを満たしておく
+        QTimer.singleShot(0, self.webview_pool.schedule_refill)
+        startup_profiler.mark('window_init')
+
+    def setup_adblocker(self):
+        """設定に基づいて広告ブロッカーをセットアップする。"""
+        # このメソッドはメインウィンドウインスタンスでのみ意味を持つ
+        if self.is_private_window:
+            return
+
+        adblock_enabled = self.settings.get('adblock_enabled', False)
+
+        if adblock_enabled:
+            if not self.adblock_interceptor:
+                self.adblock_interceptor = AdblockInterceptor(self, startup_preloader.take('adblock'))
+            else:
+                # ルールが更新された可能性があるのでリロード
+                self.adblock_interceptor._load_rules()
+            
+            interceptor_to_set = self.adblock_interceptor
+            status_message = "広告ブロッカー: ON"
+            print("広告ブロッカーが有効になりました。")
+        else:
+            interceptor_to_set = None
+            self.adblock_interceptor = None # 参照をクリア
+            status_message = "広告ブロッカー: OFF"
+            print("広告ブロッカーが無効になりました。")
+
+        # 通常プロファイルに設定
+        QWebEngineProfile.defaultProfile().setUrlRequestInterceptor(interceptor_to_set)
+        # 管理しているすべてのプライベートウィンドウのプロファイルにも設定
+        for p_win in self.private_windows:
+            p_win.private_profile.setUrlRequestInterceptor(interceptor_to_set)
+        
+        self.statusBar().showMessage(status_message, 2000)
+
+    def open_private_window(self):
+        """新しいプライベートブラウジングウィンドウを開く。"""
+        if self.is_private_window:
+            return # プライベートウィンドウからさらにプライベートウィンドウは開かない
+        
+        private_window = FullFeaturedBrowser(is_private=True, parent_settings=self.settings)
+        self.private_windows.append(private_window)
+        private_window.window_closed.connect(self.remove_private_window_from_list)
+        # 広告ブロッカーが有効なら、新しいプライベートウィンドウにも適用
+        if self.adblock_interceptor:
+            private_window.private_profile.setUrlRequestInterceptor(self.adblock_interceptor)
+        private_window.show()
+        return private_window
+
+    def _get_mod_key(self):
+        """OSに応じて修飾キー(Ctrl/Cmd)を返す。"""
+        return "Cmd" if platform.system() == "Darwin" else "Ctrl"
+
+    def _create_shortcut_actions(self):
+        """
+        ショートカットキーを持つアクションを作成し、ウィンドウに登録する。
+        メニューの中身は開かれるまで作られないため、ショートカットはメニューとは別に先に有効にしておく。
+        """
+        mod_key = self._get_mod_key()
+        specs = {
+            'screenshot': ("スクリーンショット", f"{mod_key}+Shift+S", self.take_screenshot),
+            'zoom_in': ("拡大", f"{mod_key}++", self.zoom_in),
+            'zoom_out': ("縮小", f"{mod_key}+-", self.zoom_out),
+            'reset_zoom': ("ズームをリセット", f"{mod_key}+0", self.reset_zoom),
+            'find_in_page': ("ページ内検索", f"{mod_key}+F", self.find_in_page),
+            'quick_open': ("タブを検索", f"{mod_key}+K", self.show_quick_open),
+            'dev_tools': ("開発者ツール", "F12", self.open_dev_tools),
+        }
+        self.shortcut_actions = {}
+        for key, (text, shortcut, slot) in specs.items():
+            action = QAction(text, self)
+            action.setShortcut(QKeySequence(shortcut))
+            action.triggered.connect(slot)
+            self.addAction(action)
+            self.shortcut_actions[key] = action
+
+    def _shortcut_action(self, key, icon_name):
+        """先に作成したショートカット付きのアクションに、メニュー用のアイコンを付けて返す。"""
+        action = self.shortcut_actions[key]
+        self._set_themed_icon(action, icon_name)
+        return action
+
+    def _icon_action(self, icon_name, text):
+        """メニュー用のアイコン付きアクションを作成する。"""
+        action = QAction(text, self)
+        self._set_themed_icon(action, icon_name)
+        return action
+
+    def _toolbar_action(self, icon_name, fallback, text):
+        """ツールバー用のアクションを作成する。qtawesomeがなければスタイルの標準アイコンを使う。"""
+        if not qta:
+            return QAction(self.style().standardIcon(fallback), text, self)
+        action = QAction(text, self)
+        self._set_themed_icon(action, icon_name, self._toolbar_icon_size())
+        return action
+
+    def _toolbar_icon_size(self):
+        icon_size = self.nav_toolbar.iconSize()
+        return max(icon_size.width(), icon_size.height())
+
+    def _set_themed_icon(self, action, icon_name, size=16):
+        """
+        アクションにキャッシュ済みのアイコンを設定し、テーマが変わったときに描き直せるよう記録する。
+        作り直すメニュー(履歴・ブックマーク)の項目は記録せず、メニューごと作り直す。
+        """
+        if not qta:
+            return
+        self._themed_icons[action] = (icon_name, size)
+        action.setIcon(icon_cache.get(icon_name, size=size))
+
+    def _refresh_themed_icons(self):
+        """テーマの変更後、記録したアイコンをキャッシュから設定し直す。"""
+        for action, (icon_name, size) in self._themed_icons.items():
+            action.setIcon(icon_cache.get(icon_name, size=size))
+        self._update_volume_ui(self.volume_slider.value())
+        self._bookmarks_menu_dirty = True
+        self._history_menu_dirty = True
+
+    def _add_lazy_menu(self, title, icon_name, builder):
+        """
+        ハンバーガーメニューに空のサブメニューを追加し、最初に表示されるときにbuilderで中身を構築する。
+        サブメニューのアイコンはハンバーガーメニューが最初に開かれるときに読み込む。
+        """
+        menu = self.hamburger_menu.addMenu(title)
+        self._lazy_menu_icons.append((menu.menuAction(), icon_name))
+        def build():
+            menu.aboutToShow.disconnect(build)
+            builder(menu)
+        menu.aboutToShow.connect(build)
+        return menu
+
+    def _load_hamburger_menu_icons(self):
+        """ハンバーガーメニューの項目のアイコンを一度だけ読み込む。"""
+        self.hamburger_menu.aboutToShow.disconnect(self._load_hamburger_menu_icons)
+        for action, icon_name in self._lazy_menu_icons:
+            self._set_themed_icon(action, icon_name)
+        self._lazy_menu_icons = []
+
+    def _setup_file_menu(self, file_menu):
+        """ファイルメニューを構築する。"""
+        
+        new_tab_action = self._icon_action('fa5s.plus-square', "新しいタブ")
+        new_tab_action.triggered.connect(lambda: self.add_new_tab())
+        file_menu.addAction(new_tab_action)
+        
+        private_window_action = self._icon_action('fa5s.user-secret', "プライベートウィンドウを開く")
+        private_window_action.triggered.connect(self.open_private_window)
+        file_menu.addAction(private_window_action)
+        
+        save_pdf_action = self._icon_action('fa5s.file-pdf', "ページをPDFで保存")
+        save_pdf_action.triggered.connect(self.save_page_as_pdf)
+        file_menu.addAction(save_pdf_action)
+        
+        file_menu.addAction(self._shortcut_action('screenshot', 'fa5s.camera'))
+        
+        file_menu.addSeparator()
+        
+        exit_action = self._icon_action('fa5s.sign-out-alt', "終了")
+        exit_action.triggered.connect(self.close)
+        file_menu.addAction(exit_action)
+
+    def _setup_view_menu(self, view_menu):
+        """表示メニューを構築する。"""
+        view_menu.addAction(self._shortcut_action('zoom_in', 'fa5s.search-plus'))
+        view_menu.addAction(self._shortcut_action('zoom_out', 'fa5s.search-minus'))
+        view_menu.addAction(self._shortcut_action('reset_zoom', 'fa5s.search'))
+        view_menu.addSeparator()
+
+        self.toggle_web_panel_action = self._icon_action('fa5s.columns', "ウェブパネルを表示")
+        self.toggle_web_panel_action.setCheckable(True)
+        if not self.is_private_window:
+            is_visible = self.web_panel is not None and self.web_panel.isVisibleTo(self)
+            self.toggle_web_panel_action.setChecked(is_visible)
+            self.toggle_web_panel_action.setText("ウェブパネルを非表示" if is_visible else "ウェブパネルを表示")
+        else:
+            self.toggle_web_panel_action.setEnabled(False)
+        self.toggle_web_panel_action.toggled.connect(self.toggle_web_panel)
+        view_menu.addAction(self.toggle_web_panel_action)
+
+        self.toggle_vertical_tabs_action = self._icon_action('fa5s.list', "垂直タブ")
+        self.toggle_vertical_tabs_action.setCheckable(True)
+        self.toggle_vertical_tabs_action.setChecked(self.vertical_tabs_enabled)
+        self.toggle_vertical_tabs_action.toggled.connect(self.toggle_vertical_tabs)
+        view_menu.addAction(self.toggle_vertical_tabs_action)
+        
+        view_menu.addSeparator()
+        
+        tab_overview_action = self._icon_action('fa5s.th', "タブ一覧")
+        tab_overview_action.triggered.connect(self.show_tab_overview)
+        view_menu.addAction(tab_overview_action)
+
+        fullscreen_action = self._icon_action('fa5s.expand', "全画面表示")
+        fullscreen_action.triggered.connect(self.toggle_fullscreen)
+        view_menu.addAction(fullscreen_action)
+        
+        view_menu.addAction(self._shortcut_action('dev_tools', 'fa5s.code'))
+
+        nostalgia_action = self._icon_action('fa5s.film', "ノスタルジアフィルター")
+        nostalgia_action.setCheckable(True)
+        nostalgia_action.toggled.connect(self.toggle_nostalgia_filter)
+        view_menu.addAction(nostalgia_action)
+
+        cyberpunk_action = self._icon_action('fa5s.robot', "サイバーパンクモード")
+        cyberpunk_action.setCheckable(True)
+        cyberpunk_action.toggled.connect(self.toggle_cyberpunk_mode)
+        view_menu.addAction(cyberpunk_action)
+
+        retro_pixel_action = self._icon_action('fa5s.gamepad', "レトロピクセルモード")
+        retro_pixel_action.setCheckable(True)
+        retro_pixel_action.toggled.connect(self.toggle_retro_pixel_mode)
+        view_menu.addAction(retro_pixel_action)
+        
+        auto_scroll_menu = view_menu.addMenu("自動スクロール")
+        
+        self._set_themed_icon(auto_scroll_menu.menuAction(), 'fa5s.arrows-alt-v')
+        scroll_start_action = self._icon_action('fa5s.play-circle', "開始")
+        scroll_start_action.triggered.connect(self.start_auto_scroll)
+        auto_scroll_menu.addAction(scroll_start_action)
+        
+        scroll_stop_action = self._icon_action('fa5s.stop-circle', "停止")
+        scroll_stop_action.triggered.connect(self.stop_auto_scroll)
+        auto_scroll_menu.addAction(scroll_stop_action)
+        
+        set_speed_action = self._icon_action('fa5s.tachometer-alt', "速度設定")
+        set_speed_action.triggered.connect(self.set_scroll_speed)
+        auto_scroll_menu.addAction(set_speed_action)
+
+    def _setup_tools_menu(self, tools_menu):
+        """ツールメニューを構築する。"""
+
+        download_action = self._icon_action('fa5s.download', "ダウンロード")
+        download_action.triggered.connect(self.show_download_manager)
+        tools_menu.addAction(download_action)
+
+        tools_menu.addAction(self._shortcut_action('find_in_page', 'fa5s.search'))
+
+        set_web_panel_url_action = self._icon_action('fa5s.cog', "ウェブパネルのURLを設定")
+        set_web_panel_url_action.triggered.connect(self.set_web_panel_url)
+        if self.is_private_window:
+            set_web_panel_url_action.setEnabled(False)
+        tools_menu.addAction(set_web_panel_url_action)
+
+        qr_code_action = self._icon_action('fa5s.qrcode', "QRコード生成")
+        qr_code_action.triggered.connect(self.generate_qr_code)
+        tools_menu.addAction(qr_code_action)
+        
+        translate_action = self._icon_action('fa5s.language', "ページを翻訳 (日本語へ)")
+        translate_action.triggered.connect(self.translate_page)
+        tools_menu.addAction(translate_action)
+
+        self.tab_group_menu = tools_menu.addMenu("タブグループ")
+
+        self._set_themed_icon(self.tab_group_menu.menuAction(), 'fa5s.object-group')
+        self.create_group_action = self._icon_action('fa5s.plus-square', "新しいグループを作成")
+        self.create_group_action.triggered.connect(self.create_tab_group)
+        self.tab_group_menu.addAction(self.create_group_action)
+        self.update_tab_groups_menu() # 保存されているグループを表示
+
+        tools_menu.addAction(self._shortcut_action('quick_open', 'fa5s.search-location'))
+
+        notes_action = self._icon_action('fa5s.sticky-note', "シンプルメモ帳")
+        notes_action.triggered.connect(self.show_notes_dialog)
+        tools_menu.addAction(notes_action)
+
+        ai_chat_action = self._icon_action('fa5s.robot', "AIアシスタントに質問")
+        ai_chat_action.triggered.connect(self.start_ai_chat)
+        tools_menu.addAction(ai_chat_action)
+        
+        summarize_action = self._icon_action('fa5s.align-left', "AIによる要約")
+        summarize_action.triggered.connect(self.summarize_page)
+        tools_menu.addAction(summarize_action)
+
+        analyze_mood_action = self._icon_action('fa5s.palette', "ウェブサイトのムード分析")
+        analyze_mood_action.triggered.connect(self.analyze_website_mood)
+        tools_menu.addAction(analyze_mood_action)
+        
+        analyze_sentiment_action = self._icon_action('fa5s.smile-beam', "ページ内感情分析")
+        analyze_sentiment_action.triggered.connect(self.analyze_sentiment)
+        tools_menu.addAction(analyze_sentiment_action)
+
+        self.performance_menu = tools_menu.addMenu("パフォーマンス")
+
+        self._set_themed_icon(self.performance_menu.menuAction(), 'fa5s.stopwatch')
+        tracing_action = self._icon_action('fa5s.stream', "ホットパスのトレース")
+        tracing_action.setCheckable(True)
+        tracing_action.setChecked(tracer.enabled)
+        tracing_action.toggled.connect(self.toggle_tracing)
+        self.performance_menu.addAction(tracing_action)
+
+        save_trace_action = self._icon_action('fa5s.file-export', "トレースを保存...")
+        save_trace_action.triggered.connect(self.save_trace)
+        self.performance_menu.addAction(save_trace_action)
+
+        stall_report_action = self._icon_action('fa5s.hourglass-half', "UIの停止 (上位)...")
+        stall_report_action.triggered.connect(self.show_stall_report)
+        self.performance_menu.addAction(stall_report_action)
+
+        capture_action = self._icon_action('fa5s.video', "パフォーマンスキャプチャ...")
+        capture_action.triggered.connect(self.start_performance_capture)
+        self.performance_menu.addAction(capture_action)
+
+    def _setup_history_bookmarks_menu(self):
+        """
+        履歴とブックマークメニューを追加する。
+        中身は変更があったときに古い印を付けておき、メニューが表示される直前に作り直す。
+        """
+        self.bookmarks_menu = self.hamburger_menu.addMenu("ブックマーク")
+        self._lazy_menu_icons.append((self.bookmarks_menu.menuAction(), 'fa5s.star'))
+        self.bookmarks_menu.aboutToShow.connect(self._rebuild_bookmarks_menu)
+        self.bookmarks = self.settings['favorite_sites']
+        self.update_bookmarks_menu()
+
+        self.history_menu = self.hamburger_menu.addMenu("履歴")
+        self._lazy_menu_icons.append((self.history_menu.menuAction(), 'fa5s.history'))
+        self.history_menu.aboutToShow.connect(self._rebuild_history_menu)
+        self.load_history()
+        self.update_history_menu()
+
+    def _setup_fun_menu(self, fun_menu):
+        """お楽しみメニューを構築する。"""
+
+        preaching_mode_action = self._icon_action('fa5s.user-clock', "集中ポーション (ON/OFF)")
+        preaching_mode_action.setCheckable(True)
+        preaching_mode_action.triggered.connect(self.toggle_preaching_mode)
+        fun_menu.addAction(preaching_mode_action)
+        
+        timemachine_action = self._icon_action('fa5s.archive', "タイムマシンモード")
+        timemachine_action.triggered.connect(self.activate_timemachine)
+        fun_menu.addAction(timemachine_action)
+
+        time_travel_action = self._icon_action('fa5s.space-shuttle', "タイムトラベルモード")
+        time_travel_action.triggered.connect(self.toggle_time_travel_mode)
+        fun_menu.addAction(time_travel_action)
+
+        clean_robot_action = self._icon_action('fa5s.broom', "お掃除ロボット起動")
+        clean_robot_action.triggered.connect(self.activate_cleaning_robot)
+        fun_menu.addAction(clean_robot_action)
+
+        rain_sound_action = self._icon_action('fa5s.cloud-rain', "バーチャル雨音モード (ON/OFF)")
+        rain_sound_action.setCheckable(True)
+        rain_sound_action.toggled.connect(self.toggle_rain_sound_mode)
+        fun_menu.addAction(rain_sound_action)
+        
+        mission_mode_action = self._icon_action('fa5s.tasks', "ミッションモード")
+        mission_mode_action.triggered.connect(self.start_mission_mode)
+        fun_menu.addAction(mission_mode_action)
+
+    def setup_hamburger_menu(self):
+        """
+        ハンバーガーメニューにアクションを追加する。
+        起動を速くするため、サブメニューの中身とアイコンは最初に表示されるときに構築する。
+        """
+        self._lazy_menu_icons = [] # (アクション, qtawesomeのアイコン名)
+        self.toggle_web_panel_action = None
+        self.toggle_vertical_tabs_action = None
+        self._create_shortcut_actions()
+
+        self._add_lazy_menu("ファイル", 'fa5s.file', self._setup_file_menu)
+        self._add_lazy_menu("表示", 'fa5s.eye', self._setup_view_menu)
+        self._add_lazy_menu("ツール", 'fa5s.tools', self._setup_tools_menu)
+        self._setup_history_bookmarks_menu()
+        self._add_lazy_menu("お楽しみ", 'fa5s.grin-stars', self._setup_fun_menu)
+
+        # 設定メニュー
+        settings_action = QAction("設定を開く", self)
+        settings_action.triggered.connect(self.show_settings_dialog)
+        self._lazy_menu_icons.append((settings_action, 'fa5s.cog'))
+        self.hamburger_menu.addSeparator()
+        self.hamburger_menu.addAction(settings_action)
+        self.hamburger_menu.aboutToShow.connect(self._load_hamburger_menu_icons)
+
+    def handle_new_tab_request(self, page):
+        """
+        CustomWebEnginePageからの新しいタブ作成リクエストを処理する。
+        """
+        # createWindowを呼び出した側で後からURLが設定されるため、「読み込み中...」というラベルでタブを作成する。
+        self.add_new_tab(page_to_set=page, label="読み込み中...")
+
+    def migrate_settings(self, settings_data):
+        """古い設定ファイルを新しいバージョンに変換する。"""
+        file_version = settings_data.get('settings_version')
+
+        if file_version == self.settings_version:
+            return settings_data # 最新バージョンなので何もしない
+
+        # マイグレーションが必要な場合のみバックアップと通知を行う
+        print(f"古い設定ファイル（バージョン: {file_version}）を検出しました。バージョン {self.settings_version} に更新します。")
+        
+        backup_file = f"{self.settings_file}.bak_{datetime.datetime.now().strftime('%Y%m%d%H%M%S')}"
+        try:
+            import shutil
+            shutil.copy2(self.settings_file, backup_file)
+            QMessageBox.information(self, "設定ファイルの更新",
+                                    f"設定ファイルが新しいバージョンに更新されました。\n"
+                                    f"元の設定は '{backup_file}' としてバックアップされています。")
+        except FileNotFoundError:
+            # これは初回起動フローから来た場合など、ファイルがまだないケース。問題ない。
+            pass
+        except Exception as e:
+            print(f"設定ファイルのバックアップ作成に失敗しました: {e}", file=sys.stderr)
+            QMessageBox.warning(self, "バックアップ失敗", "設定ファイルのバックアップ作成に失敗しました。")
+
+        updated_settings = settings_data.copy()
+
+        # --- バージョンごとのマイグレーション処理 ---
+        
+        # バージョン情報がない、または "1.1" より古い場合
+        if file_version is None or file_version < "1.1":
+            print("Migrating settings to version 1.1...")
+            
+            # 'search_engine_url' が存在し、'current_search_engine_url' がない場合、キー名を変更
+            if 'search_engine_url' in updated_settings and 'current_search_engine_url' not in updated_settings:
+                updated_settings['current_search_engine_url'] = updated_settings.pop('search_engine_url')
+            
+            # 新しく追加された可能性のある設定項目にデフォルト値を追加
+            # setdefault を使うことで、既存のユーザー設定を上書きしない
+            defaults = {
+                'sleep_mode_enabled': True,
+                'sleep_mode_interval': 300000,
+                'restore_last_session': True,
+                'adblock_enabled': True,
+                'last_session': [],
+                'web_panel_visible': False,
+                'splitter_sizes': [800, 250],
+            }
+            for key, value in defaults.items():
+                updated_settings.setdefault(key, value)
+        
+        # --- 将来のマイグレーションはここに追加 ---
+        # if file_version < "1.2":
+        #     ...
+
+        # 最後にバージョン情報を更新し、更新後の設定を返す
+        updated_settings['settings_version'] = self.settings_version
+        return updated_settings
+
+    def load_settings(self):
+        """設定をファイルから読み込む。"""
+        if self.is_private_window:
+            return {}
+        # 起動時はスプラッシュ表示中に読み込みを済ませている
+        settings_data = startup_preloader.take('settings')
+        if settings_data is not None:
+            return settings_data
+        return read_settings_file(self.settings_file)
+
+    @traced()
+    def save_settings(self):
+        """設定をファイルに保存する。"""
+        if self.is_private_window:
+            return
+        # ウィンドウが最大化または全画面表示でない場合にのみサイズと位置を保存
+        if not self.isMaximized() and not self.isFullScreen():
+            self.settings['window_size'] = [self.size().width(), self.size().height()]
+            self.settings['window_pos'] = [self.pos().x(), self.pos().y()]
+        
+        # バージョン情報を保存
+        self.settings['settings_version'] = self.settings_version
+        self.settings['app_version'] = self.browser_version
+
+        # current_search_engine_url も保存する
+        self.settings['current_search_engine_url'] = self.current_search_engine_url
+        
+        # スプリッターのサイズを保存
+        # ウェブパネルが作成されていないときはサイズを上書きしない
+        if getattr(self, 'web_panel', None) is not None:
+            # 開発者ツールの幅はウェブパネルの設定に含めない
+            self.settings['splitter_sizes'] = [size for i, size in enumerate(self.splitter.sizes())
+                                               if self.splitter.widget(i) is not self.devtools_view]
+
+        # 現在開いているタブのURLを保存
+        # self.tabsが初期化されているか確認
+        if hasattr(self, 'tabs') and self.settings.get('restore_last_session', True):
+            urls = []
+            scrolls = [] # last_sessionと同じ並びのスクロール位置 (旧バージョンとの互換のため別キーに保存)
+            for i in range(self.tabs.count()):
+                widget = self.tabs.widget(i)
+                if isinstance(widget, QWebEngineView):
+                    urls.append(widget.url().toString())
+                elif isinstance(widget, UnloadedTabPlaceholder):
+                    urls.append(widget.url.toString())
+                else:
+                    continue
+                scroll = get_tab_scroll(widget)
+                scrolls.append(list(scroll) if scroll else None)
+            self.settings['last_session'] = urls
+            self.settings['last_session_scroll'] = scrolls
+
+        # self.settings の内容を settings_data にコピーしてから保存
+        self.settings_data.update(self.settings)
+
+        try:
+            with open(self.settings_file, 'w', encoding='utf-8') as f:
+                json.dump(self.settings_data, f, indent=4, ensure_ascii=False)
+        except IOError as e:
+            print(f"設定ファイルの保存に失敗しました: {e}", file=sys.stderr)
+
+    def load_history(self):
+        """履歴をファイルから読み込む。"""
+        if self.is_private_window:
+            self.history = []
+            return
+
+        history = startup_preloader.take('history')
+        self.history = history if history is not None else read_history_file(self.history_file)
+
+    @traced()
+    def save_history(self):
+        """履歴をファイルに保存する。"""
+        if self.is_private_window:
+            return
+        try:
+            with open(self.history_file, 'w', encoding='utf-8') as f:
+                json.dump(self.history, f, indent=4, ensure_ascii=False)
+        except IOError as e:
+            print(f"履歴ファイルの保存に失敗しました: {e}", file=sys.stderr)
+
+    def closeEvent(self, event):
+        """ウィンドウが閉じられたときに設定を保存する。"""
+        if not self.is_private_window:
+            # 管理しているすべてのプライベートウィンドウを閉じる
+            # イテレート中にリストを変更する可能性があるため、リストのコピーを作成
+            for p_win in list(self.private_windows):
+                p_win.close()
+            # 終了前にセッションと履歴を保存
+            self.save_settings()
+            self.save_history()
+        
+        self.close_dev_tools()
+        if self.performance_capture is not None and self.performance_capture.is_running():
+            # 途中までの結果は保存するが、閉じている最中に完了のダイアログは出さない
+            self.performance_capture.blockSignals(True)
+            self.performance_capture.stop()
+        self.tab_preloader.clear()
+        self.webview_pool.clear()
+        # メモリにだけあるサムネイルをディスクに書き出す (プライベートウィンドウではディスクに保存しない)
+        self.thumbnail_cache.flush(wait=True)
+        tab_search_index.remove_window(self)
+        if not self.is_private_window:
+            QApplication.instance().removeEventFilter(self)
+        if self.is_sleeping:
+            # スリープ中のまま閉じられた場合も、このウィンドウが止めたUIの停止の監視を再開する
+            from .stall_monitor import stall_monitor
+            stall_monitor.resume()
+            self.is_sleeping = False
+        # グローバルシグナルからの参照が残るとウィンドウが解放されないため切断する
+        try:
+            theme_signal.theme_changed.disconnect(self.update_palette)
+        except TypeError:
+            pass
+        self.window_closed.emit(self)
+        event.accept()
+
+    def changeEvent(self, event):
+        """ウィンドウの状態変化を監視し、ESCキーによるフルスクリーン解除を処理する。"""
+        super().changeEvent(event)
+        if event.type() == event.Type.WindowStateChange:
+            if self.is_html_fullscreen and not (self.windowState() & Qt.WindowState.WindowFullScreen):
+                # Escキーでフルスクリーンが解除された場合、UIを復元
+                self._exit_html_fullscreen(request=None)
+            if not self.isMinimized():
+                # 最小化中に溜まったUI更新を反映する
+                self.ui_scheduler.schedule()
+
+    def _exit_html_fullscreen(self, request):
+        """HTML5フルスクリーンモードを終了し、UIを復元する。"""
+        if self.is_html_fullscreen:
+            self.is_html_fullscreen = False
+            self.nav_toolbar.setVisible(True)
+            self.tabs.tabBar().setVisible(not self._vertical_tabs_enabled())
+            if self._vertical_tabs_enabled():
+                self.vertical_tab_dock.setVisible(True)
+            self.favorites_toolbar.setVisible(True)
+            self.status_bar.setVisible(True)
+            self.showNormal()
+            if request:
+                request.accept()
+
+    def _apply_stylesheet(self):
+        """管理しているQSS部品を結合して適用する。"""
+        full_qss = "".join(self.qss_parts.values())
+        self.setStyleSheet(full_qss)
+
+    def handle_fullscreen_request(self, request, originating_page):
+        """ウェブページからのフルスクリーン要求を処理する。"""
+        # 現在表示されているタブからの要求でなければ無視
+        current_widget = self.tabs.currentWidget()
+        if not isinstance(current_widget, QWebEngineView) or originating_page != current_widget.page():
+            request.reject()
+            return
+
+        if request.toggleOn():
+            # フルスクリーンに移行
+            if not self.is_html_fullscreen:
+                self.is_html_fullscreen = True
+                self.nav_toolbar.setVisible(False)
+                self.tabs.tabBar().setVisible(False)
+                if self.vertical_tab_dock:
+                    self.vertical_tab_dock.setVisible(False)
+                self.favorites_toolbar.setVisible(False)
+                self.status_bar.setVisible(False)
+                self.showFullScreen()
+            request.accept()
+        else:
+            # フルスクリーンを終了
+            self._exit_html_fullscreen(request)
+
+    def update_palette_from_system_theme(self):
+        """
+        システムテーマに基づいてパレットを更新する (macOSのみ)。
+        """
+        if platform.system() == "Darwin":
+            palette = QApplication.instance().palette()
+            self.setPalette(palette)
+            self.update_palette_based_on_color(palette.color(QPalette.ColorRole.Window))
+            
+    def update_palette_based_on_color(self, color):
+        """
+        基本色に基づいてライト/ダークモードを判定し、パレットを更新する。
+        """
+        if color.lightnessF() < 0.5: # 明度が0.5未満ならダークモード
+            theme_signal.theme_changed.emit('dark')
+        else: # 明度が0.5以上ならライトモード
+            theme_signal.theme_changed.emit('light')
+            
+    @traced()
+    def update_palette(self, theme_mode):
+        """
+        グローバルシグナルから受け取ったテーマモードに基づいてパレットを更新する。
+        """
+        palette = QPalette() # 新しいパレットを作成
+        theme_qss = ""
+        if theme_mode == "dark":
+            palette.setColor(QPalette.ColorRole.Window, QColor(45, 45, 45))
+            palette.setColor(QPalette.ColorRole.WindowText, QColor(240, 240, 240))
+            palette.setColor(QPalette.ColorRole.Base, QColor(30, 30, 30))
+            palette.setColor(QPalette.ColorRole.AlternateBase, QColor(50, 50, 50))
+            palette.setColor(QPalette.ColorRole.Text, QColor(240, 240, 240))
+            palette.setColor(QPalette.ColorRole.Button, QColor(60, 60, 60))
+            palette.setColor(QPalette.ColorRole.ButtonText, QColor(240, 240, 240))
+            palette.setColor(QPalette.ColorRole.ToolTipBase, QColor(50, 50, 50)) # ツールチップ背景
+            palette.setColor(QPalette.ColorRole.ToolTipText, QColor(240, 240, 240)) # ツールチップ文字
+            palette.setColor(QPalette.ColorRole.BrightText, QColor(255, 0, 0)) # 明るいテキスト (エラーなど)
+            palette.setColor(QPalette.ColorRole.Highlight, QColor(0, 120, 215)) # 選択されたアイテムの背景 (例: メニュー項目)
+            palette.setColor(QPalette.ColorRole.HighlightedText, QColor(255, 255, 255)) # 選択されたアイテムの文字
+            palette.setColor(QPalette.ColorRole.PlaceholderText, QColor(150, 150, 150)) # プレースホルダーテキスト
+            
+            # QSSを使ってメニューの背景色と文字色を設定
+            theme_qss = """
+                QMenu {
+                    background-color: #282828; /* 暗いグレーの背景 */
+                    color: #F0F0F0; /* 明るいグレーの文字色 */
+                    border: 1px solid #3A3A3A; /* ボーダー */
+                }
+                QMenu::item {
+                    padding: 5px 15px 5px 25px; /* アイテムのパディング */
+                }
+                QMenu::item:selected {
+                    background-color: #0078D7; /* 選択時の背景色 */
+                    color: #FFFFFF; /* 選択時の文字色 */
+                }
+                QMenu::separator {
+                    height: 1px;
+                    background: #505050;
+                    margin: 5px 0px;
+                }
+                QTabWidget::pane {
+                    border: 1px solid #3A3A3A;
+                    border-top: none;
+                }
+                QTabBar::tab {
+                    background-color: #3C3C3C;
+                    color: #F0F0F0;
+                    border: 1px solid #3A3A3A;
+                    border-bottom: none; /* タブの下線を消す */
+                    padding: 8px 16px;
+                    margin-right: 1px;
+                    border-top-left-radius: 8px;
+                    border-top-right-radius: 8px;
+                    width: 160px; /* タブの幅を固定 */
+                    elide-mode: elide-right; /* はみ出したテキストを省略 */
+                    text-align: left; /* テキストを左寄せ */
+                }
+                QTabBar::tab:selected {
+                    background-color: #2D2D2D; /* ウィンドウ背景と同じ色 */
+                    margin-bottom: -1px; /* 選択タブを少し下にずらしてpaneと繋がって見えるように */
+                    padding-bottom: 9px;
+                }
+                QTabBar::tab:!selected:hover {
+                    background-color: #4C4C4C;
+                }
+            """
+
+        else: # "light"
+            # ライトテーマの色を明示的に設定
+            palette.setColor(QPalette.ColorRole.Window, QColor(255, 255, 255))
+            palette.setColor(QPalette.ColorRole.WindowText, QColor(0, 0, 0))
+            palette.setColor(QPalette.ColorRole.Base, QColor(255, 255, 255))
+            palette.setColor(QPalette.ColorRole.AlternateBase, QColor(240, 240, 240))
+            palette.setColor(QPalette.ColorRole.Text, QColor(0, 0, 0))
+            palette.setColor(QPalette.ColorRole.Button, QColor(240, 240, 240))
+            palette.setColor(QPalette.ColorRole.ButtonText, QColor(0, 0, 0))
+            palette.setColor(QPalette.ColorRole.ToolTipBase, QColor(255, 255, 220))
+            palette.setColor(QPalette.ColorRole.ToolTipText, QColor(0, 0, 0))
+            palette.setColor(QPalette.ColorRole.BrightText, QColor(255, 0, 0))
+            palette.setColor(QPalette.ColorRole.Highlight, QColor(0, 120, 215))
+            palette.setColor(QPalette.ColorRole.HighlightedText, QColor(255, 255, 255))
+            palette.setColor(QPalette.ColorRole.PlaceholderText, QColor(128, 128, 128))
+
+            window_color = "#FFFFFF"
+            border_color = "#C0C0C0" # 少し暗めのボーダー
+            tab_bg_color = "#F0F0F0" # 非選択タブの背景
+            tab_hover_color = "#E0E0E0" # ホバー時の色
+
+            theme_qss = f"""
+                QMenu {{
+                    background-color: #FFFFFF;
+                    color: #000000;
+                    border: 1px solid #C0C0C0;
+                }}
+                QMenu::item:selected {{
+                    background-color: #0078D7;
+                    color: #FFFFFF;
+                }}
+                QTabWidget::pane {{
+                    border: 1px solid {border_color};
+                    border-top: none;
+                }}
+                QTabBar::tab {{
+                    background-color: {tab_bg_color};
+                    color: #000000;
+                    border: 1px solid {border_color};
+                    border-bottom: none;
+                    padding: 8px 16px;
+                    margin-right: 1px;
+                    border-top-left-radius: 8px;
+                    border-top-right-radius: 8px;
+                    width: 160px; /* タブの幅を固定 */
+                    elide-mode: elide-right; /* はみ出したテキストを省略 */
+                    text-align: left; /* テキストを左寄せ */
+                }}
+                QTabBar::tab:selected {{
+                    background-color: {window_color};
+                    margin-bottom: -1px;
+                    padding-bottom: 9px;
+                }}
+                QTabBar::tab:!selected:hover {{
+                    background-color: {tab_hover_color};
+                }}
+            """
+        
+        self.qss_parts['theme'] = theme_qss
+        self._apply_stylesheet()
+        self.setPalette(palette) # ウィンドウのパレットを設定
+        QApplication.instance().setPalette(palette) # アプリケーション全体のパレットを設定
+        # アイコンをテーマに合わせた色で描き直す (キャッシュはプロセス全体で共有し、テーマが同じなら再利用する)
+        if icon_cache.theme != theme_mode:
+            icon_cache.invalidate(theme_mode)
+        self._refresh_themed_icons()
+    
+    def _ensure_web_panel(self):
+        """ウェブパネルがまだなければ作成し、設定のURLを読み込む。"""
+        if self.web_panel is not None:
+            return self.web_panel
+        self.web_panel = QWebEngineView()
+        self.web_panel.setObjectName("web_panel")
+        self.splitter.addWidget(self.web_panel)
+        # スプリッターのサイズを復元 (開発者ツールが開いていればその幅は維持する)
+        sizes = list(self.settings.get('splitter_sizes', [800, 250]))
+        if self.devtools_view is not None:
+            index = self.splitter.indexOf(self.devtools_view)
+            sizes.insert(index, self.splitter.sizes()[index])
+        self.splitter.setSizes(sizes)
+        self.web_panel.setUrl(QUrl(self.settings.get('web_panel_url', 'https://www.bing.com/chat')))
+        return self.web_panel
+
+    def _discard_web_panel(self):
+        """非表示のまま一定時間が過ぎたウェブパネルを破棄し、レンダラーのメモリを解放する。"""
+        if self.web_panel is None or self.web_panel.isVisibleTo(self):
+            return
+        self.web_panel.setParent(None)
+        self.web_panel.deleteLater()
+        self.web_panel = None
+
+    def toggle_web_panel(self, visible):
+        """ウェブパネルの表示/非表示を切り替える。"""
+        if self.is_private_window:
+            self.toggle_web_panel_action.setChecked(False)
+            return
+            
+        if visible:
+            self.web_panel_discard_timer.stop()
+            self._ensure_web_panel()
+            # 非表示の間にフリーズしていたパネルを再開する
+            self.web_panel.page().setLifecycleState(QWebEnginePage.LifecycleState.Active)
+            self.web_panel.setVisible(True)
+        elif self.web_panel is not None:
+            self.web_panel.setVisible(False)
+            # 非表示のページは凍結し、しばらく使われなければ破棄する
+            self.web_panel.page().setLifecycleState(QWebEnginePage.LifecycleState.Frozen)
+            if self.web_panel_discard_timer.interval() > 0:
+                self.web_panel_discard_timer.start()
+        # メニューのテキストを更新
+        self.toggle_web_panel_action.setText("ウェブパネルを非表示" if visible else "ウェブパネルを表示")
+        # 設定に保存
+        self.settings['web_panel_visible'] = visible
+        self.save_settings()
+
+    def _vertical_tabs_enabled(self):
+        return self.vertical_tab_dock is not None and self.vertical_tabs_enabled
+
+    def toggle_vertical_tabs(self, enabled):
+        """垂直タブのサイドバーを表示/非表示にする。表示中は横のタブバーを隠す。"""
+        if enabled and self.vertical_tab_dock is None:
+            self.vertical_tab_sidebar = VerticalTabSidebar(self.tabs)
+            self.vertical_tab_dock = QDockWidget("タブ", self)
+            self.vertical_tab_dock.setObjectName("vertical_tab_dock")
+            self.vertical_tab_dock.setFeatures(QDockWidget.DockWidgetFeature.NoDockWidgetFeatures)
+            self.vertical_tab_dock.setWidget(self.vertical_tab_sidebar)
+            self.addDockWidget(Qt.DockWidgetArea.LeftDockWidgetArea, self.vertical_tab_dock)
+        if self.vertical_tab_dock:
+            self.vertical_tab_dock.setVisible(enabled)
+        self.tabs.tabBar().setVisible(not enabled)
+
+        self.vertical_tabs_enabled = enabled
+        # 表示メニューがまだ構築されていなければ、構築時にこの状態が反映される
+        if self.toggle_vertical_tabs_action is not None and self.toggle_vertical_tabs_action.isChecked() != enabled:
+            self.toggle_vertical_tabs_action.setChecked(enabled)
+        if self.settings.get('vertical_tabs_enabled', False) != enabled:
+            self.settings['vertical_tabs_enabled'] = enabled
+            self.save_settings()
+
+    def _refresh_tab_list_row(self, index):
+        """垂直タブリストに、指定したタブの表示内容が変わったことを通知する。"""
+        if self.vertical_tab_sidebar:
+            self.vertical_tab_sidebar.model.refresh_row(index)
+
+    def set_web_panel_url(self):
+        """ウェブパネルに表示するURLを設定する。"""
+        if self.is_private_window:
+            QMessageBox.information(self, "情報", "プライベートウィンドウではウェブパネルのURLは変更できません。")
+            return
+
+        current_url = self.settings.get('web_panel_url', '')
+        new_url, ok = QInputDialog.getText(self, "ウェブパネルのURL設定", "URLを入力してください:", text=current_url)
+        
+        if ok and new_url:
+            if self.web_panel is not None:
+                self.web_panel.setUrl(QUrl(new_url))
+            self.settings['web_panel_url'] = new_url
+            self.save_settings()
+            self.statusBar().showMessage("ウェブパネルのURLを更新しました。", 3000)
+
+    def handle_tab_changed(self, index):
+        """タブが変更されたときに呼び出される。プレースホルダーを実際のウェブビューに置き換える。"""
+        if index < 0:
+            return
+
+        widget = self.tabs.widget(index)
+        if isinstance(widget, UnloadedTabPlaceholder):
+            self.materialize_tab(index)
+        
+        # 既存の処理も呼び出す
+        self.update_url_bar_on_tab_change(index)
+        self.reset_sleep_timer()
+        self._apply_volume_to_page(self.volume_slider.value())
+        self._retarget_dev_tools()
+
+    def _replace_tab_widget(self, index, new_widget, title):
+        """タブのウィジェットを同じ位置で差し替える。現在のタブは変えずに維持する。"""
+        is_current = self.tabs.currentIndex() == index
+        # シグナルを一時的に切断して再帰呼び出しや予期せぬ動作を防ぐ
+        self.tabs.currentChanged.disconnect(self.handle_tab_changed)
+        try:
+            old_widget = self.tabs.widget(index)
+            tooltip = self.tabs.tabToolTip(index)
+            self.tabs.insertTab(index, new_widget, title)
+            self.tabs.setTabToolTip(index, tooltip)
+            self.tabs.removeTab(index + 1)
+            if is_current:
+                self.tabs.setCurrentIndex(index)
+        finally:
+            # シグナルを再接続
+            self.tabs.currentChanged.connect(self.handle_tab_changed)
+        new_widget.tab_group_id = getattr(old_widget, 'tab_group_id', None)
+        return old_widget
+
+    def materialize_tab(self, index, interactive=True):
+        """
+        未読み込みのタブのプレースホルダーを、実際のウェブビューに置き換えて返す。
+        interactiveがFalse(バックグラウンドでの先読み)なら、ダイアログなどユーザーに見える処理は行わない。
+        """
+        placeholder = self.tabs.widget(index)
+        if not isinstance(placeholder, UnloadedTabPlaceholder):
+            return None
+        browser, _ = self._create_browser_view(placeholder.url, placeholder.title, history_data=placeholder.history_data,
+                                               interactive=interactive)
+        if browser is None:
+            return None # 集中ポーションでブロックされた場合はプレースホルダーのまま
+        if placeholder.scroll_pos:
+            self._restore_scroll_on_load(browser, placeholder.scroll_pos)
+        self._replace_tab_widget(index, browser, placeholder.title)
+        tab_search_index.remove(placeholder)
+        tab_search_index.add(self, browser, placeholder.title, placeholder.url.toString())
+        placeholder.deleteLater()
+        return browser
+
+    def _restore_scroll_on_load(self, browser, scroll_pos):
+        """最初の読み込みが終わったら一度だけスクロール位置を復元する。"""
+        x, y = scroll_pos
+        def restore(ok):
+            browser.tab_connections.disconnect('restore_scroll')
+            if ok:
+                browser.page().runJavaScript(f"window.scrollTo({float(x)}, {float(y)});")
+        browser.tab_connections.connect(browser.loadFinished, restore, key='restore_scroll')
+
+    def handle_render_process_terminated(self, browser, status, exit_code):
+        """
+        レンダラープロセスが終了したタブを、履歴とスクロール位置を保持したプレースホルダーに置き換える。
+        タブはアクティブにしたときか再読み込みボタンで読み込み直す。
+        """
+        if status == QWebEnginePage.RenderProcessTerminationStatus.NormalTerminationStatus:
+            return
+        reason = renderer_crash_monitor.record(status, exit_code)
+        if status == QWebEnginePage.RenderProcessTerminationStatus.KilledTerminationStatus:
+            # メモリ不足の可能性があるため、ウォームプールのビューも手放す
+            self.webview_pool.shrink(0)
+        index = self.tabs.indexOf(browser)
+        if index == -1:
+            return # プール内のビューなど、タブに表示されていないビュー
+        page = browser.page()
+        url = browser.url().toString()
+        title = browser.title() or self.tabs.tabText(index)
+        placeholder = CrashedTabPlaceholder(url, title, reason, serialize_history(page), get_tab_scroll(browser))
+        placeholder.reload_requested.connect(lambda p=placeholder: self._reload_crashed_tab(p))
+        self._replace_tab_widget(index, placeholder, title)
+        tab_search_index.remove(browser)
+        tab_search_index.add(self, placeholder, title, url)
+        self._teardown_browser_view(browser)
+        browser.deleteLater()
+        self.statusBar().showMessage(f"タブ '{title}' のプロセスが終了しました: {reason}", 5000)
+
+    def _reload_crashed_tab(self, placeholder):
+        index = self.tabs.indexOf(placeholder)
+        if self.materialize_tab(index) is not None and index == self.tabs.currentIndex():
+            self.update_url_bar_on_tab_change(index)
+
+    def discard_tab(self, index):
+        """
+        読み込み済みのタブを未読み込みのプレースホルダーに戻し、レンダラーのメモリを解放する。
+        表示中のタブは破棄しない。
+        """
+        browser = self.tabs.widget(index)
+        if not isinstance(browser, QWebEngineView) or index == self.tabs.currentIndex():
+            return False
+        url = browser.url().toString()
+        title = browser.title() or self.tabs.tabText(index)
+        # 読み込み直したときに元の位置に戻れるよう、履歴とスクロール位置を引き継ぐ
+        placeholder = UnloadedTabPlaceholder(url, title, history_data=serialize_history(browser.page()),
+                                             scroll_pos=get_tab_scroll(browser))
+        self._replace_tab_widget(index, placeholder, title)
+        tab_search_index.remove(browser)
+        tab_search_index.add(self, placeholder, title, url)
+        self._teardown_browser_view(browser)
+        browser.deleteLater()
+        return True
+
+    def _capture_deactivated_tab(self, previous):
+        """
+        非アクティブになる直前のタブの表示内容をサムネイルとして保存する。
+        切り替え後は非表示のビューをgrabすることになり、空白や古い画像になるため、切り替え前に呼び出す。
+        """
+        if isinstance(previous, QWebEngineView) and previous.isVisible():
+            self.thumbnail_cache.capture(previous.url().toString(), previous)
+
+    def _show_tab_preview(self, event):
+        """タブバーのツールチップとして、キャッシュにあるサムネイルを表示する。"""
+        index = self.tabs.tabBar().tabAt(event.pos())
+        if index == -1:
+            return False
+        url = get_tab_url(self.tabs.widget(index))
+        image_url = self.thumbnail_cache.data_url(url) if url else None
+        if not image_url:
+            return False # 通常のツールチップを表示する
+        # タイトルとURLはページが決めるため、マークアップとして解釈されないようにエスケープする
+        text = (f"<b>{html.escape(self.tabs.tabText(index))}</b><br>"
+                f"<img src=\"{html.escape(image_url)}\"><br>{html.escape(url)}")
+        QToolTip.showText(event.globalPos(), text, self.tabs.tabBar())
+        return True
+
+    def show_tab_overview(self):
+        """すべてのタブをサムネイルのグリッドで表示する。"""
+        # 現在のタブもキャプチャしておく (結果は届き次第グリッドに反映される)
+        current = self.tabs.currentWidget()
+        if isinstance(current, QWebEngineView):
+            self.thumbnail_cache.capture(current.url().toString(), current)
+        TabOverviewDialog(self, self).exec()
+
+    def add_unloaded_tab(self, url_str, label):
+        """ロードされていないタブのプレースホルダーを追加する。"""
+        # URLから仮のタイトルを生成
+        parsed_url = urlparse(url_str)
+        title = parsed_url.hostname or label
+        
+        placeholder = UnloadedTabPlaceholder(url_str, title)
+        index = self.tabs.addTab(placeholder, title)
+        self.tabs.setTabToolTip(index, url_str)
+        tab_search_index.add(self, placeholder, title, url_str)
+        return placeholder
+
+    def _get_web_profile(self):
+        """このウィンドウのタブが使用するQWebEngineProfileを返す。"""
+        if self.is_private_window:
+            return self.private_profile
+        return QWebEngineProfile.defaultProfile()
+
+    def _build_browser_view(self):
+        """
+        ページ・属性・シグナル接続まで済ませたQWebEngineViewを作成する。
+        WebViewPoolのファクトリとして使われ、URLの読み込みはチェックアウト側で行う。
+        """
+        browser = QWebEngineView()
+        page = CustomWebEnginePage(self._get_web_profile(), browser)
+        browser.setPage(page)
+        self._connect_browser_view(browser)
+        return browser
+
+    def _connect_browser_view(self, browser):
+        """
+        ビューとページの属性設定とシグナル接続を行う。
+        接続はすべてbrowser.tab_connectionsに登録し、_teardown_browser_viewでまとめて切断する。
+        """
+        browser.settings().setAttribute(QWebEngineSettings.WebAttribute.FullScreenSupportEnabled, True)
+        page = browser.page()
+        connections = TabConnections()
+        browser.tab_connections = connections
+        connections.connect(page.new_tab_requested, self.handle_new_tab_request)
+        connections.connect(page.fullScreenRequested, lambda req, p=page: self.handle_fullscreen_request(req, p))
+        # リンクホバー時にステータスバーを更新
+        connections.connect(page.linkHovered, self.handle_link_hovered)
+        connections.connect(page.renderProcessTerminated, lambda status, code, b=browser: self.handle_render_process_terminated(b, status, code))
+        if isinstance(page, CustomWebEnginePage):
+            # 破棄・クラッシュ・セッション復元で使うスクロール位置を記録しておく
+            connections.connect(page.scroll_snapshot, lambda url, x, y, b=browser: setattr(b, 'scroll_snapshot', (url, x, y)))
+
+        # UIの更新はスケジューラ経由でフレーム単位にまとめる
+        # ステータスバーの更新はURL変更時とロード完了時に行う
+        connections.connect(browser.urlChanged, lambda q, b=browser: self.ui_scheduler.mark(b, url=True, status=True))
+        connections.connect(browser.titleChanged, lambda title, b=browser: self.ui_scheduler.mark(b, title=title))
+        connections.connect(browser.iconChanged, lambda icon, b=browser: self.ui_scheduler.mark(b, icon=True))
+        connections.connect(browser.loadProgress, lambda progress, b=browser: self.ui_scheduler.mark(b, progress=progress))
+        connections.connect(browser.loadFinished, lambda ok, b=browser: self.ui_scheduler.mark(b, status=True))
+        connections.connect(browser.urlChanged, self.add_to_history)
+        # クイックオープン用の検索インデックスを逐次更新する
+        connections.connect(browser.titleChanged, lambda title, b=browser: tab_search_index.update(b, title=title))
+        connections.connect(browser.urlChanged, lambda q, b=browser: tab_search_index.update(b, url=q.toString()))
+
+    def _teardown_browser_view(self, browser):
+        """
+        閉じる・破棄するタブのビューからすべてのシグナル接続を切断し、削除の準備をする。
+        ビュー自体のdeleteLaterは呼び出し側で行う。
+        """
+        connections = getattr(browser, 'tab_connections', None)
+        if connections:
+            connections.disconnect_all()
+        self.ui_scheduler.forget(browser)
+        self.tab_preloader.forget(browser)
+        if self.closed_view_tracker:
+            self.closed_view_tracker.track(browser)
+
+        page = browser.page()
+        if page is not None:
+            # createWindowで作られたページは元のページが親なので、ビューと一緒に削除されるよう付け替える
+            if page.parent() is not browser:
+                page.setParent(browser)
+            # about:blankへ遷移させる代わりに、読み込みを止めて即座に消音する。
+            # ページ自体はビューのdeleteLaterで確実に破棄されるため、音声が鳴り続けることはない。
+            page.setAudioMuted(True)
+        browser.stop()
+
+    @traced()
+    def _create_browser_view(self, qurl=None, label="新規", page_to_set=None, history_data=None, interactive=True):
+        """
+        QWebEngineViewインスタンスを用意し、URLを読み込んで返す。
+        通常のタブはウォームプールから取り出し、add_new_tabとhandle_tab_changedから呼び出される。
+        history_dataが渡された場合は、URLを読み込む代わりにシリアライズ済みの履歴を復元する。
+        interactiveがFalseなら、集中ポーションでブロックしたときも警告を出さずに中止する。
+        """
+        # createWindowからのリクエストを処理
+        if page_to_set:
+            browser = QWebEngineView()
+            browser.setPage(page_to_set)
+            self._connect_browser_view(browser)
+            # 元のタブがプライベートモードかチェックしてラベルを設定
+            if page_to_set.profile().isOffTheRecord():
+                label = "㊙️ " + "読み込み中..."
+                browser.setToolTip("プライベートモードです。")
+            else:
+                label = "読み込み中..."
+        # 通常のタブ作成リクエスト
+        else:
+            # 起動時のURLが'about:home'の場合、独自のHomeWebViewインスタンスを作成
+            # ここに集中ポーションのチェックを追加
+            if qurl and qurl.toString() == "about:home":
+                qurl = QUrl(self.settings['home_url'])
+                label = "ホーム"
+
+            if qurl is None: qurl = QUrl(self.settings['home_url'])
+            
+            if self.is_preaching_mode_active:
+                current_url_str = qurl.toString()
+                for blocked_site in self.settings['blocked_sites']:
+                    if blocked_site in current_url_str:
+                        if interactive:
+                            QMessageBox.warning(self, "集中ポーションが発動中！", "さぼっちゃダメ！作業に戻りましょう！")
+                        return None, None # タブ作成を中止
+            
+            browser = self.webview_pool.checkout()
+
+            if self.is_private_window:
+                label = "㊙️ " + label
+                browser.setToolTip("プライベートモードです。")
+
+            # ページを設定した後にURLをロードする（HomeWebViewを除く）
+            # これにより、起動時にページが白紙になる問題が修正されます。
+            # 履歴が渡されていれば復元し、失敗した場合のみ通常どおりURLを読み込む。
+            if history_data is None or not restore_history(browser.page(), history_data):
+                browser.setUrl(qurl)
+
+        # ウェブページのカスタムCSSを適用（IDを付けて後から管理しやすくする）
+        js_code = f"var style = document.createElement('style'); style.id = 'project-nowb-custom-css'; style.innerHTML = `{self.settings.get('custom_css', '')}`; document.head.appendChild(style);"
+        browser.page().runJavaScript(js_code)
+        
+        if self.is_retro_mode_active:
+            self.apply_retro_pixel_filter(browser)
+            
+        return browser, label
+
+    def add_new_tab(self, qurl=None, label="新規", page_to_set=None, history_data=None):
+        """新しいタブを作成し、タブウィジェットに追加する。"""
+        browser, final_label = self._create_browser_view(qurl, label, page_to_set, history_data)
+        if browser is None:
+            return None
+        
+        i = self.tabs.addTab(browser, final_label)
+        self.tabs.setCurrentIndex(i)
+        tab_search_index.add(self, browser, final_label, qurl.toString() if qurl else "")
+        
+        self.show_philosophy_on_new_tab()
+        return browser
+
+    def open_external_urls(self, urls, private=False):
+        """
+        コマンドラインや2つ目以降の起動から渡されたURLを新しいタブで開き、ウィンドウを前面に出す。
+        privateがTrueなら新しいプライベートウィンドウで開く。URLがない場合はウィンドウを前面に出すだけにする。
+        """
+        target = self.open_private_window() if private and not self.is_private_window else self
+        if target is None:
+            return
+        for url in urls:
+            target.add_new_tab(QUrl(url))
+        if target.isMinimized():
+            target.showNormal()
+        elif not target.isVisible():
+            target.show()
+        target.raise_()
+        target.activateWindow()
+
+    def update_tab_text(self, title, browser):
+        """Safely update tab text, handling cases where the tab widget might be deleted."""
+        try:
+            # row_of returns -1 if the widget is not found
+            index = self.tabs.row_of(browser)
+            if index != -1:
+                self.tabs.setTabText(index, title)
+                self._refresh_tab_list_row(index)
+        except RuntimeError:
+            # This can happen during shutdown if self.tabs is already deleted.
+            pass
+
+    def update_tab_icon(self, browser):
+        """ページのファビコンをタブと垂直タブリストに反映する。"""
+        index = self.tabs.row_of(browser)
+        if index != -1:
+            self.tabs.setTabIcon(index, browser.icon())
+            self._refresh_tab_list_row(index)
+
+
+    def update_status_bar(self, browser):
+        """
+        現在のページ情報をステータスバーに表示する。
+        """
+        if not isinstance(browser, QWebEngineView):
+            return
+        # バックグラウンドのタブやウォームプール内のビューは表示中の情報を上書きしない
+        if browser is not self.tabs.currentWidget():
+            return
+        title = browser.title()
+        url = browser.url().toString()
+        status_text = f"ページ情報: {title} | {url}"
+        self.status_label.setText(status_text)
+
+    def _get_download_manager(self):
+        """ダウンロードマネージャーのインスタンスを取得または作成する。起動速度向上のため遅延初期化。"""
+        if self.download_manager is None:
+            from .downloads import DownloadManagerDialog
+            self.download_manager = DownloadManagerDialog(self)
+        return self.download_manager
+
+    def show_download_manager(self):
+        """ダウンロードマネージャーダイアログを表示する。"""
+        manager = self._get_download_manager()
+        manager.show()
+        manager.raise_()
+        manager.activateWindow()
+
+    def remove_private_window_from_list(self, window):
+        if window in self.private_windows:
+            self.private_windows.remove(window)
+
+    def close_current_tab(self, index):
+        """指定されたインデックスのタブを閉じる。最後のタブは閉じない。"""
+        self.close_tabs([index])
+
+    def close_tabs(self, indices):
+        """
+        複数のタブを一括で閉じる。最後の1つのタブは残す。
+        タブバーの再描画とシグナルを止めた状態で1回の走査で破棄し、
+        現在のタブの反映やタブグループメニューの更新は最後に1回だけ行う。
+        """
+        count = self.tabs.count()
+        # インデックスのずれを防ぐため逆順で処理する
+        indices = sorted({i for i in indices if 0 <= i < count}, reverse=True)
+        if len(indices) >= count:
+            indices = indices[:-1] # すべてを閉じる場合は最も左のタブを残す
+        if not indices:
+            return
+
+        self.tabs.setUpdatesEnabled(False)
+        self.tabs.blockSignals(True)
+        try:
+            for index in indices:
+                widget_to_close = self.tabs.widget(index)
+                self.tabs.removeTab(index)
+                if widget_to_close is None:
+                    continue
+                tab_search_index.remove(widget_to_close)
+                # 閉じるウィジェットがQWebEngineViewの場合は、登録済みのシグナル接続をすべて切断し、
+                # 削除中に発行されてクラッシュしたり、ビューへの参照が残ったりするのを防ぎます。
+                if isinstance(widget_to_close, QWebEngineView):
+                    self._teardown_browser_view(widget_to_close)
+                # ウィジェットを後で安全に削除するようにスケジュール
+                widget_to_close.deleteLater()
+        finally:
+            self.tabs.blockSignals(False)
+            self.tabs.setUpdatesEnabled(True)
+
+        # シグナルを止めている間に現在のタブが変わった可能性があるので、ここで1回だけ反映する
+        if self.vertical_tab_sidebar:
+            self.vertical_tab_sidebar.model.reset()
+            self.vertical_tab_sidebar.select_tab(self.tabs.currentIndex())
+        self.handle_tab_changed(self.tabs.currentIndex())
+        self.update_tab_groups_menu()
+    def reset_sleep_timer(self):
+        """ユーザー操作があった場合にスリープタイマーをリセットする。"""
+        # 設定で有効になっている場合のみタイマーを開始/リセットする
+        if not self.is_private_window and self.settings.get('sleep_mode_enabled', True):
+            self.sleep_timer.start()
+
+    def handle_link_hovered(self, url):
+        """リンクにホバーした際にステータスバーにURLを表示する。"""
+        if url:
+            self.status_label.setText(url)
+        else:
+            # ホバーが外れたら、現在のページの情報を表示する
+            current_browser = self.tabs.currentWidget()
+            if isinstance(current_browser, QWebEngineView):
+                self.update_status_bar(current_browser)
+            elif isinstance(current_browser, UnloadedTabPlaceholder):
+                self.status_label.setText(f"非アクティブなタブ: {current_browser.title}")
+            else:
+                self.status_label.setText("準備完了。")
+
+    def show_tab_context_menu(self, point):
+        """タブの右クリックメニューを表示する。"""
+        index = self.tabs.tabBar().tabAt(point)
+        if index == -1:
+            return
+
+        menu = QMenu(self)
+
+        reload_action = QAction("再読み込み", self)
+        reload_action.triggered.connect(lambda: self.reload_tab(index))
+        menu.addAction(reload_action)
+
+        duplicate_action = QAction("タブを複製", self)
+        duplicate_action.triggered.connect(lambda: self.duplicate_tab(index))
+        menu.addAction(duplicate_action)
+
+        menu.addSeparator()
+
+        # タブのミュート機能
+        mute_tab_action = QAction(self)
+        widget = self.tabs.widget(index)
+        if isinstance(widget, QWebEngineView):
+            is_muted = widget.page().isAudioMuted()
+            mute_tab_action.setText("タブのミュートを解除" if is_muted else "タブをミュート")
+            mute_tab_action.triggered.connect(lambda: self.toggle_tab_mute(index))
+        else:
+            mute_tab_action.setText("タブをミュート")
+            mute_tab_action.setEnabled(False)
+        menu.addAction(mute_tab_action)
+
+        menu.addSeparator()
+
+        close_action = QAction("タブを閉じる", self)
+        close_action.triggered.connect(lambda: self.close_current_tab(index))
+        menu.addAction(close_action)
+
+        close_others_action = QAction("他のタブをすべて閉じる", self)
+        close_others_action.triggered.connect(lambda: self.close_other_tabs(index))
+        menu.addAction(close_others_action)
+
+        close_right_action = QAction("右側のタブを閉じる", self)
+        close_right_action.triggered.connect(lambda: self.close_tabs_to_the_right(index))
+        if index == self.tabs.count() - 1:
+            close_right_action.setEnabled(False)
+        menu.addAction(close_right_action)
+
+        menu.exec(self.tabs.tabBar().mapToGlobal(point))
+
+    def reload_tab(self, index):
+        """指定されたインデックスのタブをリロードする。"""
+        widget = self.tabs.widget(index)
+        if isinstance(widget, QWebEngineView):
+            widget.reload()
+
+    def duplicate_tab(self, index):
+        """
+        指定されたインデックスのタブを複製する。
+        再読み込みではなく戻る/進むの履歴ごと複製し、キャッシュ済みのリソースを再利用する。
+        """
+        widget = self.tabs.widget(index)
+        if isinstance(widget, QWebEngineView):
+            self.add_new_tab(widget.url(), widget.title(), history_data=serialize_history(widget.page()))
+        elif isinstance(widget, UnloadedTabPlaceholder):
+            self.add_unloaded_tab(widget.url.toString(), widget.title)
+
+    def close_other_tabs(self, index_to_keep):
+        """指定されたインデックス以外のすべてのタブを閉じる。"""
+        self.close_tabs(i for i in range(self.tabs.count()) if i != index_to_keep)
+
+    def close_tabs_to_the_right(self, index):
+        """指定されたインデックスより右側にあるすべてのタブを閉じる。"""
+        self.close_tabs(range(index + 1, self.tabs.count()))
+
+    def toggle_tab_mute(self, index):
+        """指定されたインデックスのタブのミュート状態を切り替える。"""
+        widget = self.tabs.widget(index)
+        if isinstance(widget, QWebEngineView):
+            current_mute_state = widget.page().isAudioMuted()
+            widget.page().setAudioMuted(not current_mute_state)
+            # TODO: アイコンなどでミュート状態を視覚的に示す
+            if not current_mute_state:
+                self.statusBar().showMessage(f"タブ '{self.tabs.tabText(index)}' をミュートしました。", 2000)
+            else:
+                self.statusBar().showMessage(f"タブ '{self.tabs.tabText(index)}' のミュートを解除しました。", 2000)
+
+    def eventFilter(self, obj, event):
+        """ユーザー入力を記録し、スリープ中であれば即座に復帰する。タブのプレビューもここで表示する。"""
+        if event.type() == QEvent.Type.ToolTip and obj is self.tabs.tabBar():
+            if self._show_tab_preview(event):
+                return True
+        if event.type() in USER_INPUT_EVENTS:
+            self._last_input_time = time.monotonic()
+            if self.is_sleeping:
+                self.wake_from_sleep()
+        return super().eventFilter(obj, event)
+
+    def _sleepable_views(self):
+        """スリープ時にフリーズさせるビュー(すべてのタブとウェブパネル)を返す。"""
+        views = [self.tabs.widget(i) for i in range(self.tabs.count())]
+        if self.web_panel is not None:
+            views.append(self.web_panel)
+        return [view for view in views if isinstance(view, QWebEngineView)]
+
+    def activate_sleep_mode(self):
+        """
+        一定時間操作がない場合に、ウィンドウ内のすべてのページをフリーズさせる。
+        ページを空白にせず凍結するだけなので、復帰時に再読み込みは発生しない。
+        """
+        if self.is_sleeping:
+            return
+        # タイマーの周期内に入力があった場合はまだスリープしない (次の周期で再判定する)
+        idle_ms = (time.monotonic() - self._last_input_time) * 1000
+        if idle_ms < self.sleep_timer.interval():
+            return
+
+        self.is_sleeping = True
+        self.sleep_timer.stop()
+        # 操作がない間はUIの停止を監視しても意味がないため、監視スレッドも止める
+        from .stall_monitor import stall_monitor
+        stall_monitor.pause()
+        # 自動スクロールなどのタイマーを止め、復帰時に再開するものを覚えておく
+        self._timers_paused_for_sleep = [timer for timer in (self.auto_scroll_timer, self.rain_timer) if timer.isActive()]
+        for timer in self._timers_paused_for_sleep:
+            timer.stop()
+
+        # 表示中のページはフリーズできないため、コンテンツ領域ごと隠してから凍結する
+        self.splitter.setVisible(False)
+        for view in self._sleepable_views():
+            view.page().setLifecycleState(QWebEnginePage.LifecycleState.Frozen)
+        self.statusBar().showMessage("スリープモード: 😴 Zzz... 何か操作をすると復帰します。")
+
+    def wake_from_sleep(self):
+        """スリープモードから復帰し、フリーズしたページと止めたタイマーを再開する。"""
+        if not self.is_sleeping:
+            return
+        self.is_sleeping = False
+        from .stall_monitor import stall_monitor
+        stall_monitor.resume()
+        for view in self._sleepable_views():
+            # 非表示のウェブパネルはフリーズしたままにし、表示されたときに再開する
+            if view is self.web_panel and not self.web_panel.isVisibleTo(self):
+                continue
+            view.page().setLifecycleState(QWebEnginePage.LifecycleState.Active)
+        self.splitter.setVisible(True)
+
+        for timer in self._timers_paused_for_sleep:
+            timer.start()
+        self._timers_paused_for_sleep = []
+        self.reset_sleep_timer()
+        self.webview_pool.schedule_refill()
+        self.statusBar().showMessage("スリープモードから復帰しました。", 2000)
+
+    def navigate_or_search(self):
+        text = self.url_bar.text()
+        if not text:
+            # ランダムサイトジャンプ機能
+            self.jump_to_random_site()
+            return
+            
+        if self.is_preaching_mode_active:
+            for blocked_site in self.settings['blocked_sites']:
+                if blocked_site in text:
+                    QMessageBox.warning(self, "集中ポーションが発動中！", "さぼっちゃダメ！作業に戻りましょう！")
+                    return
+        if text.startswith("about:"):
+            # about:home などのカスタムURLを処理
+            if text == "about:home":
+                self.add_new_tab(QUrl("about:home"))
+            else:
+                self.tabs.currentWidget().setUrl(QUrl(text))
+            return
+        if text.startswith("http") or "." in text:
+            qurl = QUrl(text)
+            if qurl.scheme() == "": qurl.setScheme("http")
+            self.tabs.currentWidget().setUrl(qurl)
+        else:
+            search_url = self.current_search_engine_url + text
+            self.tabs.currentWidget().setUrl(QUrl(search_url))
+    def update_search_engine(self, engine_name): 
+        # self.settings['search_engines'] に対応するURLがあることを確認
+        self.current_search_engine_url = self.settings['search_engines'].get(engine_name, self.settings['search_engines']["Google"])
+        # settings_dataにも現在の検索エンジンURLを保存
+        self.settings_data['current_search_engine_url'] = self.current_search_engine_url
+
+
+    def navigate_home(self):
+        """
+        ホームボタンを押した際に設定されているホームURLに遷移する。
+        """
+        self.tabs.currentWidget().setUrl(QUrl(self.settings['home_url']))
+
+    def update_url_bar(self, q, browser):
+        try:
+            if self.tabs.currentWidget() == browser: self.url_bar.setText(q.toString())
+        except RuntimeError:
+            # self.tabs or self.url_bar might be deleted during shutdown.
+            pass
+
+    def update_url_bar_on_tab_change(self, index):
+        current_browser = self.tabs.currentWidget()
+        if isinstance(current_browser, QWebEngineView):
+            self.url_bar.setText(current_browser.url().toString())
+        elif isinstance(current_browser, UnloadedTabPlaceholder):
+            self.url_bar.setText(current_browser.url.toString())
+
+    def update_progress_bar(self, progress, browser=None):
+        if browser is not None and self.tabs.currentWidget() is not browser:
+            return
+        if progress < 100:
+            self.progress_bar.setValue(progress)
+            self.progress_bar.setVisible(True)
+        else: self.progress_bar.setVisible(False)
+
+    def slider_volume_changed(self, volume):
+        """音量スライダーの値が変更されたときに呼び出される。"""
+        if volume > 0:
+            self.last_volume = volume
+        self._update_volume_ui(volume)
+        self._apply_volume_to_page(volume)
+
+    def _update_volume_ui(self, volume):
+        """音量に応じてミュートボタンのUI（アイコン、状態、ツールチップ）を更新する。"""
+        is_muted = (volume == 0)
+        
+        # setCheckedがtriggeredシグナルを再発行しないようにブロック
+        self.mute_button.blockSignals(True)
+        self.mute_button.setChecked(is_muted)
+        self.mute_button.blockSignals(False)
+
+        if is_muted:
+            icon_name = 'fa5s.volume-mute'
+        elif volume > 66:
+            icon_name = 'fa5s.volume-up'
+        elif volume > 33:
+            icon_name = 'fa5s.volume-down'
+        else:
+            icon_name = 'fa5s.volume-off'
+        # スライダーを動かすたびにアイコンを差し替えないよう、変わったときだけ更新する
+        icon_key = (icon_name, icon_cache.theme)
+        if icon_key == self._mute_icon_key:
+            return
+        self._mute_icon_key = icon_key
+
+        self.mute_button.setToolTip("ミュート解除" if is_muted else "ミュート")
+        if qta:
+            self.mute_button.setIcon(icon_cache.get(icon_name, size=self._toolbar_icon_size()))
+            self.mute_button.setText("")
+        else:
+            self.mute_button.setIcon(QIcon())
+            self.mute_button.setText("🔇" if is_muted else "🔊")
+
+    def _apply_volume_to_page(self, volume):
+        """指定された音量を現在のウェブページに適用する。"""
+        current_browser = self.tabs.currentWidget()
+        if isinstance(current_browser, QWebEngineView):
+            # ページ全体のミュート状態と、個々のメディア要素の音量を設定
+            current_browser.page().setAudioMuted(volume == 0)
+            volume_float = float(volume) / 100.0
+            js_code = f"document.querySelectorAll('video, audio').forEach(media => {{ media.volume = {volume_float}; }});"
+            current_browser.page().runJavaScript(js_code)
+        self.statusBar().showMessage(f"音量: {volume}%", 2000)
+
+    def toggle_mute(self, checked):
+        """ミュートボタンがクリックされたときの処理。"""
+        if checked: # ミュートにする
+            if self.volume_slider.value() != 0:
+                self.last_volume = self.volume_slider.value()
+            self.volume_slider.setValue(0)
+        else: # ミュートを解除する
+            self.volume_slider.setValue(self.last_volume)
+
+    def zoom_in(self): self.tabs.currentWidget().setZoomFactor(self.tabs.currentWidget().zoomFactor() + 0.1)
+    def zoom_out(self): self.tabs.currentWidget().setZoomFactor(self.tabs.currentWidget().zoomFactor() - 0.1)
+    def reset_zoom(self): self.tabs.currentWidget().setZoomFactor(1.0)
+    def toggle_fullscreen(self):
+        if self.isFullScreen():
+            # HTMLフルスクリーンモードであれば、それを終了させる
+            if self.is_html_fullscreen:
+                self._exit_html_fullscreen(request=None)
+            else: # 通常のフルスクリーンモードであれば、それを終了させる
+                self.showNormal()
+        else: # 通常のフルスクリーンに移行
+            self.showFullScreen()
+    def toggle_tracing(self, checked):
+        """ホットパスのトレースを開始・停止する。開始時はそれまでの記録を消す。"""
+        if checked:
+            tracer.clear()
+        tracer.set_enabled(checked)
+        self.statusBar().showMessage("トレースを開始しました。" if checked else "トレースを停止しました。", 3000)
+
+    def save_trace(self):
+        """記録したトレースをChromeのtrace event形式で保存する。"""
+        path, _ = QFileDialog.getSaveFileName(self, "トレースを保存", profile_path(TRACE_FILE), "Trace Event JSON (*.json)")
+        if not path:
+            return
+        count = dump_trace(path)
+        if count is None:
+            QMessageBox.warning(self, "トレースを保存", "トレースの保存に失敗しました。")
+            return
+        self.statusBar().showMessage(f"{count} 件のスパンを '{path}' に保存しました。chrome://tracing などで開けます。", 5000)
+
+    def show_stall_report(self):
+        """UIスレッドが停止した場所を、合計時間の多い順に表示する。"""
+        from .stall_monitor import StallReportDialog, stall_monitor
+        StallReportDialog(stall_monitor, self).exec()
+
+    def start_performance_capture(self):
+        """指定した秒数の間、UIスレッドのプロファイルとメモリ割り当ての差分を記録する。"""
+        from .perf_capture import CaptureOptionsDialog, PerformanceCapture
+        if self.performance_capture is not None and self.performance_capture.is_running():
+            QMessageBox.information(self, "パフォーマンスキャプチャ", "キャプチャはすでに実行中です。")
+            return
+        dialog = CaptureOptionsDialog(self)
+        if not dialog.exec():
+            return
+        seconds, sample_threads, trace_memory = dialog.get_options()
+        if self.performance_capture is None:
+            self.performance_capture = PerformanceCapture(self)
+            self.performance_capture.finished.connect(self._on_performance_capture_finished)
+            self.performance_capture.failed.connect(
+                lambda message: QMessageBox.warning(self, "パフォーマンスキャプチャ", message))
+        if self.performance_capture.start(seconds, sample_threads, trace_memory):
+            self.statusBar().showMessage(f"パフォーマンスを記録しています ({seconds} 秒)...", seconds * 1000)
+
+    def _on_performance_capture_finished(self, paths):
+        files = "\n".join(os.path.abspath(path) for path in paths)
+        QMessageBox.information(self, "パフォーマンスキャプチャ",
+                                f"キャプチャを保存しました。\n\n{files}\n\n"
+                                ".prof ファイルは snakeviz や python -m pstats で開けます。不具合の報告に添付してください。")
+
+    def open_dev_tools(self):
+        """現在のタブの開発者ツールをタブの横に開く。すでに開いていれば閉じる。"""
+        if self.devtools_view is not None:
+            self.close_dev_tools()
+            return
+        if not isinstance(self.tabs.currentWidget(), QWebEngineView):
+            self.statusBar().showMessage("このタブでは開発者ツールを開けません。", 3000)
+            return
+        # タブの横 (ウェブパネルより前) に置き、タブの幅の4割を割り当てる
+        sizes = self.splitter.sizes()
+        self.devtools_view = QWebEngineView()
+        self.devtools_view.setObjectName("devtools_view")
+        self.devtools_view.setPage(QWebEnginePage(self._get_web_profile(), self.devtools_view))
+        self.splitter.insertWidget(1, self.devtools_view)
+        devtools_width = sizes[0] * 2 // 5
+        self.splitter.setSizes([sizes[0] - devtools_width, devtools_width] + sizes[1:])
+        self._retarget_dev_tools()
+
+    def _retarget_dev_tools(self):
+        """開いている開発者ツールの調査対象を現在のタブに切り替える。レンダラーは作り直さない。"""
+        if self.devtools_view is None:
+            return
+        browser = self.tabs.currentWidget()
+        page = browser.page() if isinstance(browser, QWebEngineView) else None
+        if self.devtools_view.page().inspectedPage() is not page:
+            self.devtools_view.page().setInspectedPage(page)
+
+    def close_dev_tools(self):
+        """開発者ツールを閉じて破棄し、レンダラーを解放する。"""
+        if self.devtools_view is None:
+            return
+        self.devtools_view.page().setInspectedPage(None)
+        self.devtools_view.setParent(None)
+        self.devtools_view.deleteLater()
+        self.devtools_view = None
+    def save_page_as_pdf(self):
+        current_browser = self.tabs.currentWidget()
+        if not current_browser: return
+        file_path, _ = QFileDialog.getSaveFileName(self, "PDFとして保存", "", "PDF Files (*.pdf)")
+        if file_path:
+            if not file_path.endswith(".pdf"): file_path += ".pdf"
+            current_browser.page().printToPdf(file_path)
+            self.statusBar().showMessage(f"ページをPDFで保存しました: {file_path}", 5000)
+    def take_screenshot(self):
+        current_browser = self.tabs.currentWidget()
+        if not current_browser: return
+        image = QImage(current_browser.size(), QImage.Format.Format_ARGB32_Premultiplied)
+        painter = QPainter(image)
+        current_browser.render(painter)
+        painter.end()
+        file_path, _ = QFileDialog.getSaveFileName(self, "スクリーンショットを保存", "", "Images (*.png *.jpg)")
+        if file_path:
+            image.save(file_path)
+            self.statusBar().showMessage(f"スクリーンショットを保存しました: {file_path}", 5000)
+    def find_in_page(self):
+        current_browser = self.tabs.currentWidget()
+        if not current_browser: return
+        text, ok = QInputDialog.getText(self, "ページ内検索", "検索するキーワードを入力してください:")
+        if ok and text:
+            current_browser.findText(text)
+            self.statusBar().showMessage(f"ページ内で '{text}' を検索中...", 3000)
+    def generate_qr_code(self):
+        from .features import qr_code
+        qr_code.generate_qr_code(self)
+    def translate_page(self):
+        from .features import translate
+        translate.translate_page(self)
+    def create_tab_group(self):
+        """現在のすべてのタブ(未読み込みのタブを含む)をグループとして保存する。"""
+        tab_widgets = [self.tabs.widget(i) for i in range(self.tabs.count())]
+        tabs_to_group = [{'url': get_tab_url(widget), 'title': self.tabs.tabText(i)}
+                         for i, widget in enumerate(tab_widgets) if get_tab_url(widget)]
+        if not tabs_to_group: return
+        group_name, ok = QInputDialog.getText(self, "タブグループを作成", "グループ名を入力してください:")
+        if ok and group_name:
+            while f"group_{self.tab_group_counter}" in self.tab_groups:
+                self.tab_group_counter += 1
+            group_id = f"group_{self.tab_group_counter}"
+            self.tab_groups[group_id] = {'name': group_name, 'tabs': tabs_to_group}
+            self.tab_group_counter += 1
+            for widget in tab_widgets:
+                widget.tab_group_id = group_id
+            self.statusBar().showMessage(f"タブグループ '{group_name}' が作成されました。", 3000)
+            self.update_tab_groups_menu()
+            self.save_settings()
+
+    def update_tab_groups_menu(self):
+        if not hasattr(self, 'tab_group_menu'): return
+        for action in self.tab_group_menu.actions():
+            if action is not self.create_group_action:
+                self.tab_group_menu.removeAction(action)
+        if self.tab_groups:
+            self.tab_group_menu.addSeparator()
+            for group_id, group_info in self.tab_groups.items():
+                group_menu = self.tab_group_menu.addMenu(group_info['name'])
+                open_action = QAction("開く", self)
+                open_action.triggered.connect(lambda checked, gid=group_id: self.open_tab_group(gid))
+                group_menu.addAction(open_action)
+                collapse_action = QAction("折りたたむ (メモリを解放)", self)
+                collapse_action.triggered.connect(lambda checked, gid=group_id: self.collapse_tab_group(gid))
+                group_menu.addAction(collapse_action)
+                delete_action = QAction("グループを削除", self)
+                delete_action.triggered.connect(lambda checked, gid=group_id: self.delete_tab_group(gid))
+                group_menu.addAction(delete_action)
+
+    def _tab_group_indices(self, group_id):
+        return [i for i in range(self.tabs.count()) if getattr(self.tabs.widget(i), 'tab_group_id', None) == group_id]
+
+    def open_tab_group(self, group_id):
+        """
+        タブグループを開く。タブは未読み込みのプレースホルダーとして追加し、
+        最初のタブだけをアクティブにして、残りは同時読み込み数を制限して先読みする。
+        """
+        if group_id not in self.tab_groups:
+            return
+        indices = self._tab_group_indices(group_id)
+        if indices:
+            # 既に開いているグループは、折りたたまれたタブを読み込み直すだけにする
+            placeholders = [self.tabs.widget(i) for i in indices]
+        else:
+            placeholders = []
+            for tab in self.tab_groups[group_id]['tabs']:
+                # 旧形式 (URLの文字列のみ) にも対応する
+                url, title = (tab, "") if isinstance(tab, str) else (tab['url'], tab.get('title', ""))
+                placeholder = self.add_unloaded_tab(url, title or "読み込み待機中...")
+                placeholder.tab_group_id = group_id
+                placeholders.append(placeholder)
+            if placeholders:
+                self.tabs.setCurrentWidget(placeholders[0])
+        self.tab_preloader.enqueue(p for p in placeholders if isinstance(p, UnloadedTabPlaceholder))
+        self.statusBar().showMessage(f"タブグループ '{self.tab_groups[group_id]['name']}' が開かれました。", 3000)
+
+    def collapse_tab_group(self, group_id):
+        """タブグループのタブを未読み込みの状態に戻してメモリを解放する。表示中のタブは残す。"""
+        discarded = sum(1 for i in self._tab_group_indices(group_id) if self.discard_tab(i))
+        self.statusBar().showMessage(f"タブグループ '{self.tab_groups[group_id]['name']}' を折りたたみました ({discarded}タブ)。", 3000)
+
+    def delete_tab_group(self, group_id):
+        """タブグループを削除する。開いているタブはそのまま残す。"""
+        group_info = self.tab_groups.pop(group_id, None)
+        if group_info is None:
+            return
+        for i in self._tab_group_indices(group_id):
+            self.tabs.widget(i).tab_group_id = None
+        self.update_tab_groups_menu()
+        self.save_settings()
+        self.statusBar().showMessage(f"タブグループ '{group_info['name']}' を削除しました。", 3000)
+
+    def show_quick_open(self):
+        """全ウィンドウのタブを検索して切り替えるパレットを表示する。"""
+        QuickOpenDialog(tab_search_index, self).exec()
+
+    def show_notes_dialog(self):
+        from .features import notes
+        notes.show_notes_dialog(self)
+
+    def update_sleep_timer_status(self):
+        """設定に基づいてスリープタイマーを開始または停止する。"""
+        if self.is_private_window:
+            return
+
+        # タイマーの間隔も設定から更新
+        self.sleep_timer.setInterval(self.settings.get('sleep_mode_interval', 300000))
+
+        if self.settings.get('sleep_mode_enabled', True):
+            if not self.sleep_timer.isActive():
+                self.sleep_timer.start()
+                self.statusBar().showMessage("自動スリープモードが有効になりました。", 2000)
+        elif self.sleep_timer.isActive():
+            self.sleep_timer.stop()
+            self.statusBar().showMessage("自動スリープモードが無効になりました。", 2000)
+    def show_settings_dialog(self):
+        """設定ダイアログを開き、設定を更新する。"""
+        from .dialogs import SettingsDialog
+        # 現在の設定とバージョン情報を渡す
+        settings_dialog = SettingsDialog(self, self.settings_data, browser_version=self.browser_version) 
+        if settings_dialog.exec():
+            # OKが押された場合に設定を適用
+            new_settings = settings_dialog.get_settings()
+            
+            # self.settings_data を更新
+            self.settings_data.update(new_settings)
+            
+            # self.settings も self.settings_data から更新
+            self.settings = self.settings_data.copy()
+
+            # 検索エンジンを更新
+            self.current_search_engine_url = self.settings_data['current_search_engine_url']
+            self.search_engine_combo.setCurrentText(self.settings_data['search_engine_name']) # コンボボックスの表示も更新
+
+            # お気に入りツールバーとブックマークメニューを更新
+            self.bookmarks = self.settings['favorite_sites']
+            self.update_bookmarks_menu()
+            self.update_favorite_sites_toolbar()
+            
+            # 広告ブロッカーの設定を更新
+            self.setup_adblocker()
+
+            # スリープタイマーの状態を更新
+            self.update_sleep_timer_status()
+            
+            # UIをリセットして、背景画像やカスタムCSSの変更を即時反映
+            self.reset_ui_to_defaults()
+            
+            self.save_settings() # 変更をファイルに保存
+            self.statusBar().showMessage("設定が保存されました！", 3000)
+
+    def reset_ui_to_defaults(self, silent=False):
+        """
+        UIの見た目を設定に基づいたデフォルト状態（システムテーマ、背景画像など）にリセットする。
+        """
+        # システムテーマに基づいてパレットとQSSを再適用
+        current_theme = get_system_theme_mode()
+        self.update_palette(current_theme)
+        
+        # カスタムCSSを現在開いているすべてのタブに再適用
+        custom_css = self.settings.get('custom_css', '')
+        # 既存のカスタムスタイルを削除し、新しいものを挿入するJavaScript
+        js_code = f"""
+            var styleElement = document.getElementById('project-nowb-custom-css');
+            if (styleElement) {{
+                styleElement.remove();
+            }}
+            var style = document.createElement('style');
+            style.id = 'project-nowb-custom-css';
+            style.innerHTML = `{custom_css}`;
+            document.head.appendChild(style);
+        """
+        for i in range(self.tabs.count()):
+            widget = self.tabs.widget(i)
+            if isinstance(widget, QWebEngineView):
+                widget.page().runJavaScript(js_code)
+
+        if not silent:
+            self.statusBar().showMessage("UIをデフォルト設定にリセットしました。", 3000)
+
+    def update_bookmarks_menu(self):
+        """ブックマークメニューを次に表示するときに作り直すよう印を付ける。"""
+        self._bookmarks_menu_dirty = True
+
+    def _rebuild_bookmarks_menu(self):
+        if not self._bookmarks_menu_dirty:
+            return
+        self._bookmarks_menu_dirty = False
+        self.bookmarks_menu.clear()
+        if self.is_private_window:
+            return
+        for name, url in self.bookmarks.items():
+            action = QAction(name, self)
+            action.triggered.connect(lambda checked, u=url, n=name: self.add_new_tab(QUrl(u), n))
+            self.bookmarks_menu.addAction(action)
+        self.bookmarks_menu.addSeparator()
+        # メニューを作り直すたびに作成するため、メニューを親にしてclearで削除されるようにする
+        add_bookmark_action = QAction(icon_cache.get('fa5s.plus-circle'), "現在のページをブックマーク", self.bookmarks_menu)
+        add_bookmark_action.triggered.connect(self.add_current_page_as_bookmark)
+        self.bookmarks_menu.addAction(add_bookmark_action)
+    def add_current_page_as_bookmark(self):
+        if self.is_private_window:
+            return
+        current_browser = self.tabs.currentWidget()
+        url = current_browser.url().toString()
+        title = current_browser.title() if current_browser.title() else url
+        new_title, ok = QInputDialog.getText(self, 'ブックマークを追加', 'ブックマーク名:', text=title)
+        if ok and new_title:
+            self.bookmarks[new_title] = url
+            # settings_data にも反映
+            self.settings_data['favorite_sites'][new_title] = url
+            self.update_bookmarks_menu()
+            self.update_favorite_sites_toolbar() # ツールバーも更新
+            self.save_settings() # 保存
+            print(f"ブックマークに追加: {new_title} ({url})")
+            
+    def set_favicon_on_action(self, url, icon):
+        """ファビコン取得後にツールバーのアクションにアイコンを設定するスロット。"""
+        if not icon.isNull():
+            for action in self.favorites_toolbar.actions():
+                if action.property("url") == url:
+                    action.setIcon(icon)
+                    break
+
+    def update_favorite_sites_toolbar(self):
+        self.favorites_toolbar.clear()
+        for name, url in self.settings['favorite_sites'].items():
+            action = QAction(name, self)
+            action.triggered.connect(lambda checked, u=url, n=name: self.add_new_tab(QUrl(u), n))
+            action.setProperty("url", url) # アクションにURLを紐付け
+
+            # プレースホルダーとして空のアイコンを設定
+            action.setIcon(QIcon())
+            self.favorites_toolbar.addAction(action)
+
+            # バックグラウンドでファビコンを取得
+            fetcher = FaviconFetcher(url)
+            fetcher.signals.favicon_ready.connect(self.set_favicon_on_action)
+            self.threadpool.start(fetcher)
+
+    def handle_download(self, download_request):
+        manager = self._get_download_manager()
+        manager.add_download(download_request)
+
+    @traced()
+    def add_to_history(self, qurl):
+        if self.is_private_window:
+            return
+        try:
+            url_str = qurl.toString()
+            if url_str == "about:blank":
+                return
+            if self.history and self.history[-1]["url"] == url_str:
+                return
+
+            current_widget = self.tabs.currentWidget()
+            title = current_widget.title() if isinstance(current_widget, QWebEngineView) and current_widget.title() else url_str
+            
+            entry = {
+                "title": title,
+                "url": url_str,
+                "timestamp": datetime.datetime.now().isoformat()
+            }
+            self.history.append(entry)
+            if len(self.history) > 200: self.history.pop(0)
+            self.update_history_menu()
+        except RuntimeError:
+            # self.tabs might be deleted during shutdown.
+            pass
+
+    def update_history_menu(self):
+        """履歴メニューを次に表示するときに作り直すよう印を付ける。ページを移動するたびに作り直さない。"""
+        self._history_menu_dirty = True
+
+    @traced()
+    def _rebuild_history_menu(self):
+        if self.is_private_window or not self._history_menu_dirty:
+            return
+        self._history_menu_dirty = False
+        self.history_menu.clear()
+        # 履歴はタイムスタンプの降順で表示
+        for entry in sorted(self.history, key=lambda x: x.get('timestamp', ''), reverse=True):
+            title = entry.get('title', 'No Title')
+            url = entry.get('url', '')
+            action = QAction(title, self)
+            action.setToolTip(url)
+            action.triggered.connect(lambda checked, u=url, t=title: self.add_new_tab(QUrl(u), t))
+            self.history_menu.addAction(action)
+        self.history_menu.addSeparator()
+        clear_history_action = QAction(icon_cache.get('fa5s.trash-alt'), "履歴をクリア", self.history_menu)
+        clear_history_action.triggered.connect(self.clear_history)
+        self.history_menu.addAction(clear_history_action)
+
+    def clear_history(self):
+        if self.is_private_window:
+            return
+        reply = QMessageBox.question(self, "履歴のクリア", "本当にすべての履歴を削除しますか？",
+                                     QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No,
+                                     QMessageBox.StandardButton.No)
+        if reply == QMessageBox.StandardButton.Yes:
+            self.history = []
+            self.update_history_menu()
+            self.save_history()
+            self.statusBar().showMessage("履歴をクリアしました。", 2000)
+    def toggle_preaching_mode(self, checked):
+        self.is_preaching_mode_active = checked
+        if checked:
+            duration, ok = QInputDialog.getInt(self, "集中ポーション", "何分間集中しますか？", value=30, min=1, max=120)
+            if ok:
+                self.blocked_timer.start(duration * 60 * 1000)
+                QMessageBox.information(self, "集中ポーション", f"{duration}分間、集中モードがONになりました。さぼっちゃダメですよ！")
+            else: self.is_preaching_mode_active = False
+        else:
+            self.blocked_timer.stop()
+            QMessageBox.information(self, "集中ポーション", "ポーションの効果が切れました。さぼっても大丈夫です...")
+    def unblock_sites(self):
+        self.is_preaching_mode_active = False
+        self.statusBar().showMessage("集中ポーションの効果が切れました！", 5000)
+    def activate_timemachine(self):
+        from .features import time_travel
+        time_travel.activate_timemachine(self)
+    def show_philosophy_on_new_tab(self):
+        philosophies = [
+            "インターネットの向こう側には何があるのだろうか？", "今見ている画面は誰かの夢なのだろうか？",
+            "「検索」は私たちを賢くするのか、それとも依存させるだけなのか？",
+            "クリックする前と後で、自分は本当に同じなのだろうか？",
+            "もしAIに意識があったら、どんなウェブサイトを夢見るだろうか？",
+            "エラーメッセージは宇宙からの手紙なのだろうか？",
+        ]
+        self.statusBar().showMessage(f"今日の哲学: '{random.choice(philosophies)}'", 7000)
+    def toggle_time_travel_mode(self):
+        from .features import time_travel
+        time_travel.toggle_time_travel_mode(self)
+    
+    def start_ai_chat(self):
+        from .features import ai_assistant
+        ai_assistant.start_ai_chat(self)
+    
+    def toggle_nostalgia_filter(self, checked):
+        from .features import page_filters
+        page_filters.toggle_nostalgia_filter(self, checked)
+    def toggle_cyberpunk_mode(self, checked):
+        from .features import page_filters
+        page_filters.toggle_cyberpunk_mode(self, checked)
+    def set_easter_eggs(self):
+        mod_key = "Ctrl" if platform.system() != "Darwin" else "Cmd"
+        theme_action = QAction("テーマを変更", self); theme_action.setShortcut(QKeySequence(f"{mod_key}+Alt+T")); theme_action.triggered.connect(self.change_theme); self.addAction(theme_action)
+        proverb_action = QAction("隠された哲学", self); proverb_action.setShortcut(QKeySequence(f"{mod_key}+Shift+S")); proverb_action.triggered.connect(self.show_proverb); self.addAction(proverb_action)
+    def change_theme(self):
+        from .features import easter_eggs
+        easter_eggs.change_theme(self)
+    def show_proverb(self):
+        from .features import easter_eggs
+        easter_eggs.show_proverb(self)
+    
+    def start_auto_scroll(self):
+        """自動スクロールを開始する。"""
+        if not self.auto_scroll_timer.isActive():
+            self.auto_scroll_timer.start()
+            self.statusBar().showMessage(f"自動スクロールを開始しました。速度: {self.scroll_speed}px/tick", 3000)
+
+    def stop_auto_scroll(self):
+        """自動スクロールを停止する。"""
+        if self.auto_scroll_timer.isActive():
+            self.auto_scroll_timer.stop()
+            self.statusBar().showMessage("自動スクロールを停止しました。", 3000)
+
+    def set_scroll_speed(self):
+        """スクロール速度を設定するダイアログを表示する。"""
+        speed, ok = QInputDialog.getInt(self, "スクロール速度の設定", "スクロール速度を入力してください (1-50):",
+                                        value=self.scroll_speed, min=1, max=50)
+        if ok:
+            self.scroll_speed = speed
+            self.statusBar().showMessage(f"スクロール速度を {self.scroll_speed}px/tick に設定しました。", 3000)
+
+    def perform_auto_scroll(self):
+        """ウェブページを自動的にスクロールする。"""
+        current_browser = self.tabs.currentWidget()
+        if current_browser:
+            # JavaScriptを使ってスクロールを実行
+            current_browser.page().runJavaScript(f"window.scrollBy(0, {self.scroll_speed});")
+
+    # --- 新機能の実装 ---
+    def summarize_page(self):
+        """AIページ要約機能"""
+        from .features import summary
+        summary.summarize_page(self)
+
+    def analyze_website_mood(self):
+        """ウェブサイトのムード分析機能"""
+        from .features import mood
+        mood.analyze_website_mood(self)
+
+    def toggle_retro_pixel_mode(self, checked):
+        """ウェブページ上の画像をピクセル化する。"""
+        from .features import retro_pixel
+        retro_pixel.toggle_retro_pixel_mode(self, checked)
+    
+    def apply_retro_pixel_filter(self, browser):
+        """Applies the retro pixel filter to a given browser instance's page when it finishes loading."""
+        from .features import retro_pixel
+        retro_pixel.apply_retro_pixel_filter(self, browser)
+    
+    def activate_cleaning_robot(self):
+        """画面にお掃除ロボットを表示する。"""
+        from .features import cleaning_robot
+        cleaning_robot.activate_cleaning_robot(self)
+
+    def jump_to_random_site(self):
+        """履歴からランダムなサイトにジャンプする。"""
+        from .features import easter_eggs
+        easter_eggs.jump_to_random_site(self)
+
+    def analyze_sentiment(self):
+        """ページの感情を分析する (シンプル版)。"""
+        from .features import sentiment
+        sentiment.analyze_sentiment(self)
+
+    def toggle_rain_sound_mode(self, checked):
+        """
+        バーチャル雨音モードをON/OFFする。
+        """
+        if checked:
+            self.is_rain_mode_active = True
+            self.statusBar().showMessage("バーチャル雨音モードON。作業に集中してください。", 3000)
+        else:
+            self.is_rain_mode_active = False
+            self.statusBar().showMessage("バーチャル雨音モードOFF。", 3000)
+            
+    def start_mission_mode(self):
+        """ランダムなミッションを提示する。"""
+        from .features import mission
+        mission.start_mission_mode(self)
@@ -0,0 +1,214 @@
+"""バックグラウンドで動くワーカー (ファビコン取得、サムネイル生成) とサムネイルキャッシュ。"""
+import sys
+import os
+import base64
+import hashlib
+from functools import partial
+from collections import OrderedDict
+from urllib.parse import urlparse
+from PyQt6.QtCore import (Qt, pyqtSignal, QObject, QStandardPaths, QRunnable, QThreadPool, QTimer, QByteArray, QBuffer,
+                          QIODevice)
+from PyQt6.QtGui import QImage, QPixmap, QIcon
+
+from .config import (THUMBNAIL_DISK_MAX_FILES, THUMBNAIL_FLUSH_INTERVAL_MS, THUMBNAIL_JPEG_QUALITY,
+                     THUMBNAIL_MEMORY_LIMIT, THUMBNAIL_SIZE, get_profile_dir)
+from .tracing import traced
+
+class WorkerSignals(QObject):
+    """
+    バックグラウンドワーカーからのシグナルを定義するクラス。
+    QRunnableはQObjectを継承しないため、シグナルを直接持てない。
+    """
+    favicon_ready = pyqtSignal(str, QIcon) # url, icon
+    thumbnail_ready = pyqtSignal(str, QImage, bytes) # url, thumbnail, JPEGに圧縮したthumbnail
+
+class FaviconFetcher(QRunnable):
+    """
+    バックグラウンドでファビコンを取得するためのワーカークラス。
+    """
+    def __init__(self, url):
+        super().__init__()
+        self.url = url
+        self.signals = WorkerSignals()
+
+    @traced()
+    def run(self):
+        import requests
+        from io import BytesIO
+        from PIL import Image
+        from PIL.ImageQt import ImageQt
+
+        icon = QIcon()
+        try:
+            domain = urlparse(self.url).netloc
+            favicon_url = f"https://www.google.com/s2/favicons?domain={domain}&sz=32"
+            response = requests.get(favicon_url, timeout=2)
+            if response.status_code == 200:
+                img_data = BytesIO(response.content)
+                resample_filter = getattr(Image, 'Resampling', Image).LANCZOS
+                img = Image.open(img_data).resize((16, 16), resample_filter)
+                icon = QIcon(QPixmap.fromImage(ImageQt(img.convert("RGBA"))))
+        except Exception:
+            pass # ファビコン取得失敗は無視
+        self.signals.favicon_ready.emit(self.url, icon)
+
+class ThumbnailWorker(QRunnable):
+    """
+    タブのキャプチャ画像をバックグラウンドでサムネイルに縮小し、JPEGに圧縮するワーカー。
+    QPixmapはUIスレッド専用のため、QImageだけを扱う。
+    """
+    def __init__(self, url, image):
+        super().__init__()
+        self.url = url
+        self.image = image
+        self.signals = WorkerSignals()
+
+    def run(self):
+        thumbnail = self.image.scaled(THUMBNAIL_SIZE, Qt.AspectRatioMode.KeepAspectRatio,
+                                      Qt.TransformationMode.SmoothTransformation)
+        self.signals.thumbnail_ready.emit(self.url, thumbnail, encode_jpeg(thumbnail))
+
+def encode_jpeg(image):
+    """QImageをJPEGに圧縮したバイト列を返す。"""
+    data = QByteArray()
+    buffer = QBuffer(data)
+    buffer.open(QIODevice.OpenModeFlag.WriteOnly)
+    image.save(buffer, "JPEG", THUMBNAIL_JPEG_QUALITY)
+    return bytes(data)
+
+def get_thumbnail_cache_dir():
+    """サムネイルのディスクキャッシュを保存するディレクトリを返す。"""
+    if get_profile_dir():
+        return os.path.join(get_profile_dir(), "thumbnails")
+    base_dir = QStandardPaths.writableLocation(QStandardPaths.StandardLocation.CacheLocation) or "."
+    return os.path.join(base_dir, "thumbnails")
+
+class ThumbnailCache(QObject):
+    """
+    タブのサムネイルを保持するサイズ上限付きのLRUキャッシュ。
+    縮小とJPEGへの圧縮はワーカースレッドで行い、圧縮したデータも一緒に保持する。
+    新しいサムネイルはLRUから追い出されたとき、THUMBNAIL_FLUSH_INTERVAL_MSごと、ウィンドウを閉じるときに
+    まとめてディスクに書き出す。タブを破棄したりブラウザを再起動したりしても、
+    フルサイズの画像を持たずにサムネイルを再利用できる。
+    """
+    thumbnail_updated = pyqtSignal(str) # url
+
+    def __init__(self, cache_dir=None, max_bytes=THUMBNAIL_MEMORY_LIMIT, parent=None):
+        super().__init__(parent)
+        self.cache_dir = cache_dir # Noneの場合はメモリのみ
+        self.max_bytes = max_bytes
+        self._images = OrderedDict() # url -> QImage (末尾ほど最近使われたもの)
+        self._encoded = {} # url -> JPEGに圧縮したサムネイル (ツールチップとディスクへの書き出しに使う)
+        self._unsaved = set() # メモリにだけあり、まだディスクに書き出していないサムネイルのURL
+        self._bytes = 0
+        # ディスクへの書き込みは順序を保つため専用の1スレッドで行う
+        self._disk_pool = QThreadPool(self)
+        self._disk_pool.setMaxThreadCount(1)
+        # 異常終了してもサムネイルを失いすぎないよう、新しいものは一定時間ごとにまとめて書き出す
+        self._flush_timer = QTimer(self)
+        self._flush_timer.setSingleShot(True)
+        self._flush_timer.setInterval(THUMBNAIL_FLUSH_INTERVAL_MS)
+        self._flush_timer.timeout.connect(self.flush)
+        if self.cache_dir:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            self._disk_pool.start(self.prune_disk_cache)
+
+    def path_for(self, url):
+        """URLに対応するディスク上のサムネイルのパスを返す。"""
+        if not self.cache_dir:
+            return None
+        return os.path.join(self.cache_dir, hashlib.sha1(url.encode('utf-8')).hexdigest() + ".jpg")
+
+    def capture(self, url, widget):
+        """ウィジェットの表示内容をキャプチャし、バックグラウンドでサムネイルを作成する。"""
+        if not url or url == "about:blank":
+            return
+        image = widget.grab().toImage()
+        if image.isNull():
+            return
+        worker = ThumbnailWorker(url, image)
+        worker.signals.thumbnail_ready.connect(self._store)
+        QThreadPool.globalInstance().start(worker)
+
+    def get(self, url):
+        """サムネイルを返す。メモリになければディスクキャッシュから読み込む。"""
+        image = self._images.get(url)
+        if image is not None:
+            self._images.move_to_end(url)
+            return image
+        path = self.path_for(url)
+        if path and os.path.exists(path):
+            try:
+                with open(path, 'rb') as f:
+                    data = f.read()
+            except OSError:
+                return None
+            image = QImage.fromData(data, "JPEG")
+            if not image.isNull():
+                self._put(url, image, data)
+                return image
+        return None
+
+    def data_url(self, url):
+        """サムネイルをツールチップなどのリッチテキストに埋め込めるdata URLで返す。なければNone。"""
+        if self.get(url) is None:
+            return None
+        # 圧縮はサムネイルを作成したときに済ませてあるので、ここではbase64に変換するだけ
+        return "data:image/jpeg;base64," + base64.b64encode(self._encoded[url]).decode('ascii')
+
+    def _store(self, url, image, jpeg):
+        self._put(url, image, jpeg)
+        self._unsaved.add(url)
+        if self.cache_dir and not self._flush_timer.isActive():
+            self._flush_timer.start()
+        self.thumbnail_updated.emit(url)
+
+    def _put(self, url, image, jpeg):
+        old_image = self._images.pop(url, None)
+        if old_image is not None:
+            self._bytes -= old_image.sizeInBytes() + len(self._encoded.pop(url))
+        self._images[url] = image
+        self._encoded[url] = jpeg
+        self._bytes += image.sizeInBytes() + len(jpeg)
+        # 上限を超えたら古いものから追い出し、まだ保存していなければディスクに書き出す
+        evicted = []
+        while self._bytes > self.max_bytes and len(self._images) > 1:
+            evicted_url, evicted_image = self._images.popitem(last=False)
+            evicted_jpeg = self._encoded.pop(evicted_url)
+            self._bytes -= evicted_image.sizeInBytes() + len(evicted_jpeg)
+            if evicted_url in self._unsaved:
+                self._unsaved.discard(evicted_url)
+                evicted.append((evicted_url, evicted_jpeg))
+        self._spill(evicted)
+
+    def flush(self, wait=False):
+        """メモリにだけあるサムネイルをすべてディスクに書き出す。waitがTrueなら書き込みの完了を待つ。"""
+        self._flush_timer.stop()
+        self._spill([(url, self._encoded[url]) for url in self._unsaved if url in self._encoded])
+        self._unsaved.clear()
+        if wait:
+            self._disk_pool.waitForDone()
+
+    def _spill(self, items):
+        """(URL, 圧縮済みのサムネイル) のリストを専用スレッドでディスクに書き出す。"""
+        if not items or not self.cache_dir:
+            return
+        self._disk_pool.start(partial(self._write_to_disk, [(self.path_for(url), jpeg) for url, jpeg in items]))
+
+    def _write_to_disk(self, items):
+        for path, jpeg in items:
+            try:
+                with open(path, 'wb') as f:
+                    f.write(jpeg)
+            except OSError as e:
+                print(f"サムネイルの保存に失敗しました: {path}: {e}", file=sys.stderr)
+
+    def prune_disk_cache(self):
+        """ディスクキャッシュのうち、古いサムネイルを削除する。ワーカースレッドで実行する。"""
+        try:
+            paths = [os.path.join(self.cache_dir, name) for name in os.listdir(self.cache_dir)]
+            paths.sort(key=os.path.getmtime, reverse=True)
+            for path in paths[THUMBNAIL_DISK_MAX_FILES:]:
+                os.remove(path)
+        except OSError as e:
+            print(f"サムネイルキャッシュの整理に失敗しました: {e}", file=sys.stderr)
@@ -0,0 +1,48 @@
+"""nowb.cli のテスト。"""
+import os
+
+import pytest
+
+pytest.importorskip("PyQt6.QtCore")
+
+from nowb.cli import parse_args, resolve_urls
+
+
+def test_parse_args_passes_unknown_options_to_qt():
+    args, qt_argv = parse_args(["nowb", "--private", "-style", "fusion", "https://example.com/"])
+    assert args.private
+    assert args.urls == ["https://example.com/"]
+    assert qt_argv == ["nowb", "-style", "fusion"]
+
+
+def test_parse_args_bench_defaults():
+    args, _ = parse_args(["nowb", "--bench", "urls.txt"])
+    assert args.bench == "urls.txt"
+    assert args.bench_mode == "fresh"
+    assert args.bench_repeat == 1
+
+
+def test_resolve_urls_keeps_web_urls():
+    assert resolve_urls(["https://example.com/"]) == ["https://example.com/"]
+
+
+def test_resolve_urls_resolves_relative_files_against_cwd(tmp_path, monkeypatch):
+    (tmp_path / "page.html").write_text("<p>hi</p>", encoding='utf-8')
+    monkeypatch.chdir(tmp_path)
+    [url] = resolve_urls(["page.html"])
+    assert url.startswith("file://")
+    assert url.endswith(os.path.join(str(tmp_path), "page.html").replace(os.sep, "/"))
+
+
+def test_parse_args_debug_is_off_by_default():
+    args, _ = parse_args(["nowb"])
+    assert not args.debug
+    args, _ = parse_args(["nowb", "--debug"])
+    assert args.debug
+
+
+def test_parse_args_keeps_values_of_qt_options_out_of_urls():
+    args, qt_argv = parse_args(["nowb", "--style", "fusion", "-platform", "offscreen", "-stylesheet=a.qss",
+                                "https://example.com/"])
+    assert args.urls == ["https://example.com/"]
+    assert qt_argv == ["nowb", "--style", "fusion", "-platform", "offscreen", "-stylesheet=a.qss"]
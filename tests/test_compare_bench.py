@@ -0,0 +1,33 @@
+"""benchmarks/compare_bench.py のテスト。"""
+from compare_bench import compare, format_change, summarize
+
+
+def result(url, load_ms, ok=True, rss_kb=None, blocked=None):
+    return {'url': url, 'ok': ok, 'load_time_ms': load_ms, 'renderer_rss_kb': rss_kb, 'blocked_requests': blocked}
+
+
+def test_summarize_uses_median_and_skips_failures():
+    report = {'results': [result("a", 10), result("a", 30), result("a", 20), result("a", 1000, ok=False)]}
+    assert summarize(report) == {"a": {'load_ms': 20}}
+
+
+def test_format_change():
+    assert format_change(100, 110) == "+10.0%"
+    assert format_change(0, 3) == "+3"
+    assert format_change(None, 3) == "-"
+
+
+def test_compare_reports_regressions_over_threshold(capsys):
+    base = {'results': [result("a", 100, rss_kb=1000, blocked=5), result("b", 100)]}
+    new = {'results': [result("a", 104, rss_kb=1200, blocked=50), result("b", 150)]}
+    regressions = compare(base, new, threshold=5.0)
+    # blockedは悪化の判定に使わない
+    assert sorted(regressions) == [("a", "rss_kb"), ("b", "load_ms")]
+    assert "悪化" in capsys.readouterr().out
+
+
+def test_compare_lists_urls_only_in_one_report(capsys):
+    base = {'results': [result("a", 100)]}
+    new = {'results': [result("b", 100)]}
+    assert compare(base, new, threshold=5.0) == []
+    assert "片方の結果にしかありません" in capsys.readouterr().out
@@ -0,0 +1,29 @@
+"""nowb.config のプロファイルディレクトリまわりのテスト。"""
+import os
+
+import pytest
+
+pytest.importorskip("PyQt6.QtCore")
+
+from nowb import config
+
+
+@pytest.fixture
+def restore_profile_dir():
+    previous = config._profile_dir
+    yield
+    config._profile_dir = previous
+
+
+def test_profile_path_is_relative_without_profile_dir(restore_profile_dir):
+    config._profile_dir = None
+    assert config.profile_path(config.SETTINGS_FILE) == config.SETTINGS_FILE
+
+
+def test_set_profile_dir_does_not_change_working_directory(tmp_path, restore_profile_dir):
+    cwd = os.getcwd()
+    profile = tmp_path / "profile"
+    config.set_profile_dir(str(profile))
+    assert os.getcwd() == cwd
+    assert profile.is_dir()
+    assert config.profile_path(config.HISTORY_FILE) == os.path.join(str(profile), config.HISTORY_FILE)
@@ -0,0 +1,23 @@
+"""nowb.stall_monitor の一時停止のテスト。"""
+import pytest
+
+pytest.importorskip("PyQt6.QtWidgets")
+
+from nowb.stall_monitor import StallMonitor
+
+
+def test_pause_holds_until_every_caller_resumes():
+    monitor = StallMonitor()
+    monitor.pause()
+    monitor.pause()
+    monitor.resume()
+    assert not monitor._resumed.is_set()
+    monitor.resume()
+    assert monitor._resumed.is_set()
+
+
+def test_resume_without_pause_is_ignored():
+    monitor = StallMonitor()
+    monitor.resume()
+    monitor.pause()
+    assert not monitor._resumed.is_set()
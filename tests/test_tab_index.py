@@ -0,0 +1,117 @@
+"""nowb.tab_index のあいまい検索のテスト。"""
+import nowb.tab_index
+from nowb.tab_index import FUZZY_TITLE_BONUS, SEARCH_SCORE_BUDGET, TabSearchIndex, fuzzy_score
+
+
+class Dummy:
+    """weakrefで参照できるウィンドウ/タブの代わり。"""
+
+
+def make_index(*pages):
+    index = TabSearchIndex()
+    window = Dummy()
+    widgets = []
+    for title, url in pages:
+        widget = Dummy()
+        widgets.append(widget)
+        index.add(window, widget, title, url)
+    return index, window, widgets
+
+
+def test_fuzzy_score_requires_subsequence():
+    assert fuzzy_score("gh", "github") is not None
+    assert fuzzy_score("hg", "github") is None
+    assert fuzzy_score("xyz", "github") is None
+
+
+def test_fuzzy_score_prefers_contiguous_and_word_start():
+    assert fuzzy_score("git", "github") > fuzzy_score("git", "g-i-t")
+    assert fuzzy_score("hub", "git/hub") > fuzzy_score("hub", "ghxuxb")
+
+
+def test_search_prefers_title_over_url():
+    index, _, _ = make_index(("Python", "https://example.com/"), ("Example", "https://python.org/"))
+    results = index.search("python")
+    assert [entry.title for entry in results] == ["Python", "Example"]
+    assert fuzzy_score("python", "python") + FUZZY_TITLE_BONUS > fuzzy_score("python", "https://python.org/")
+
+
+def test_search_ignores_case_and_spaces():
+    index, _, _ = make_index(("Quick Open Palette", "https://example.com/"))
+    assert [entry.title for entry in index.search("quick open")] == ["Quick Open Palette"]
+    assert [entry.title for entry in index.search("QOP")] == ["Quick Open Palette"]
+
+
+def test_search_empty_query_returns_entries_up_to_limit():
+    index, _, _ = make_index(*[(f"tab {i}", f"https://example.com/{i}") for i in range(10)])
+    assert len(index.search("", limit=3)) == 3
+
+
+def test_extended_query_sees_updates():
+    index, _, widgets = make_index(("alpha", "https://one.test/"), ("beta", "https://two.test/"))
+    assert [entry.title for entry in index.search("al")] == ["alpha"]
+    index.update(widgets[1], title="alps")
+    # インデックスが更新されたので、前回の候補だけでなく全体から探し直す
+    assert {entry.title for entry in index.search("alp")} == {"alpha", "alps"}
+
+
+def test_update_ignores_unknown_widget():
+    index, _, _ = make_index(("alpha", "https://a.example/"))
+    version = index.version
+    index.update(Dummy(), title="beta")
+    assert index.version == version
+
+
+def test_remove_and_remove_window():
+    index, window, widgets = make_index(("alpha", "https://a.example/"), ("beta", "https://b.example/"))
+    index.remove(widgets[0])
+    assert [entry.title for entry in index.search("")] == ["beta"]
+    index.remove_window(window)
+    assert index.search("") == []
+
+
+def test_search_matches_brute_force_when_candidates_fit_budget():
+    pages = [(f"page {i} {word}", f"https://{word}.test/{i}") for i, word in enumerate(["kiwi", "mango", "lime", "plum"] * 25)]
+    index, _, _ = make_index(*pages)
+    for query in ("kiwi", "mgo", "lm", "plu", "zz"):
+        expected = {title for title, url in pages if fuzzy_score(query, title) is not None or fuzzy_score(query, url) is not None}
+        assert {entry.title for entry in index.search(query, limit=len(pages))} == expected
+
+
+def test_short_query_scores_at_most_budget(monkeypatch):
+    index, _, _ = make_index(*[(f"Release notes {i}", f"https://example.com/{i}") for i in range(SEARCH_SCORE_BUDGET * 4)]
+                             + [(f"Extra {i}", f"https://extra.test/{i}") for i in range(10)])
+    calls = []
+
+    def counting_score(query, text):
+        calls.append(text)
+        return fuzzy_score(query, text)
+    monkeypatch.setattr(nowb.tab_index, "fuzzy_score", counting_score)
+
+    results = index.search("e", limit=20)
+    assert len(results) == 20
+    # タイトルとURLの2回ずつまで
+    assert len(calls) <= 2 * SEARCH_SCORE_BUDGET
+
+
+def test_short_query_prefers_word_start_matches():
+    pages = [(f"zzzq{i}", f"https://x.test/{i}") for i in range(SEARCH_SCORE_BUDGET * 2)] + [("Quick start", "https://y.test/")]
+    index, _, _ = make_index(*pages)
+    assert index.search("q", limit=1)[0].title == "Quick start"
+
+
+def test_extended_query_after_truncated_search_sees_all_entries():
+    pages = [(f"Report {i}", f"https://r.test/{i}") for i in range(SEARCH_SCORE_BUDGET * 3)] + [("Rare tab", "https://rare.test/")]
+    index, _, _ = make_index(*pages)
+    index.search("r")
+    assert [entry.title for entry in index.search("rar")] == ["Rare tab"]
+
+
+def test_truncated_search_ranks_recent_tabs_first():
+    count = SEARCH_SCORE_BUDGET * 4
+    index, _, widgets = make_index(*[(f"Release {i}", f"https://r.test/{i}") for i in range(count)])
+    expected = [f"Release {i}" for i in range(count - 1, count - 4, -1)]
+    assert [entry.title for entry in index.search("r", limit=3)] == expected
+    # 更新されたタブは最近使われたものとして先頭に来る
+    index.update(widgets[0], title="Release 0 (updated)")
+    assert index.search("r", limit=1)[0].title == "Release 0 (updated)"
@@ -0,0 +1,28 @@
+"""nowb.tabs のタブウィジェットのテスト。"""
+import pytest
+
+# QtWebEngineはモジュールがあってもシステムのライブラリが足りずに読み込めないことがある
+pytest.importorskip("PyQt6.QtWebEngineWidgets", exc_type=ImportError)
+
+from PyQt6.QtWidgets import QWidget
+
+from nowb.tabs import BrowserTabWidget
+
+
+def test_row_of_follows_insert_remove_and_move(qapp):
+    tabs = BrowserTabWidget()
+    widgets = [QWidget() for _ in range(4)]
+    for i, widget in enumerate(widgets):
+        tabs.addTab(widget, f"tab {i}")
+    assert [tabs.row_of(widget) for widget in widgets] == [0, 1, 2, 3]
+
+    tabs.insertTab(0, QWidget(), "inserted")
+    assert tabs.row_of(widgets[0]) == 1
+
+    tabs.removeTab(tabs.row_of(widgets[1]))
+    assert tabs.row_of(widgets[1]) == -1
+    assert tabs.row_of(widgets[3]) == 3
+
+    tabs.tabBar().moveTab(3, 0)
+    assert [tabs.row_of(widget) for widget in (widgets[3], widgets[0], widgets[2])] == [0, 2, 3]
+    assert all(tabs.row_of(tabs.widget(i)) == i for i in range(tabs.count()))
@@ -0,0 +1,104 @@
+"""nowb.tracing のテスト。"""
+import json
+import threading
+
+from nowb.tracing import Tracer, traced, tracer
+
+
+def spans(data):
+    return [event for event in data['traceEvents'] if event['ph'] == 'X']
+
+
+def test_disabled_tracer_records_nothing():
+    t = Tracer()
+    with t.span("idle"):
+        pass
+    assert spans(t.to_trace_events()) == []
+
+
+def test_span_is_recorded_with_args():
+    t = Tracer()
+    t.set_enabled(True)
+    with t.span("work", tabs=3):
+        pass
+    events = spans(t.to_trace_events())
+    assert len(events) == 1
+    assert events[0]['name'] == "work"
+    assert events[0]['args'] == {'tabs': '3'}
+    assert events[0]['dur'] >= 0
+
+
+def test_ring_buffer_keeps_newest_spans():
+    t = Tracer(capacity=3)
+    t.set_enabled(True)
+    for i in range(5):
+        with t.span(f"span{i}"):
+            pass
+    assert [event['name'] for event in spans(t.to_trace_events())] == ["span2", "span3", "span4"]
+
+
+def test_spans_are_kept_per_thread():
+    t = Tracer()
+    t.set_enabled(True)
+    with t.span("main"):
+        pass
+
+    def worker():
+        with t.span("worker"):
+            pass
+    thread = threading.Thread(target=worker, name="trace-worker")
+    thread.start()
+    thread.join()
+
+    data = t.to_trace_events()
+    thread_names = {event['args']['name'] for event in data['traceEvents'] if event['ph'] == 'M'}
+    assert "trace-worker" in thread_names
+    assert len({event['tid'] for event in spans(data)}) == 2
+
+
+def test_clear_discards_spans():
+    t = Tracer()
+    t.set_enabled(True)
+    with t.span("work"):
+        pass
+    t.clear()
+    assert spans(t.to_trace_events()) == []
+
+
+def test_dump_writes_chrome_trace_json(tmp_path):
+    t = Tracer()
+    t.set_enabled(True)
+    with t.span("work"):
+        pass
+    path = tmp_path / "trace.json"
+    assert t.dump(str(path)) == 1
+    data = json.loads(path.read_text(encoding='utf-8'))
+    assert data['displayTimeUnit'] == 'ms'
+    assert [event['name'] for event in spans(data)] == ["work"]
+
+
+def test_traced_decorator_uses_qualname_and_propagates_exceptions():
+    @traced()
+    def ok():
+        return 42
+
+    @traced("custom")
+    def fail():
+        raise ValueError("boom")
+
+    was_enabled = tracer.enabled
+    tracer.set_enabled(True)
+    tracer.clear()
+    try:
+        assert ok() == 42
+        try:
+            fail()
+        except ValueError:
+            pass
+        else:
+            raise AssertionError("例外が握りつぶされました")
+        names = [event['name'] for event in spans(tracer.to_trace_events())]
+    finally:
+        tracer.set_enabled(was_enabled)
+        tracer.clear()
+    assert names == [ok.__qualname__, "custom"]
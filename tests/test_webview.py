@@ -0,0 +1,123 @@
+"""nowb.webview のうちGUIを表示せずに確認できる部分のテスト。"""
+import pytest
+
+# QtWebEngineはモジュールがあってもシステムのライブラリが足りずに読み込めないことがある
+pytest.importorskip("PyQt6.QtWebEngineCore", exc_type=ImportError)
+
+import time
+
+from PyQt6.QtCore import QObject, QUrl, pyqtSignal
+
+from nowb import webview
+from nowb.webview import ClosedViewTracker, TabConnections, TabPreloader, WebViewPool
+
+
+class FakeView(QObject):
+    """ClosedViewTrackerが使うurl()だけを持つ、ビューの代わりのオブジェクト。"""
+    def url(self):
+        return QUrl("https://example.com/")
+
+
+class FakePoolView(QObject):
+    """WebViewPoolが使うsetUrl()とpage().history().clear()だけを持つ、ビューの代わりのオブジェクト。"""
+    def setUrl(self, url):
+        self.loaded_url = url
+
+    def page(self):
+        return self
+
+    def history(self):
+        return self
+
+    def clear(self):
+        pass
+
+
+class FakeLoadingView(QObject):
+    """TabPreloaderが使うloadFinishedとtab_connectionsだけを持つ、読み込みが終わらないビューの代わり。"""
+    loadFinished = pyqtSignal(bool)
+
+    def __init__(self):
+        super().__init__()
+        self.tab_connections = TabConnections()
+
+
+class FakePreloadWindow(QObject):
+    """プレースホルダーの文字列をそのままタブとして扱い、materialize_tabの呼び出しを記録するウィンドウの代わり。"""
+    def __init__(self, placeholders):
+        super().__init__()
+        self.tabs = self
+        self.placeholders = list(placeholders)
+        self.materialized = []
+
+    def indexOf(self, placeholder):
+        return self.placeholders.index(placeholder) if placeholder in self.placeholders else -1
+
+    def materialize_tab(self, index, interactive=True):
+        assert not interactive # 先読みではダイアログを出さない
+        view = FakeLoadingView()
+        self.materialized.append(view)
+        return view
+
+
+def wait_until(app, condition, timeout_s=2.0):
+    deadline = time.monotonic() + timeout_s
+    while not condition() and time.monotonic() < deadline:
+        app.processEvents()
+        time.sleep(0.005)
+    return condition()
+
+
+def test_closed_view_tracker_detects_leak(qapp):
+    tracker = ClosedViewTracker()
+    view = FakeView()
+    tracker.track(view)
+    with pytest.raises(AssertionError, match="example.com"):
+        tracker.assert_collected()
+    assert tracker.leaked() == ["https://example.com/"]
+
+
+def test_closed_view_tracker_passes_after_release(qapp):
+    tracker = ClosedViewTracker()
+    view = FakeView()
+    tracker.track(view)
+    del view
+    tracker.assert_collected()
+    assert tracker.leaked() == []
+
+
+def test_closed_view_tracker_collects_reference_cycles(qapp):
+    tracker = ClosedViewTracker()
+    view = FakeView()
+    view.self_ref = view # 循環参照はgc.collectで解放される
+    tracker.track(view)
+    del view
+    tracker.assert_collected()
+
+
+def test_pool_refills_once_memory_pressure_clears(qapp, monkeypatch):
+    pool = WebViewPool(FakePoolView, size=2)
+    pool._refill_timer.setInterval(0)
+    monkeypatch.setattr(webview, "is_memory_pressure", lambda: True)
+    pool.schedule_refill()
+    assert wait_until(qapp, pool._retry_timer.isActive)
+    assert pool._views == []
+
+    monkeypatch.setattr(webview, "is_memory_pressure", lambda: False)
+    pool._retry_timer.start(0) # 再試行の間隔を待たずに進める
+    assert wait_until(qapp, lambda: len(pool._views) == 2)
+    pool.clear()
+
+
+def test_preloader_frees_slot_when_load_never_finishes(qapp, monkeypatch):
+    monkeypatch.setattr(webview, "is_memory_pressure", lambda: False)
+    monkeypatch.setattr(webview, "PRELOAD_TAB_TIMEOUT_MS", 10)
+    window = FakePreloadWindow(["a", "b", "c"])
+    preloader = TabPreloader(window, max_concurrent=1)
+    preloader.enqueue(["a", "b", "c"])
+    assert len(window.materialized) == 1
+
+    # loadFinishedが来なくても、タイムアウトで次のタブの読み込みが始まる
+    assert wait_until(qapp, lambda: len(window.materialized) == 3)
+    assert wait_until(qapp, lambda: not preloader._loading)
+    assert all(not view.tab_connections._keyed for view in window.materialized)
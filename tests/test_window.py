@@ -0,0 +1,43 @@
+"""nowb.window のタブを閉じたときの解放のテスト。"""
+import weakref
+
+import pytest
+
+# QtWebEngineはモジュールがあってもシステムのライブラリが足りずに読み込めないことがある
+pytest.importorskip("PyQt6.QtWebEngineWidgets", exc_type=ImportError)
+
+from PyQt6.QtCore import QUrl
+
+from nowb.config import DEBUG_LEAKS_ENV
+
+# プライベートウィンドウが参照する最小限の設定 (設定ファイルは読み書きしない)
+PRIVATE_SETTINGS = {
+    'home_url': 'about:blank',
+    'search_engines': {"Google": "https://www.google.com/search?q="},
+    'favorite_sites': {},
+    'blocked_sites': [],
+}
+
+
+@pytest.fixture
+def window(qapp, monkeypatch):
+    monkeypatch.setenv(DEBUG_LEAKS_ENV, "1")
+    from nowb.window import FullFeaturedBrowser
+    browser_window = FullFeaturedBrowser(is_private=True, parent_settings=dict(PRIVATE_SETTINGS))
+    yield browser_window
+    browser_window.close()
+    browser_window.deleteLater()
+
+
+def test_close_tabs_releases_view_page_and_connections(window):
+    browser = window.add_new_tab(QUrl("about:blank"))
+    connections = browser.tab_connections
+    assert connections._connections or connections._keyed
+    page_ref = weakref.ref(browser.page())
+
+    window.close_tabs([window.tabs.indexOf(browser)])
+    del browser
+
+    assert connections._connections == [] and connections._keyed == {}
+    window.closed_view_tracker.assert_collected()
+    assert page_ref() is None